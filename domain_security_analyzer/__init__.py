@@ -7,13 +7,19 @@ Integrity (SRI) scanning.
 
 from .__version__ import __version__
 from .analyzer import DomainAnalyzer, analyze_domains_from_file
-from .sri import SRIParser, UnsafeResource, scan_url
+from .async_analyzer import AsyncDomainAnalyzer, analyze_domains_async
+from .bruteforce import bruteforce_subdomains
+from .sri import SRIParser, UnsafeResource, scan_url, scan_urls
 
 __all__ = [
     "DomainAnalyzer",
     "analyze_domains_from_file",
+    "AsyncDomainAnalyzer",
+    "analyze_domains_async",
+    "bruteforce_subdomains",
     "SRIParser",
     "UnsafeResource",
     "scan_url",
+    "scan_urls",
     "__version__",
 ]
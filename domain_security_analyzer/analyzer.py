@@ -5,24 +5,147 @@ importable API for the package. The command-line interface lives in
 ``domain_security_analyzer.cli``.
 """
 
+import codecs
 import concurrent.futures
 import csv
+import itertools
+import os
+import secrets
+import threading
+import time
 from datetime import datetime
-from typing import Callable, Dict, List, Optional
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Set
 from urllib.parse import urlparse
 
 import dns.resolver
 import requests
-from bs4 import BeautifulSoup
+
+from .dnscache import DNSCache, answer_ttl
+from .htmlscan import BACKENDS as HTML_BACKENDS, ScanCache, make_scanner
+from .http_session import make_session
+from .planner import Lookup, QueryPlan, is_nxdomain, query_key, response_from_exception
+from .psl import registered_domain
+from .resolver import ResolverPool
+from .scheduler import normalize_domain, schedule_domains
+
+# Most of an HTML body read for SRI analysis; the rest is never downloaded
+MAX_HTML_BYTES = 500_000
+
+# Bytes read from the socket per step while streaming a body
+_CHUNK_SIZE = 16 * 1024
+
+# Domains submitted to the thread pool per worker; bounds the in-flight window
+_WINDOW_PER_WORKER = 4
+
+# Buffer of the streamed report CSV; rows reach the disk on each sync
+_WRITE_BUFFER_BYTES = 256 * 1024
+
+# Row terminator of the report CSV (csv's default); a line break inside a
+# quoted value is a bare "\n", so this only ends complete rows
+_ROW_END = b'\r\n'
+
+
+def _stream_text(response: requests.Response, on_text: Callable[[str], None], limit: int = MAX_HTML_BYTES) -> None:
+    """Decode up to ``limit`` bytes of a streamed ``response`` body into ``on_text`` chunks."""
+    try:
+        decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+    except LookupError:
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    remaining = limit
+    for chunk in response.iter_content(_CHUNK_SIZE):
+        chunk = chunk[:remaining]
+        remaining -= len(chunk)
+        text = decoder.decode(chunk, final=remaining <= 0)
+        if text:
+            on_text(text)
+        if remaining <= 0:
+            return  # the connection is dropped with the unread rest
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        on_text(tail)
+
+
+# Bundled DKIM selector lists (one per line, '#' comments): the short default
+# one, and several hundred selectors for ``--dkim-selectors extended``
+DKIM_SELECTORS_FILE = Path(__file__).parent / 'data' / 'dkim_selectors.txt'
+EXTENDED_DKIM_SELECTORS_FILE = Path(__file__).parent / 'data' / 'dkim_selectors_extended.txt'
+
+
+def load_dkim_selectors(path=None) -> List[str]:
+    """Read a selector list file, defaulting to the bundled one.
+
+    Blank lines and ``#`` comments are ignored and duplicates dropped, keeping
+    the first occurrence so the file order is the probe order.
+    """
+    selectors: List[str] = []
+    seen = set()
+    with open(path or DKIM_SELECTORS_FILE, 'r', encoding='utf-8') as f:
+        for line in f:
+            selector = line.split('#', 1)[0].strip()
+            if selector and selector.lower() not in seen:
+                seen.add(selector.lower())
+                selectors.append(selector)
+    return selectors
+
+
+# Selectors probed by check_dkim when none are given
+DEFAULT_DKIM_SELECTORS = load_dkim_selectors()
+
+
+def _is_negative(lookup: Lookup) -> bool:
+    """True when ``lookup`` is a definite "no such records" answer.
+
+    Timeouts, SERVFAIL and other errors are not: they say nothing about
+    whether the records exist. Cached ``None`` entries are always negative
+    answers, since failures are never cached.
+    """
+    return lookup.records is None and (lookup.response is not None or not lookup.issued)
+
+
+def _is_positive(lookup: Lookup) -> bool:
+    """True when ``lookup`` returned records (not an error string)."""
+    return isinstance(lookup.records, list) and bool(lookup.records)
+
+
+def _norm_rrset(rrset: Optional[List[str]]) -> Optional[tuple]:
+    """Normalize a DNS answer for order- and case-insensitive comparison."""
+    if not rrset:
+        return None
+    try:
+        return tuple(sorted(str(r).strip().lower() for r in rrset))
+    except Exception:
+        return tuple(sorted(rrset))
 
 
 class DomainAnalyzer:
-    def __init__(self, include_wildcard_matches: bool = False, collect_filtered: bool = False):
-        self.resolver = dns.resolver.Resolver()
-        self.resolver.timeout = 5
-        self.resolver.lifetime = 5
+    def __init__(self, include_wildcard_matches: bool = False, collect_filtered: bool = False, *, dns_cache: Optional[DNSCache] = None, query_concurrency: int = 16, skip_dead_domains: bool = True, dkim_selectors: Optional[List[str]] = None, resolver_pool: Optional[ResolverPool] = None, http_session: Optional[requests.Session] = None, html_backend: str = "scanner", scan_cache: Optional[ScanCache] = None, executor: Optional[concurrent.futures.ThreadPoolExecutor] = None):
+        # Upstream resolvers, typically one pool shared by every analyzer in a run
+        self.resolver = resolver_pool if resolver_pool is not None else ResolverPool()
         self.include_wildcard_matches = include_wildcard_matches
         self.collect_filtered = collect_filtered
+        # Optional answer cache, typically shared by every analyzer in a run
+        self.dns_cache = dns_cache
+        # Pooled HTTP session, typically shared by every analyzer in a run
+        self.http_session = http_session if http_session is not None else make_session(pool_connections=4, pool_maxsize=4)
+        # Tag extractor for SRI: the streaming scanner, or "bs4" as a fallback
+        if html_backend not in HTML_BACKENDS:
+            raise ValueError(f"Unknown HTML backend {html_backend!r}; expected one of {', '.join(HTML_BACKENDS)}")
+        self.html_backend = html_backend
+        # Scan results of pages seen before, typically shared by every analyzer in a run
+        self.scan_cache = scan_cache
+        # Answers prefetched for the domain currently being analyzed (see plan_queries)
+        self._answers: Optional[Dict] = None
+        # Max lookups in flight at once for one domain; 1 resolves the plan
+        # serially, anything higher fans it out (and the HTTP fetch) on threads
+        self.query_concurrency = max(1, query_concurrency)
+        # Threads for that fan-out, typically shared by every analyzer in a
+        # run; without one, threads are started for each fan-out
+        self.executor = executor
+        # Check apex liveness first and skip the remaining checks for dead domains
+        self.skip_dead_domains = skip_dead_domains
+        # Selectors check_dkim probes under _domainkey.<domain>
+        self.dkim_selectors = list(dkim_selectors) if dkim_selectors is not None else list(DEFAULT_DKIM_SELECTORS)
 
         # Common subdomain prefixes to check
         self.common_subdomains = [
@@ -47,32 +170,63 @@ class DomainAnalyzer:
         }
 
     def get_dns_record(self, domain: str, record_type: str) -> Optional[List[str]]:
-        """Query DNS records of specified type for a domain."""
+        """Query DNS records of specified type for a domain.
+
+        While :meth:`analyze_domain` runs, answers come from the prefetched
+        query plan. Otherwise (including NXDOMAIN/NoAnswer) they are served
+        from and stored in ``self.dns_cache`` when one is configured.
+        """
+        if self._answers is not None:
+            key = query_key(domain, record_type)
+            if key in self._answers:
+                return self._answers[key]
+        return self._lookup(domain, record_type).records
+
+    def _lookup(self, domain: str, record_type: str) -> Lookup:
+        """Resolve one query, keeping the raw response for the query planner."""
+        cached = self._cached_lookup(domain, record_type)
+        if cached is not None:
+            return cached
         try:
-            # Try with default resolver first
+            # The pool fails over between upstreams on timeouts and SERVFAIL
             answers = self.resolver.resolve(domain, record_type)
-            return [str(rdata) for rdata in answers]
-        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
-            return None
-        except dns.exception.Timeout:
-            # On timeout, try with system DNS servers
-            try:
-                # Get system DNS servers (useful especially on Windows)
-                system_resolver = dns.resolver.Resolver(configure=True)
-                system_resolver.timeout = 3
-                system_resolver.lifetime = 3
-                answers = system_resolver.resolve(domain, record_type)
-                return [str(rdata) for rdata in answers]
-            except:
-                return None
+            return Lookup(self._remember(domain, record_type, answers), answers.response, True)
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer) as e:
+            if self.dns_cache is not None:
+                self.dns_cache.put_negative(domain, record_type, e)
+            return Lookup(None, response_from_exception(e), True, is_nxdomain(e))
+        except (dns.exception.Timeout, dns.resolver.NoNameservers):
+            # Every upstream timed out, SERVFAILed or REFUSED, even after retries
+            return Lookup(None, None, True)
         except Exception as e:
             if "SERVFAIL" in str(e):
-                return None  # Common on Windows when DNS server is unreachable
-            return f"Error: {str(e)}"
+                return Lookup(None, None, True)  # Common on Windows when DNS server is unreachable
+            return Lookup(f"Error: {str(e)}", None, True)
+
+    def _cached_lookup(self, domain: str, record_type: str) -> Optional[Lookup]:
+        """The cached answer as a :class:`Lookup`, or ``None`` on a cache miss."""
+        if self.dns_cache is None:
+            return None
+        entry = self.dns_cache.get(domain, record_type)
+        if entry is None:
+            return None
+        records = list(entry.records) if entry.records is not None else None
+        return Lookup(records, None, False, entry.nxdomain)
+
+    def _remember(self, domain: str, record_type: str, answers) -> List[str]:
+        """Convert a resolver answer to strings, caching it for its TTL."""
+        records = [str(rdata) for rdata in answers]
+        if self.dns_cache is not None:
+            self.dns_cache.put(domain, record_type, records, answer_ttl(answers))
+        return records
 
     def check_spf(self, domain: str) -> Dict:
         """Check SPF record for domain."""
-        records = self.get_dns_record(domain, 'TXT')
+        return self._spf_result(self.get_dns_record(domain, 'TXT'))
+
+    @staticmethod
+    def _spf_result(records) -> Dict:
+        """Build the SPF result from the apex TXT answer."""
         if not records:
             return {"exists": False, "record": None}
 
@@ -86,12 +240,45 @@ class DomainAnalyzer:
             "multiple_records": len(spf_records) > 1
         }
 
-    def check_dkim(self, domain: str, selectors: List[str] = ['default', 'google', 'dkim', 'k1']) -> Dict:
-        """Check DKIM record for domain with multiple common selectors."""
+    def check_dkim(self, domain: str, selectors: Optional[List[str]] = None) -> Dict:
+        """Check DKIM records for domain, probing every selector (default: ``self.dkim_selectors``).
+
+        Called on its own, ``_domainkey.<domain>`` is resolved first and the
+        scan skipped when it is NXDOMAIN, or when a random selector answers
+        too (wildcard TXT under ``_domainkey``, which would make every
+        selector look published); the selectors are then probed
+        ``query_concurrency`` at a time. Within :meth:`analyze_domain` the
+        query plan does all of that.
+        """
+        selectors = self.dkim_selectors if selectors is None else selectors
+        queries = [(f"{selector}._domainkey.{domain}", 'TXT') for selector in selectors]
+        if self._answers is not None:
+            records = [self.get_dns_record(name, rdtype) for name, rdtype in queries]
+        elif self._lookup(f"_domainkey.{domain}", 'TXT').nxdomain:
+            records = []
+        elif _is_positive(self._lookup(self._dkim_probe_name(domain), 'TXT')):
+            records = []
+        else:
+            records = [lookup.records for lookup in self._lookup_many(queries)]
+        return self._dkim_result(zip(selectors, records))
+
+    @staticmethod
+    def _dkim_probe_name(domain: str) -> str:
+        """A selector nobody publishes, used to detect wildcard TXT under ``_domainkey``."""
+        return f"dsa-probe-{secrets.token_hex(8)}._domainkey.{domain}"
+
+    def _record_dkim_probe(self, domain: str, plan: QueryPlan, answers: Dict, probe: str, lookup: Lookup) -> None:
+        """Store the wildcard probe's answer; when it has records, skip every selector lookup."""
+        plan.add(probe, 'TXT')
+        plan.record(answers, probe, 'TXT', lookup)
+        if _is_positive(lookup):
+            plan.skip(answers, [(f"{selector}._domainkey.{domain}", 'TXT') for selector in self.dkim_selectors])
+
+    @staticmethod
+    def _dkim_result(answers) -> Dict:
+        """Build the DKIM result from ``(selector, TXT answer)`` pairs."""
         results = []
-        for selector in selectors:
-            dkim_domain = f"{selector}._domainkey.{domain}"
-            record = self.get_dns_record(dkim_domain, 'TXT')
+        for selector, record in answers:
             if record:
                 results.append({
                     "selector": selector,
@@ -105,77 +292,106 @@ class DomainAnalyzer:
 
     def check_dmarc(self, domain: str) -> Dict:
         """Check DMARC record for domain."""
-        dmarc_domain = f"_dmarc.{domain}"
-        record = self.get_dns_record(dmarc_domain, 'TXT')
+        return self._dmarc_result(self.get_dns_record(f"_dmarc.{domain}", 'TXT'))
 
+    @staticmethod
+    def _dmarc_result(record) -> Dict:
+        """Build the DMARC result from the ``_dmarc`` TXT answer."""
         return {
             "exists": bool(record),
             "record": record[0] if record else None
         }
 
-    def discover_subdomains(self, domain: str) -> Dict:
-        """Discover subdomains using various methods."""
-        found_subdomains = set()
-        filtered_subdomains = set()
-        cname_records = {}
-
-        # Helper to normalize DNS rrsets for comparison
-        def _norm_rrset(rrset: Optional[List[str]]) -> Optional[tuple]:
-            if not rrset:
-                return None
-            try:
-                return tuple(sorted(str(r).strip().lower() for r in rrset))
-            except Exception:
-                return tuple(sorted(rrset))
+    def discover_subdomains(self, domain: str, wildcard_probe: Optional[str] = None) -> Dict:
+        """Discover subdomains using various methods.
 
+        ``wildcard_probe`` overrides the name used for the wildcard baseline,
+        so a caller that planned the queries can reuse the same name.
+        """
         # Establish wildcard baseline answers (if any)
         try:
-            random_sub = f"wildcard-test-{datetime.now().strftime('%Y%m%d%H%M%S')}.{domain}"
-            wildcard_a = self.get_dns_record(random_sub, 'A')
-            wildcard_cname = self.get_dns_record(random_sub, 'CNAME')
-            has_wildcard = bool(wildcard_a or wildcard_cname)
-            wildcard_a_norm = _norm_rrset(wildcard_a)
-            wildcard_cname_norm = _norm_rrset(wildcard_cname)
+            random_sub = wildcard_probe or self._wildcard_probe_name(domain)
+            baseline = (self.get_dns_record(random_sub, 'A'), self.get_dns_record(random_sub, 'CNAME'))
         except Exception:
-            has_wildcard = False
-            wildcard_a_norm = None
-            wildcard_cname_norm = None
+            baseline = None
 
         # Check common subdomains
+        probes = []
         for subdomain in self.common_subdomains:
             fqdn = f"{subdomain}.{domain}"
             try:
                 # Prefer explicit CNAMEs
                 cname = self.get_dns_record(fqdn, 'CNAME')
                 a_records = self.get_dns_record(fqdn, 'A')
+            except Exception:
+                continue
+            probes.append((fqdn, cname, a_records))
+
+        return self._subdomain_result(baseline, probes)
+
+    @staticmethod
+    def _wildcard_probe_name(domain: str) -> str:
+        """Random-looking name used to detect wildcard DNS below ``domain``."""
+        return f"wildcard-test-{datetime.now().strftime('%Y%m%d%H%M%S')}.{domain}"
+
+    @staticmethod
+    def _wildcard_baseline(baseline) -> "tuple[bool, Optional[tuple], Optional[tuple]]":
+        """``(has_wildcard, A norm, CNAME norm)`` for an ``(A, CNAME)`` baseline pair or ``None``."""
+        if baseline is None:
+            return False, None, None
+        wildcard_a, wildcard_cname = baseline
+        return bool(wildcard_a or wildcard_cname), _norm_rrset(wildcard_a), _norm_rrset(wildcard_cname)
+
+    @staticmethod
+    def _matches_wildcard(wildcard, cname, a_records) -> bool:
+        """True when a probed name's answer just echoes the wildcard baseline.
+
+        CNAMEs are compared with the wildcard CNAME; A-only answers with the
+        wildcard A records.
+        """
+        has_wildcard, wildcard_a_norm, wildcard_cname_norm = wildcard
+        if not has_wildcard:
+            return False
+        if cname:
+            return _norm_rrset(cname) == wildcard_cname_norm
+        return _norm_rrset(a_records) == wildcard_a_norm
+
+    def _probe_verdict(self, wildcard, cname, a_records) -> Optional[bool]:
+        """Classify one probed name against a :meth:`_wildcard_baseline`.
+
+        ``True`` to report it, ``False`` when it only echoes the wildcard
+        (filtered, to avoid false positives), ``None`` when it has neither
+        CNAME nor A records.
+        """
+        if not (cname or a_records):
+            return None
+        return self.include_wildcard_matches or not self._matches_wildcard(wildcard, cname, a_records)
 
-                include = False
+    def _subdomain_result(self, baseline, probes) -> Dict:
+        """Classify probed subdomains against the wildcard baseline.
 
-                if cname:
-                    # Include CNAMEs unless they match the wildcard CNAME baseline
-                    if has_wildcard and _norm_rrset(cname) == wildcard_cname_norm and not self.include_wildcard_matches:
-                        include = False
-                        if self.collect_filtered:
-                            filtered_subdomains.add(fqdn)
-                    else:
-                        include = True
-                        cname_records[fqdn] = cname[0]
-                elif a_records:
-                    # If wildcard is present, suppress A-only results that
-                    # exactly match the wildcard baseline to avoid false positives
-                    if has_wildcard:
-                        if self.include_wildcard_matches or _norm_rrset(a_records) != wildcard_a_norm:
-                            include = True
-                        else:
-                            if self.collect_filtered:
-                                filtered_subdomains.add(fqdn)
-                    else:
-                        include = True
-
-                if include:
-                    found_subdomains.add(fqdn)
+        ``baseline`` is the ``(A, CNAME)`` answer pair for the wildcard probe
+        name (``None`` if it could not be established) and ``probes`` an
+        iterable of ``(fqdn, CNAME answer, A answer)`` tuples.
+        """
+        found_subdomains = set()
+        filtered_subdomains = set()
+        cname_records = {}
+
+        wildcard = self._wildcard_baseline(baseline)
+        has_wildcard = wildcard[0]
+
+        for fqdn, cname, a_records in probes:
+            try:
+                include = self._probe_verdict(wildcard, cname, a_records)
             except Exception:
                 continue
+            if include:
+                found_subdomains.add(fqdn)
+                if cname:
+                    cname_records[fqdn] = cname[0]
+            elif include is False and self.collect_filtered:
+                filtered_subdomains.add(fqdn)
 
         # Identify hosting provider
         hosting_provider = None
@@ -196,7 +412,22 @@ class DomainAnalyzer:
         }
 
     def check_http_redirect(self, domain: str) -> "tuple[Dict, str]":
-        """Check for insecure HTTP to HTTPS redirects and capture HTML content."""
+        """Check for insecure HTTP to HTTPS redirects and capture HTML content.
+
+        The HTML is capped at :data:`MAX_HTML_BYTES`; see :meth:`_fetch_page`.
+        """
+        chunks: List[str] = []
+        result = self._fetch_page(domain, chunks.append)
+        return result, ''.join(chunks)
+
+    def _fetch_page(self, domain: str, on_text: Callable[[str], None]) -> Dict:
+        """Follow ``http://<domain>`` to its final URL, streaming an HTML body into ``on_text``.
+
+        Returns the redirect result. The body is decoded incrementally and
+        passed on chunk by chunk; it is only read when the final response is
+        ``text/html``, and reading stops after :data:`MAX_HTML_BYTES`, so
+        nothing proportional to the page size is held.
+        """
         result = {
             "http_accessible": False,
             "redirects_to_https": False,
@@ -204,29 +435,27 @@ class DomainAnalyzer:
             "error": None,
             "redirect_chain": []
         }
-        html_content = ""
 
         try:
             http_url = f"http://{domain}"
-            response = requests.get(http_url, allow_redirects=True, timeout=10)
+            with self.http_session.get(http_url, allow_redirects=True, timeout=10, stream=True) as response:
+                result["http_accessible"] = True
+                result["final_url"] = response.url
+                result["redirects_to_https"] = response.url.startswith("https://")
 
-            result["http_accessible"] = True
-            result["final_url"] = response.url
-            result["redirects_to_https"] = response.url.startswith("https://")
+                # Capture redirect chain
+                if response.history:
+                    result["redirect_chain"] = [r.url for r in response.history]
+                    result["redirect_chain"].append(response.url)
 
-            # Capture redirect chain
-            if response.history:
-                result["redirect_chain"] = [r.url for r in response.history]
-                result["redirect_chain"].append(response.url)
-
-            # Capture HTML content for SRI analysis (limit to reasonable size)
-            if response.headers.get('content-type', '').startswith('text/html'):
-                html_content = response.text[:500000]  # Limit to 500KB to avoid memory issues
+                # Stream HTML content for SRI analysis; other bodies are never read
+                if response.headers.get('content-type', '').startswith('text/html'):
+                    _stream_text(response, on_text)
 
         except requests.exceptions.RequestException as e:
             result["error"] = str(e)
 
-        return result, html_content
+        return result
 
     def _is_external_resource(self, url: str, domain: str) -> bool:
         """Check if a resource URL is external to the given domain."""
@@ -263,83 +492,71 @@ class DomainAnalyzer:
 
     def check_sri(self, domain: str, html_content: str) -> Dict:
         """Analyze Subresource Integrity implementation from HTML content."""
+        scanner = make_scanner(self.html_backend, cache=self.scan_cache)
+        scanner.feed(html_content or '')
+        scanner.close()
+        return self._sri_result(domain, scanner)
+
+    def _sri_result(self, domain: str, scanner) -> Dict:
+        """Build the SRI result from the tags a (fully fed) scanner collected."""
         result = {
             "sri_enabled": False,
             "total_external_resources": 0,
             "resources_with_sri": 0,
             "sri_coverage_percentage": 0,
             "missing_sri_count": 0,
-            "sri_algorithms_used": set(),
+            "sri_algorithms_used": [],
             "error": None
         }
 
-        if not html_content:
+        if not scanner.fed:
             result["error"] = "No HTML content available"
             return result
+        if scanner.error is not None:
+            result["error"] = f"SRI parsing error: {str(scanner.error)}"
+            return result
 
-        try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            external_resources = []
-
-            # Find external scripts
-            for script in soup.find_all('script', src=True):
-                src = script.get('src')
-                if self._is_external_resource(src, domain):
-                    external_resources.append({
-                        'type': 'script',
-                        'src': src,
-                        'integrity': script.get('integrity'),
-                        'crossorigin': script.get('crossorigin')
-                    })
-
-            # Find external stylesheets
-            for link in soup.find_all('link', href=True):
-                if link.get('rel') == ['stylesheet'] or 'stylesheet' in (link.get('rel') or []):
-                    href = link.get('href')
-                    if self._is_external_resource(href, domain):
-                        external_resources.append({
-                            'type': 'stylesheet',
-                            'src': href,
-                            'integrity': link.get('integrity'),
-                            'crossorigin': link.get('crossorigin')
-                        })
-
-            # Analyze SRI implementation
-            result["total_external_resources"] = len(external_resources)
-
-            for resource in external_resources:
-                if resource['integrity']:
-                    result["resources_with_sri"] += 1
-                    algorithm = self._extract_hash_algorithm(resource['integrity'])
-                    if algorithm:
-                        result["sri_algorithms_used"].add(algorithm)
-
-            result["missing_sri_count"] = result["total_external_resources"] - result["resources_with_sri"]
-
-            if result["total_external_resources"] > 0:
-                result["sri_coverage_percentage"] = round(
-                    (result["resources_with_sri"] / result["total_external_resources"]) * 100, 1
-                )
-                result["sri_enabled"] = result["resources_with_sri"] > 0
-
-            # Convert set to sorted list for CSV output
-            result["sri_algorithms_used"] = sorted(list(result["sri_algorithms_used"]))
+        external_resources = []
+        for kind, attrs in scanner.resources:
+            src = attrs['src' if kind == 'script' else 'href']
+            if self._is_external_resource(src, domain):
+                external_resources.append({
+                    'type': kind,
+                    'src': src,
+                    'integrity': attrs.get('integrity'),
+                    'crossorigin': attrs.get('crossorigin')
+                })
+        algorithms = set()
 
-        except Exception as e:
-            result["error"] = f"SRI parsing error: {str(e)}"
+        # Analyze SRI implementation
+        result["total_external_resources"] = len(external_resources)
+
+        for resource in external_resources:
+            if resource['integrity']:
+                result["resources_with_sri"] += 1
+                algorithm = self._extract_hash_algorithm(resource['integrity'])
+                if algorithm:
+                    algorithms.add(algorithm)
+
+        result["missing_sri_count"] = result["total_external_resources"] - result["resources_with_sri"]
+
+        if result["total_external_resources"] > 0:
+            result["sri_coverage_percentage"] = round(
+                (result["resources_with_sri"] / result["total_external_resources"]) * 100, 1
+            )
+            result["sri_enabled"] = result["resources_with_sri"] > 0
 
+        # Sorted list for CSV output
+        result["sri_algorithms_used"] = sorted(algorithms)
         return result
 
     def get_parent_domain(self, domain: str) -> str:
-        """Extract parent domain from subdomain (e.g., www.example.com -> example.com)."""
-        parts = domain.split('.')
-        if len(parts) <= 2:
-            return domain  # Already a parent domain
+        """Registered domain of ``domain`` per the Public Suffix List.
 
-        # Handle common TLDs and country codes
-        # For simplicity, assume last two parts are the parent domain
-        # This works for most cases like .com, .org, .co.uk, etc.
-        return '.'.join(parts[-2:])
+        ``www.example.com`` -> ``example.com``, ``shop.example.co.uk`` ->
+        ``example.co.uk``; see :func:`~domain_security_analyzer.psl.registered_domain`.
+        """
+        return registered_domain(domain)
 
     def get_soa_record(self, domain: str) -> Dict:
         """Get SOA (Start of Authority) record for the parent domain."""
@@ -347,29 +564,6 @@ class DomainAnalyzer:
 
         try:
             soa_records = self.get_dns_record(parent_domain, 'SOA')
-            if not soa_records:
-                return {"exists": False, "parent_domain": parent_domain, "record": None}
-
-            # Parse SOA record components - only extract DNS names
-            soa_parts = soa_records[0].split()
-            if len(soa_parts) >= 2:
-                # Only include the primary nameserver and admin email (first two fields)
-                dns_names_only = f"{soa_parts[0]} {soa_parts[1]}"
-                return {
-                    "exists": True,
-                    "parent_domain": parent_domain,
-                    "record": dns_names_only,
-                    "primary_ns": soa_parts[0],
-                    "admin_email": soa_parts[1]
-                }
-            else:
-                return {
-                    "exists": True,
-                    "parent_domain": parent_domain,
-                    "record": soa_records[0],
-                    "primary_ns": None,
-                    "admin_email": None
-                }
         except Exception as e:
             return {
                 "exists": False,
@@ -377,29 +571,237 @@ class DomainAnalyzer:
                 "record": None,
                 "error": str(e)
             }
+        return self._soa_result(parent_domain, soa_records)
+
+    @staticmethod
+    def _soa_result(parent_domain: str, soa_records) -> Dict:
+        """Build the SOA result from the parent domain's SOA answer."""
+        if not soa_records:
+            return {"exists": False, "parent_domain": parent_domain, "record": None}
+
+        # Parse SOA record components - only extract DNS names
+        soa_parts = soa_records[0].split()
+        if len(soa_parts) >= 2:
+            # Only include the primary nameserver and admin email (first two fields)
+            dns_names_only = f"{soa_parts[0]} {soa_parts[1]}"
+            return {
+                "exists": True,
+                "parent_domain": parent_domain,
+                "record": dns_names_only,
+                "primary_ns": soa_parts[0],
+                "admin_email": soa_parts[1]
+            }
+        else:
+            return {
+                "exists": True,
+                "parent_domain": parent_domain,
+                "record": soa_records[0],
+                "primary_ns": None,
+                "admin_email": None
+            }
 
-    def analyze_domain(self, domain: str) -> Dict:
-        """Perform complete analysis of a domain."""
-        subdomain_info = self.discover_subdomains(domain)
-
-        # Get HTTP redirect info and HTML content in one request
-        http_redirect_info, html_content = self.check_http_redirect(domain)
-
-        # Analyze SRI using the captured HTML content
-        sri_info = self.check_sri(domain, html_content)
-
+    def plan_queries(self, domain: str, wildcard_probe: str) -> QueryPlan:
+        """Collect the DNS lookups every check in :meth:`analyze_domain` will make."""
+        plan = QueryPlan()
+        # discover_subdomains: wildcard baseline, then CNAME + A per prefix
+        plan.extend([(wildcard_probe, 'A'), (wildcard_probe, 'CNAME')])
+        for subdomain in self.common_subdomains:
+            fqdn = f"{subdomain}.{domain}"
+            plan.extend([(fqdn, 'CNAME'), (fqdn, 'A')])
+        # get_soa_record, check_spf, check_dkim, check_dmarc
+        plan.add(self.get_parent_domain(domain), 'SOA')
+        plan.add(domain, 'TXT')
+        plan.add(f"_domainkey.{domain}", 'TXT')  # NXDOMAIN here prunes every selector
+        plan.extend((f"{selector}._domainkey.{domain}", 'TXT') for selector in self.dkim_selectors)
+        plan.add(f"_dmarc.{domain}", 'TXT')
+        return plan
+
+    def prefetch(self, plan: QueryPlan, answers: Optional[Dict] = None) -> "tuple[Dict, int]":
+        """Resolve ``plan`` into an answer set; returns it with the number of queries sent.
+
+        Lookups already present in ``answers`` are not repeated. Up to
+        ``query_concurrency`` lookups are in flight at once.
+        """
+        answers = {} if answers is None else answers
+        issued = 0
+        queries = plan.pending(answers)
+        while queries:
+            for (name, rdtype), lookup in zip(queries, self._lookup_many(queries)):
+                issued += lookup.issued
+                plan.record(answers, name, rdtype, lookup)
+            # Second round only for merged CNAMEs the A responses could not answer
+            queries = plan.unresolved(answers)
+        return answers, issued
+
+    def _lookup_many(self, queries: List["tuple[str, str]"]) -> List[Lookup]:
+        """Resolve ``queries`` in order, up to ``query_concurrency`` at a time on threads."""
+        workers = min(self.query_concurrency, len(queries))
+        if workers <= 1:
+            return [self._lookup(name, rdtype) for name, rdtype in queries]
+        if self.executor is None:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(lambda query: self._lookup(*query), queries))
+
+        # `workers` tasks on the shared executor, each resolving queries until
+        # none are left, so one domain never holds more threads than that
+        results: List[Optional[Lookup]] = [None] * len(queries)
+        pending = iter(enumerate(queries))
+        lock = threading.Lock()
+
+        def drain() -> None:
+            while True:
+                with lock:
+                    item = next(pending, None)
+                if item is None:
+                    return
+                index, (name, rdtype) = item
+                results[index] = self._lookup(name, rdtype)
+
+        for future in [self.executor.submit(drain) for _ in range(workers)]:
+            future.result()
+        return results
+
+    def _preflight_queries(self, domain: str) -> List["tuple[str, str]"]:
+        """Lookups resolved before the rest of the plan.
+
+        The parent SOA and the name's own TXT decide liveness; ``_domainkey``
+        decides whether the DKIM selector scan is needed at all. All three are
+        part of the regular plan, so resolving them early costs nothing extra.
+        """
+        return [(self.get_parent_domain(domain), 'SOA'), (domain, 'TXT'), (f"_domainkey.{domain}", 'TXT')]
+
+    @staticmethod
+    def _dead_reason(soa: Lookup, txt: Lookup, ns: Optional[Lookup] = None) -> Optional[str]:
+        """Why a domain is dead, or ``None`` if it is (or may be) alive.
+
+        Dead means the name or its parent zone is NXDOMAIN (RFC 8020: nothing
+        exists below it), or the parent definitely has neither SOA nor NS
+        records. ``ns`` is only consulted — and only needs resolving — when the
+        SOA answer was negative. Failed lookups never make a domain dead.
+        """
+        if soa.nxdomain or txt.nxdomain:
+            return "NXDOMAIN"
+        if ns is not None and _is_negative(soa) and _is_negative(ns):
+            return "no SOA/NS"
+        return None
+
+    def preflight(self, domain: str, plan: QueryPlan, answers: Dict) -> "tuple[Optional[str], int]":
+        """Resolve the preflight lookups into ``answers``; returns the dead reason and queries sent.
+
+        A live domain whose ``_domainkey`` exists also gets the DKIM wildcard
+        probe (see :meth:`_record_dkim_probe`).
+        """
+        queries = self._preflight_queries(domain)
+        lookups = self._lookup_many(queries)
+        for (name, rdtype), lookup in zip(queries, lookups):
+            plan.record(answers, name, rdtype, lookup)
+        issued = sum(lookup.issued for lookup in lookups)
+        soa, txt = lookups[0], lookups[1]
+
+        ns = None
+        if self._dead_reason(soa, txt) is None and _is_negative(soa):
+            ns = self._lookup(queries[0][0], 'NS')
+            issued += ns.issued
+        reason = self._dead_reason(soa, txt, ns)
+        if reason is None and not lookups[2].nxdomain:
+            probe = self._dkim_probe_name(domain)
+            lookup = self._lookup(probe, 'TXT')
+            issued += lookup.issued
+            self._record_dkim_probe(domain, plan, answers, probe, lookup)
+        return reason, issued
+
+    def _dead_domain_result(self, domain: str, reason: str, plan: QueryPlan, answers: Dict, issued: int) -> Dict:
+        """Fast-path result for a dead domain, built from the liveness answers alone."""
+        parent_domain = self.get_parent_domain(domain)
         return {
             "domain": domain,
             "timestamp": datetime.now().isoformat(),
-            "soa": self.get_soa_record(domain),
-            "spf": self.check_spf(domain),
-            "dkim": self.check_dkim(domain),
-            "dmarc": self.check_dmarc(domain),
-            "subdomains": subdomain_info,
-            "http_redirect": http_redirect_info,
-            "sri": sri_info
+            "soa": self._soa_result(parent_domain, answers.get(query_key(parent_domain, 'SOA'))),
+            "spf": self._spf_result(answers.get(query_key(domain, 'TXT'))),
+            "dkim": self._dkim_result([]),
+            "dmarc": self._dmarc_result(None),
+            "subdomains": self._subdomain_result(None, []),
+            "http_redirect": {
+                "http_accessible": False,
+                "redirects_to_https": False,
+                "final_url": None,
+                "error": f"Skipped: domain is dead ({reason})",
+                "redirect_chain": []
+            },
+            "sri": self.check_sri(domain, ""),
+            "dns_queries": {"planned": plan.planned, "issued": issued},
+            "liveness": {"alive": False, "reason": reason,
+                         "skipped_queries": plan.pruned + len(plan.pending(answers)), "skipped_http": True}
         }
 
+    def _check_http_and_sri(self, domain: str) -> "tuple[Dict, Dict]":
+        """Fetch the site over HTTP and analyze SRI on the HTML as it streams in."""
+        scanner = make_scanner(self.html_backend, cache=self.scan_cache)
+        http_redirect_info = self._fetch_page(domain, scanner.feed)
+        scanner.close()
+        return http_redirect_info, self._sri_result(domain, scanner)
+
+    def analyze_domain(self, domain: str) -> Dict:
+        """Perform complete analysis of a domain.
+
+        All DNS lookups are planned and resolved first (see
+        :meth:`plan_queries`); the checks then read from that answer set.
+        With ``query_concurrency > 1`` the lookups run concurrently and the
+        HTTP fetch overlaps them, so the domain takes about as long as its
+        slowest request rather than the sum of all of them.
+
+        A few lookups are resolved first (see :meth:`preflight`): an
+        NXDOMAIN ``_domainkey``, or a random selector answering under it,
+        prunes the DKIM selector scan, and with
+        ``skip_dead_domains`` a dead domain (see :meth:`_dead_reason`) gets a
+        fast-path result with no further DNS queries and no HTTP fetch.
+        """
+        wildcard_probe = self._wildcard_probe_name(domain)
+        plan = self.plan_queries(domain, wildcard_probe)
+        answers: Dict = {}
+        liveness = None
+        reason, issued = self.preflight(domain, plan, answers)
+        if self.skip_dead_domains:
+            if reason is not None:
+                return self._dead_domain_result(domain, reason, plan, answers, issued)
+            liveness = {"alive": True, "reason": None, "skipped_queries": 0, "skipped_http": False}
+
+        http_pool = http_job = None
+        if self.query_concurrency > 1:
+            if self.executor is None:
+                http_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+            http_job = (self.executor or http_pool).submit(self._check_http_and_sri, domain)
+
+        try:
+            self._answers, more = self.prefetch(plan, answers)
+            issued += more
+            subdomain_info = self.discover_subdomains(domain, wildcard_probe)
+
+            if http_job is not None:
+                http_redirect_info, sri_info = http_job.result()
+            else:
+                http_redirect_info, sri_info = self._check_http_and_sri(domain)
+
+            result = {
+                "domain": domain,
+                "timestamp": datetime.now().isoformat(),
+                "soa": self.get_soa_record(domain),
+                "spf": self.check_spf(domain),
+                "dkim": self.check_dkim(domain),
+                "dmarc": self.check_dmarc(domain),
+                "subdomains": subdomain_info,
+                "http_redirect": http_redirect_info,
+                "sri": sri_info,
+                "dns_queries": {"planned": plan.planned, "issued": issued}
+            }
+            if liveness is not None:
+                result["liveness"] = liveness
+            return result
+        finally:
+            self._answers = None
+            if http_pool is not None:
+                http_pool.shutdown(wait=False)
+
 
 # Column order for the analysis report CSV. Kept as a module-level constant so
 # consumers (CLI, web UI, diff tooling) share one source of truth.
@@ -477,48 +879,259 @@ def write_results_csv(results: List[Dict], output_file: str) -> None:
     Shared by the CLI and the web UI so the 29-column layout has a single
     definition.
     """
-    with open(output_file, 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(CSV_COLUMNS)
+    with ResultWriter(output_file) as writer:
         for r in results:
-            writer.writerow(_result_to_row(r))
+            writer.write(r)
+
+
+def _truncate_partial_row(path: str) -> None:
+    """Cut a trailing row that an interrupted run left half-written."""
+    with open(path, 'r+b') as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            start = max(0, pos - _WRITE_BUFFER_BYTES)
+            f.seek(start)
+            # +1 so a terminator straddling two blocks is still seen
+            block = f.read(min(end, pos + 1) - start)
+            i = block.rfind(_ROW_END)
+            if i != -1:
+                f.truncate(start + i + len(_ROW_END))
+                return
+            pos = start
+        f.truncate(0)
+
+
+def completed_domains(output_file: str) -> Set[str]:
+    """Domains already in the report CSV an interrupted run left at ``output_file``.
+
+    A half-written last row is truncated away so new rows can be appended
+    after it. Returns an empty set if the file does not exist; raises
+    ``ValueError`` if it is not a report CSV.
+    """
+    if not os.path.exists(output_file):
+        return set()
+    _truncate_partial_row(output_file)
+    with open(output_file, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is not None and header != CSV_COLUMNS:
+            raise ValueError(f"{output_file} is not a domain analysis report; refusing to resume into it")
+        return {row[0] for row in reader if row}
+
+
+class ResultWriter:
+    """Stream result dicts to the report CSV as they arrive.
+
+    Rows go through a buffered file and are flushed and fsynced to disk every
+    ``sync_every`` rows or ``sync_interval`` seconds, whichever comes first,
+    and on :meth:`close`; a crash or Ctrl-C loses at most that window. With
+    ``filtered_subdomains_file`` the filtered subdomains of each result are
+    streamed to that second CSV the same way. ``append`` adds to existing
+    files (writing the header only into empty ones) instead of replacing them.
+    """
+
+    def __init__(self, output_file: str, filtered_subdomains_file: Optional[str] = None, *,
+                 sync_every: int = 100, sync_interval: float = 5.0, append: bool = False) -> None:
+        self.append = append
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.rows = 0
+        self._files = []
+        self._writer = self._open(output_file, CSV_COLUMNS)
+        self._filtered_writer = None
+        if filtered_subdomains_file:
+            self._filtered_writer = self._open(filtered_subdomains_file, ['Domain', 'Filtered Subdomains'])
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _open(self, path: str, header: List[str]):
+        f = open(path, 'a' if self.append else 'w', newline='', buffering=_WRITE_BUFFER_BYTES)
+        self._files.append(f)
+        writer = csv.writer(f, lineterminator=_ROW_END.decode())
+        if f.tell() == 0:
+            writer.writerow(header)
+        return writer
+
+    def write(self, r: Dict) -> None:
+        self._writer.writerow(_result_to_row(r))
+        if self._filtered_writer is not None:
+            filtered = r.get('subdomains', {}).get('filtered_subdomains', [])
+            if filtered:
+                self._filtered_writer.writerow([r['domain'], ','.join(filtered)])
+        self.rows += 1
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def sync(self) -> None:
+        """Flush buffered rows and force them to disk."""
+        for f in self._files:
+            f.flush()
+            os.fsync(f.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        if not self._files:
+            return
+        try:
+            self.sync()
+        finally:
+            for f in self._files:
+                f.close()
+            self._files = []
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _error_result(domain: str, error: str) -> Dict:
+    """Placeholder result carrying every field the CSV needs for a failed domain."""
+    return {
+        "domain": domain,
+        "timestamp": datetime.now().isoformat(),
+        "error": error,
+        "soa": {"exists": False, "parent_domain": domain, "record": None, "primary_ns": None, "admin_email": None},
+        "spf": {"exists": False, "record": None},
+        "dkim": {"exists": False, "records": []},
+        "dmarc": {"exists": False, "record": None},
+        "subdomains": {"subdomains": [], "cname_records": {}, "has_wildcard_dns": False, "hosting_provider": None, "filtered_subdomains": []},
+        "http_redirect": {"http_accessible": False, "redirects_to_https": False, "final_url": None, "error": error, "redirect_chain": []},
+        "sri": {"sri_enabled": False, "total_external_resources": 0, "resources_with_sri": 0, "sri_coverage_percentage": 0, "missing_sri_count": 0, "sri_algorithms_used": [], "error": "Domain analysis failed"}
+    }
+
+
+def _read_domains(input_file: str, skip: Set[str] = frozenset()) -> Iterator[str]:
+    """The domains in ``input_file``, one per non-blank line, read lazily."""
+    with open(input_file, 'r') as f:
+        for line in f:
+            domain = line.strip()
+            if domain and domain not in skip:
+                yield domain
 
 
-def analyze_domains_from_file(input_file: str, output_file: str, max_workers: int = 10, *, include_wildcard_matches: bool = False, filtered_subdomains_file: Optional[str] = None, progress_callback: Optional[Callable[[int, int], None]] = None):
+def analyze_domains_from_file(input_file: str, output_file: str, max_workers: int = 10, *, include_wildcard_matches: bool = False, filtered_subdomains_file: Optional[str] = None, progress_callback: Optional[Callable[[int, int], None]] = None, engine: str = "threads", concurrency: int = 500, dns_cache_mb: int = 64, query_concurrency: int = 16, skip_dead_domains: bool = True, dkim_selectors: Optional[List[str]] = None, nameservers: Optional[List[str]] = None, resolver_strategy: str = "round-robin", hedge_budget: float = 0.05, max_inflight: int = 256, disk_cache: bool = False, disk_cache_path: Optional[str] = None, disk_cache_mb: int = 256, http_pool_hosts: int = 64, http_pool_size: Optional[int] = None, http_keep_alive: bool = True, html_backend: str = "scanner", resume: bool = False, schedule: bool = False):
     """Analyze multiple domains from a file and save results to CSV.
 
+    Each result is written to ``output_file`` (and ``filtered_subdomains_file``)
+    as soon as its domain finishes, through a :class:`ResultWriter` that syncs
+    to disk periodically, so an interrupted run keeps the rows written so far
+    and memory does not grow with the number of domains. Rows are in
+    completion order. The input file is likewise read as workers free up,
+    with at most a few domains per worker queued ahead.
+
+    With ``resume``, domains already in an existing ``output_file`` (see
+    :func:`completed_domains`) are skipped and the rest are appended to it,
+    so an interrupted run can be continued where it stopped.
+
+    With ``schedule``, the list is first normalized (lower case, IDNA),
+    deduplicated and ordered by registered domain and name servers (see
+    :func:`~domain_security_analyzer.scheduler.schedule_domains`) so that
+    lookups shared between related domains find warm caches; this costs an
+    NS query per registered domain and holds the list in memory.
+
     ``progress_callback``, if given, is invoked as ``callback(completed, total)``
     after each domain finishes — used by the web UI to drive a progress bar.
+
+    ``engine`` selects the execution model: ``"threads"`` (default) analyzes
+    ``max_workers`` domains at a time on a thread pool with blocking DNS;
+    ``"async"`` runs the :mod:`~domain_security_analyzer.async_analyzer`
+    engine on one event loop, with ``max_workers`` domains in flight and at
+    most ``concurrency`` outstanding DNS queries overall.
+
+    All workers share one :class:`~domain_security_analyzer.dnscache.DNSCache`
+    capped at ``dns_cache_mb`` megabytes (``0`` disables caching). With
+    ``disk_cache`` it is backed by a
+    :class:`~domain_security_analyzer.diskcache.DiskDNSCache` at
+    ``disk_cache_path`` (default: in the data directory) capped at
+    ``disk_cache_mb``, so unexpired answers are reused by later runs.
+
+    HTTP fetches share one pooled session keeping up to ``http_pool_size``
+    connections (default: one per concurrent fetch) to each of
+    ``http_pool_hosts`` hosts alive; ``http_keep_alive=False`` closes every
+    connection after use. Connection reuse is printed at the end.
+    ``html_backend="bs4"`` extracts SRI tags with BeautifulSoup instead of
+    the streaming scanner. Pages identical to one already parsed in the run
+    reuse its scan; the number of parses avoided is printed at the end.
+
+    ``query_concurrency`` (threaded engine) lets each worker resolve up to that
+    many of its domain's lookups at once, and fetch the page meanwhile, on
+    one executor shared by the whole run; the async engine always fans out.
+
+    ``skip_dead_domains`` short-circuits domains whose apex does not exist
+    (see :meth:`DomainAnalyzer.analyze_domain`). ``dkim_selectors`` replaces
+    the bundled DKIM selector list.
+
+    DNS goes through one :class:`~domain_security_analyzer.resolver.ResolverPool`
+    over ``nameservers`` (default: the system resolvers), picking upstreams by
+    ``resolver_strategy`` and throttling each one adaptively (at most
+    ``max_inflight`` queries in flight per upstream); per-upstream stats are
+    printed at the end.
+    Up to ``hedge_budget`` of the queries are hedged to a second upstream
+    when slow (``0`` disables hedging); the hedge rate and p50/p99 latency
+    with and without hedging are printed too.
     """
+    if engine not in ("threads", "async"):
+        raise ValueError(f"Unknown engine: {engine!r} (expected 'threads' or 'async')")
 
-    # Read domains from input file
-    with open(input_file, 'r') as f:
-        domains = [line.strip() for line in f if line.strip()]
+    done: Set[str] = set()
+    if resume:
+        done = completed_domains(output_file)
+        if filtered_subdomains_file and os.path.exists(filtered_subdomains_file):
+            _truncate_partial_row(filtered_subdomains_file)
 
-    total_domains = len(domains)
     completed = 0
-
-    def analyze_single_domain(domain: str) -> Dict:
-        """Worker function for parallel processing"""
+    dns_cache = None
+    if disk_cache:
+        from .diskcache import DiskDNSCache
+
+        disk = DiskDNSCache(disk_cache_path, max_bytes=disk_cache_mb * 1024 * 1024)
+        dns_cache = DNSCache(max_bytes=max(0, dns_cache_mb) * 1024 * 1024, disk=disk)
+    elif dns_cache_mb > 0:
+        dns_cache = DNSCache(max_bytes=dns_cache_mb * 1024 * 1024)
+    resolver_pool = ResolverPool(nameservers, strategy=resolver_strategy, hedge_budget=hedge_budget,
+                                 max_inflight=max_inflight)
+    # Threaded engine: one fetch per worker; async engine: one per HTTP thread
+    fetchers = max_workers if engine == "threads" else min(max_workers, 128)
+    # Identical pages (parking pages, shared landing pages) are parsed once
+    scan_cache = ScanCache()
+    http_session = make_session(pool_connections=http_pool_hosts, pool_maxsize=http_pool_size or fetchers,
+                                keep_alive=http_keep_alive)
+    # Per-domain lookups and the page fetch of every threaded worker run on
+    # one executor: query_concurrency lookups plus the fetch per worker.
+    # Threads (and, with the disk cache, their SQLite connections) are then
+    # reused across domains instead of started for each one.
+    fan_out = None
+    if engine == "threads" and query_concurrency > 1:
+        fan_out = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers * (query_concurrency + 1), thread_name_prefix="domain-fan-out")
+
+    if schedule:
+        # Looked up through the run's cache and resolvers, so the NS answers stay warm
+        probe = DomainAnalyzer(dns_cache=dns_cache, resolver_pool=resolver_pool)
+        # Finished domains are dropped first, so their zones cost no NS lookups;
+        # compared normalized, as the scheduler emits (and the output records) them
+        done_names = {normalize_domain(domain) for domain in done}
+        pending = (domain for domain in _read_domains(input_file) if normalize_domain(domain) not in done_names)
+        domains, schedule_stats = schedule_domains(
+            pending, ns_lookup=lambda zone: probe.get_dns_record(zone, 'NS'), workers=max_workers)
+        total_domains = len(domains)
+        print(f"Scheduler: {schedule_stats['duplicates']} duplicates removed, "
+              f"{schedule_stats['input'] - schedule_stats['duplicates']} domains in {schedule_stats['zones']} "
+              f"zones, {schedule_stats['ns_groups']} name-server groups")
+    else:
+        # The input is only counted up front; domains are read as workers free up
+        total_domains = sum(1 for _ in _read_domains(input_file, done))
+        domains = _read_domains(input_file, done)
+    if done:
+        print(f"Resuming: {len(done)} domains already in {output_file}, {total_domains} left")
+
+    def report_progress() -> None:
         nonlocal completed
-        analyzer = DomainAnalyzer(include_wildcard_matches=include_wildcard_matches, collect_filtered=bool(filtered_subdomains_file))  # Create new instance for thread safety
-        try:
-            result = analyzer.analyze_domain(domain)
-        except Exception as e:
-            # Create error result with all required fields for CSV
-            result = {
-                "domain": domain,
-                "timestamp": datetime.now().isoformat(),
-                "error": str(e),
-                "soa": {"exists": False, "parent_domain": domain, "record": None, "primary_ns": None, "admin_email": None},
-                "spf": {"exists": False, "record": None},
-                "dkim": {"exists": False, "records": []},
-                "dmarc": {"exists": False, "record": None},
-                "subdomains": {"subdomains": [], "cname_records": {}, "has_wildcard_dns": False, "hosting_provider": None, "filtered_subdomains": []},
-                "http_redirect": {"http_accessible": False, "redirects_to_https": False, "final_url": None, "error": str(e), "redirect_chain": []},
-                "sri": {"sri_enabled": False, "total_external_resources": 0, "resources_with_sri": 0, "sri_coverage_percentage": 0, "missing_sri_count": 0, "sri_algorithms_used": [], "error": "Domain analysis failed"}
-            }
-
         completed += 1
         print(f"Progress: {completed}/{total_domains} domains analyzed ({(completed/total_domains)*100:.1f}%)")
         if progress_callback is not None:
@@ -526,46 +1139,135 @@ def analyze_domains_from_file(input_file: str, output_file: str, max_workers: in
                 progress_callback(completed, total_domains)
             except Exception:
                 pass  # progress reporting must never break analysis
-        return result
 
-    results = []
-    print(f"Starting analysis of {total_domains} domains using {max_workers} parallel workers...")
+    def analyze_single_domain(domain: str) -> Dict:
+        """Worker function for parallel processing"""
+        analyzer = DomainAnalyzer(include_wildcard_matches=include_wildcard_matches, collect_filtered=bool(filtered_subdomains_file), dns_cache=dns_cache, query_concurrency=query_concurrency, skip_dead_domains=skip_dead_domains, dkim_selectors=dkim_selectors, resolver_pool=resolver_pool, http_session=http_session, html_backend=html_backend, scan_cache=scan_cache, executor=fan_out)  # Create new instance for thread safety
+        try:
+            result = analyzer.analyze_domain(domain)
+        except Exception as e:
+            # Create error result with all required fields for CSV
+            result = _error_result(domain, str(e))
 
-    # Use ThreadPoolExecutor for parallel processing
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_domain = {executor.submit(analyze_single_domain, domain): domain for domain in domains}
+        report_progress()
+        return result
 
-        for future in concurrent.futures.as_completed(future_to_domain):
-            domain = future_to_domain[future]
-            try:
-                result = future.result()
-                results.append(result)
-            except Exception as e:
-                print(f"Error analyzing {domain}: {str(e)}")
-                # Create error result with all required fields for CSV
-                error_result = {
-                    "domain": domain,
-                    "timestamp": datetime.now().isoformat(),
-                    "error": str(e),
-                    "soa": {"exists": False, "parent_domain": domain, "record": None, "primary_ns": None, "admin_email": None},
-                    "spf": {"exists": False, "record": None},
-                    "dkim": {"exists": False, "records": []},
-                    "dmarc": {"exists": False, "record": None},
-                    "subdomains": {"subdomains": [], "cname_records": {}, "has_wildcard_dns": False, "hosting_provider": None},
-                    "http_redirect": {"http_accessible": False, "redirects_to_https": False, "final_url": None, "error": str(e), "redirect_chain": []},
-                    "sri": {"sri_enabled": False, "total_external_resources": 0, "resources_with_sri": 0, "sri_coverage_percentage": 0, "missing_sri_count": 0, "sri_algorithms_used": [], "error": "Domain analysis failed"}
-                }
-                results.append(error_result)
-
-    # Write results to CSV
-    write_results_csv(results, output_file)
-
-    # Optionally write filtered subdomains to a separate CSV
-    if filtered_subdomains_file:
-        with open(filtered_subdomains_file, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(['Domain', 'Filtered Subdomains'])
-            for r in results:
-                filtered = r.get('subdomains', {}).get('filtered_subdomains', [])
-                if filtered:
-                    writer.writerow([r['domain'], ','.join(filtered)])
+    # Only running totals are kept; each result is written out as it completes
+    planned = issued = dead = skipped_queries = skipped_http = 0
+
+    def record(result: Dict) -> None:
+        nonlocal planned, issued, dead, skipped_queries, skipped_http
+        writer.write(result)
+        planned += result.get('dns_queries', {}).get('planned', 0)
+        issued += result.get('dns_queries', {}).get('issued', 0)
+        liveness = result.get('liveness', {})
+        if not liveness.get('alive', True):
+            dead += 1
+            skipped_queries += liveness['skipped_queries']
+            skipped_http += liveness['skipped_http']
+
+    with ResultWriter(output_file, filtered_subdomains_file, append=resume) as writer:
+        if engine == "async":
+            import asyncio
+
+            from .async_analyzer import analyze_domains_async
+
+            print(f"Starting analysis of {total_domains} domains using the async engine "
+                  f"({max_workers} domains in flight, {concurrency} concurrent DNS queries)...")
+            asyncio.run(analyze_domains_async(
+                domains,
+                total=total_domains,
+                concurrency=concurrency,
+                max_domains=max_workers,
+                include_wildcard_matches=include_wildcard_matches,
+                collect_filtered=bool(filtered_subdomains_file),
+                dns_cache=dns_cache,
+                skip_dead_domains=skip_dead_domains,
+                dkim_selectors=dkim_selectors,
+                resolver_pool=resolver_pool,
+                http_session=http_session,
+                html_backend=html_backend,
+                scan_cache=scan_cache,
+                progress_callback=lambda done, total: report_progress(),
+                on_result=record,
+            ))
+        else:
+            print(f"Starting analysis of {total_domains} domains using {max_workers} parallel workers...")
+
+            # Use ThreadPoolExecutor for parallel processing, keeping at most
+            # `window` domains submitted so memory does not grow with the input
+            window = _WINDOW_PER_WORKER * max_workers
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                future_to_domain: Dict[concurrent.futures.Future, str] = {}
+                pending = iter(domains)
+                while True:
+                    for domain in itertools.islice(pending, window - len(future_to_domain)):
+                        future_to_domain[executor.submit(analyze_single_domain, domain)] = domain
+                    if not future_to_domain:
+                        break
+                    finished, _ = concurrent.futures.wait(
+                        future_to_domain, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in finished:
+                        domain = future_to_domain.pop(future)
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            print(f"Error analyzing {domain}: {str(e)}")
+                            # Create error result with all required fields for CSV
+                            result = _error_result(domain, str(e))
+                        record(result)
+
+    if fan_out is not None:
+        fan_out.shutdown(wait=True)
+
+    if planned:
+        print(f"DNS queries: {issued} issued for {planned} planned "
+              f"({(1 - issued / planned) * 100:.1f}% saved by planning, pruning and caching)")
+
+    if dead:
+        print(f"Dead domains: {dead} short-circuited, skipping "
+              f"{skipped_queries} DNS queries and {skipped_http} HTTP fetches")
+
+    if dns_cache is not None:
+        stats = dns_cache.stats()
+        print(f"DNS cache: {stats['hits']} hits ({stats['negative_hits']} negative), "
+              f"{stats['misses']} misses, hit rate {stats['hit_rate'] * 100:.1f}%, "
+              f"{stats['entries']} entries, {stats['evictions']} evicted")
+        if dns_cache.disk is not None:
+            # Counted once this run's answers are in and compacted, but before
+            # closing: stats() would open a fresh connection to a closed cache
+            dns_cache.disk.flush()
+            dns_cache.disk.compact()
+            disk_stats = dns_cache.disk.stats()
+            dns_cache.close()
+            print(f"Disk DNS cache: {stats['disk_hits']} answers reused from earlier runs, "
+                  f"{disk_stats['entries']} entries ({disk_stats['bytes'] / 1048576:.1f} MB) "
+                  f"in {disk_stats['path']}")
+
+    for name, stats in resolver_pool.stats().items():
+        latency = f"{stats['ewma_ms']:.0f} ms" if stats['ewma_ms'] is not None else "n/a"
+        print(f"Resolver {name}: {stats['queries']} queries, {stats['errors']} errors "
+              f"({stats['timeouts']} timeouts), latency {latency}, {stats['ejections']} ejections, "
+              f"in-flight limit {stats['inflight_limit']} (peak {stats['inflight_peak']}, "
+              f"{stats['backoffs']} backoffs){'' if stats['healthy'] else ' [ejected]'}")
+    if resolver_pool.retried or resolver_pool.failed:
+        print(f"DNS retries: {resolver_pool.retried} lookups retried after failing on every resolver, "
+              f"{resolver_pool.failed} still unresolved (reported as missing records)")
+
+    http_stats = http_session.connection_stats.stats()
+    if http_stats['requests']:
+        print(f"HTTP connections: {http_stats['requests']} requests over {http_stats['connections_opened']} "
+              f"connections ({http_stats['connections_reused']} reused, {http_stats['reuse_rate'] * 100:.1f}%)")
+    http_session.close()
+
+    scan_stats = scan_cache.stats()
+    if scan_stats['parses_avoided']:
+        print(f"HTML scan cache: {scan_stats['parses_avoided']} of {scan_stats['pages']} pages were identical "
+              f"to one already parsed ({scan_stats['entries']} distinct pages cached)")
+
+    latency = resolver_pool.latency_stats()
+    if latency['effective_p50_ms'] is not None:
+        print(f"DNS latency: p50 {latency['effective_p50_ms']:.0f} ms, p99 {latency['effective_p99_ms']:.0f} ms "
+              f"(unhedged: p50 {latency['primary_p50_ms']:.0f} ms, p99 {latency['primary_p99_ms']:.0f} ms); "
+              f"hedged {latency['hedged']} of {latency['lookups']} queries "
+              f"({latency['hedge_rate'] * 100:.1f}%), {latency['hedge_wins']} won")
@@ -0,0 +1,386 @@
+"""Asyncio-native analysis engine.
+
+:class:`AsyncDomainAnalyzer` runs the same checks as
+:class:`~domain_security_analyzer.analyzer.DomainAnalyzer` but resolves DNS with
+``dns.asyncresolver``, so thousands of queries can be in flight on a single
+event loop instead of one blocking query per worker thread. Results use the
+exact dict schema of the threaded engine, so
+:func:`~domain_security_analyzer.analyzer.write_results_csv` works unchanged.
+
+Typical use::
+
+    import asyncio
+    from domain_security_analyzer.async_analyzer import analyze_domains_async
+
+    results = asyncio.run(analyze_domains_async(domains, concurrency=1000))
+"""
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextvars
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sized, Tuple
+
+import dns.exception
+import dns.resolver
+import requests
+
+from .analyzer import DomainAnalyzer, _error_result, _is_negative, _is_positive
+from .dnscache import DNSCache
+from .htmlscan import ScanCache
+from .http_session import make_session
+from .planner import Lookup, QueryPlan, is_nxdomain, query_key, response_from_exception
+from .resolver import ResolverPool
+
+__all__ = ["AsyncDomainAnalyzer", "analyze_domains_async"]
+
+# Prefetched answer set of the domain analyzed by the current task. One
+# AsyncDomainAnalyzer serves many domains at once, so this cannot be an
+# instance attribute as in the threaded engine.
+_current_answers: contextvars.ContextVar = contextvars.ContextVar("answers", default=None)
+
+
+class AsyncDomainAnalyzer(DomainAnalyzer):
+    """Coroutine flavour of :class:`DomainAnalyzer`.
+
+    The DNS-bound checks and :meth:`analyze_domain` are coroutines with the
+    same names and return values as their synchronous counterparts; result
+    building and SRI parsing are inherited unchanged. Every query goes through
+    ``limiter`` (an :class:`asyncio.Semaphore`) when one is given, so a single
+    semaphore shared by all analyzers caps in-flight queries globally.
+
+    The HTTP fetch and SRI parse are blocking and run on ``http_executor``
+    (the loop's default executor when ``None``). One instance may analyze
+    many domains concurrently.
+    """
+
+    def __init__(
+        self,
+        include_wildcard_matches: bool = False,
+        collect_filtered: bool = False,
+        *,
+        limiter: Optional[asyncio.Semaphore] = None,
+        http_executor: Optional[concurrent.futures.Executor] = None,
+        dns_cache: Optional[DNSCache] = None,
+        skip_dead_domains: bool = True,
+        dkim_selectors: Optional[List[str]] = None,
+        resolver_pool: Optional[ResolverPool] = None,
+        http_session: Optional[requests.Session] = None,
+        html_backend: str = "scanner",
+        scan_cache: Optional[ScanCache] = None,
+    ):
+        super().__init__(include_wildcard_matches=include_wildcard_matches, collect_filtered=collect_filtered,
+                         dns_cache=dns_cache, skip_dead_domains=skip_dead_domains, dkim_selectors=dkim_selectors,
+                         resolver_pool=resolver_pool, http_session=http_session, html_backend=html_backend,
+                         scan_cache=scan_cache)
+        self.limiter = limiter
+        self.http_executor = http_executor
+
+    @property
+    def _answers(self):
+        return _current_answers.get()
+
+    @_answers.setter
+    def _answers(self, answers) -> None:
+        _current_answers.set(answers)
+
+    async def get_dns_record(self, domain: str, record_type: str) -> Optional[List[str]]:
+        """Query DNS records of specified type for a domain."""
+        if self._answers is not None:
+            key = query_key(domain, record_type)
+            if key in self._answers:
+                return self._answers[key]
+        return (await self._lookup(domain, record_type)).records
+
+    async def _lookup(self, domain: str, record_type: str) -> Lookup:
+        # Cache hits never take a concurrency slot.
+        cached = self._cached_lookup(domain, record_type)
+        if cached is not None:
+            return cached
+        if self.limiter is None:
+            return await self._query(domain, record_type)
+        async with self.limiter:
+            return await self._query(domain, record_type)
+
+    async def _query(self, domain: str, record_type: str) -> Lookup:
+        # Mirrors DomainAnalyzer._lookup's error mapping exactly.
+        try:
+            answers = await self.resolver.resolve_async(domain, record_type)
+            return Lookup(self._remember(domain, record_type, answers), answers.response, True)
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer) as e:
+            if self.dns_cache is not None:
+                self.dns_cache.put_negative(domain, record_type, e)
+            return Lookup(None, response_from_exception(e), True, is_nxdomain(e))
+        except (dns.exception.Timeout, dns.resolver.NoNameservers):
+            # Every upstream timed out, SERVFAILed or REFUSED, even after retries
+            return Lookup(None, None, True)
+        except Exception as e:
+            if "SERVFAIL" in str(e):
+                return Lookup(None, None, True)  # Common on Windows when DNS server is unreachable
+            return Lookup(f"Error: {str(e)}", None, True)
+
+    async def _gather_records(self, queries: List[Tuple[str, str]]) -> list:
+        """Resolve ``(name, rdtype)`` pairs concurrently; failures come back as exceptions."""
+        return await asyncio.gather(
+            *(self.get_dns_record(name, rdtype) for name, rdtype in queries),
+            return_exceptions=True,
+        )
+
+    async def check_spf(self, domain: str) -> Dict:
+        """Check SPF record for domain."""
+        return self._spf_result(await self.get_dns_record(domain, 'TXT'))
+
+    async def check_dkim(self, domain: str, selectors: Optional[List[str]] = None) -> Dict:
+        """Check DKIM records for domain, probing all selectors concurrently.
+
+        Outside :meth:`analyze_domain` the scan is skipped when
+        ``_domainkey.<domain>`` is NXDOMAIN or a random selector answers too
+        (wildcard TXT).
+        """
+        selectors = self.dkim_selectors if selectors is None else selectors
+        if self._answers is None:
+            if (await self._lookup(f"_domainkey.{domain}", 'TXT')).nxdomain:
+                return self._dkim_result([])
+            if _is_positive(await self._lookup(self._dkim_probe_name(domain), 'TXT')):
+                return self._dkim_result([])
+        records = await asyncio.gather(
+            *(self.get_dns_record(f"{selector}._domainkey.{domain}", 'TXT') for selector in selectors)
+        )
+        return self._dkim_result(zip(selectors, records))
+
+    async def check_dmarc(self, domain: str) -> Dict:
+        """Check DMARC record for domain."""
+        return self._dmarc_result(await self.get_dns_record(f"_dmarc.{domain}", 'TXT'))
+
+    async def discover_subdomains(self, domain: str, wildcard_probe: Optional[str] = None) -> Dict:
+        """Discover subdomains, issuing the baseline and all probes concurrently."""
+        random_sub = wildcard_probe or self._wildcard_probe_name(domain)
+        fqdns = [f"{subdomain}.{domain}" for subdomain in self.common_subdomains]
+        queries = [(random_sub, 'A'), (random_sub, 'CNAME')]
+        for fqdn in fqdns:
+            queries += [(fqdn, 'CNAME'), (fqdn, 'A')]
+        answers = await self._gather_records(queries)
+
+        wildcard_a, wildcard_cname = answers[0], answers[1]
+        if isinstance(wildcard_a, BaseException) or isinstance(wildcard_cname, BaseException):
+            baseline = None
+        else:
+            baseline = (wildcard_a, wildcard_cname)
+
+        probes = []
+        for i, fqdn in enumerate(fqdns):
+            cname, a_records = answers[2 + 2 * i], answers[3 + 2 * i]
+            if isinstance(cname, BaseException) or isinstance(a_records, BaseException):
+                continue
+            probes.append((fqdn, cname, a_records))
+
+        return self._subdomain_result(baseline, probes)
+
+    async def get_soa_record(self, domain: str) -> Dict:
+        """Get SOA (Start of Authority) record for the parent domain."""
+        parent_domain = self.get_parent_domain(domain)
+        try:
+            soa_records = await self.get_dns_record(parent_domain, 'SOA')
+        except Exception as e:
+            return {
+                "exists": False,
+                "parent_domain": parent_domain,
+                "record": None,
+                "error": str(e)
+            }
+        return self._soa_result(parent_domain, soa_records)
+
+    async def check_http_redirect(self, domain: str) -> "tuple[Dict, str]":
+        """Run the blocking HTTP redirect check on ``http_executor``."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.http_executor, DomainAnalyzer.check_http_redirect, self, domain
+        )
+
+    async def preflight(self, domain: str, plan: QueryPlan, answers: Dict) -> "tuple[Optional[str], int]":
+        """Resolve the preflight lookups into ``answers``; returns the dead reason and queries sent.
+
+        A live domain whose ``_domainkey`` exists also gets the DKIM wildcard
+        probe (see :meth:`_record_dkim_probe`).
+        """
+        queries = self._preflight_queries(domain)
+        lookups = await asyncio.gather(*(self._lookup(name, rdtype) for name, rdtype in queries))
+        for (name, rdtype), lookup in zip(queries, lookups):
+            plan.record(answers, name, rdtype, lookup)
+        issued = sum(lookup.issued for lookup in lookups)
+        soa, txt = lookups[0], lookups[1]
+
+        ns = None
+        if self._dead_reason(soa, txt) is None and _is_negative(soa):
+            ns = await self._lookup(queries[0][0], 'NS')
+            issued += ns.issued
+        reason = self._dead_reason(soa, txt, ns)
+        if reason is None and not lookups[2].nxdomain:
+            probe = self._dkim_probe_name(domain)
+            lookup = await self._lookup(probe, 'TXT')
+            issued += lookup.issued
+            self._record_dkim_probe(domain, plan, answers, probe, lookup)
+        return reason, issued
+
+    async def prefetch(self, plan: QueryPlan, answers: Optional[Dict] = None) -> "tuple[Dict, int]":
+        """Resolve ``plan`` concurrently; returns the answer set and queries sent.
+
+        Lookups already present in ``answers`` are not repeated.
+        """
+        answers = {} if answers is None else answers
+        issued = 0
+        queries = plan.pending(answers)
+        while queries:
+            lookups = await asyncio.gather(*(self._lookup(name, rdtype) for name, rdtype in queries))
+            for (name, rdtype), lookup in zip(queries, lookups):
+                issued += lookup.issued
+                plan.record(answers, name, rdtype, lookup)
+            # Second round only for merged CNAMEs the A responses could not answer
+            queries = plan.unresolved(answers)
+        return answers, issued
+
+    async def analyze_domain(self, domain: str) -> Dict:
+        """Perform complete analysis of a domain with all lookups in flight at once."""
+        wildcard_probe = self._wildcard_probe_name(domain)
+        plan = self.plan_queries(domain, wildcard_probe)
+        answers: Dict = {}
+        liveness = None
+        reason, issued = await self.preflight(domain, plan, answers)
+        if self.skip_dead_domains:
+            if reason is not None:
+                return self._dead_domain_result(domain, reason, plan, answers, issued)
+            liveness = {"alive": True, "reason": None, "skipped_queries": 0, "skipped_http": False}
+
+        loop = asyncio.get_running_loop()
+        # The HTTP fetch and the SRI parse of its body are both blocking, so
+        # they share one executor job that overlaps the DNS work.
+        http_job = loop.run_in_executor(self.http_executor, self._check_http_and_sri, domain)
+        try:
+            answers, more = await self.prefetch(plan, answers)
+            issued += more
+            self._answers = answers
+            try:
+                subdomain_info, soa, spf, dkim, dmarc = await asyncio.gather(
+                    self.discover_subdomains(domain, wildcard_probe),
+                    self.get_soa_record(domain),
+                    self.check_spf(domain),
+                    self.check_dkim(domain),
+                    self.check_dmarc(domain),
+                )
+            finally:
+                self._answers = None
+        except BaseException:
+            # Nothing awaits the fetch on this path
+            http_job.cancel()
+            raise
+        http_redirect_info, sri_info = await http_job
+
+        result = {
+            "domain": domain,
+            "timestamp": datetime.now().isoformat(),
+            "soa": soa,
+            "spf": spf,
+            "dkim": dkim,
+            "dmarc": dmarc,
+            "subdomains": subdomain_info,
+            "http_redirect": http_redirect_info,
+            "sri": sri_info,
+            "dns_queries": {"planned": plan.planned, "issued": issued}
+        }
+        if liveness is not None:
+            result["liveness"] = liveness
+        return result
+
+
+async def analyze_domains_async(
+    domains: Iterable[str],
+    *,
+    concurrency: int = 500,
+    max_domains: int = 100,
+    include_wildcard_matches: bool = False,
+    collect_filtered: bool = False,
+    http_workers: Optional[int] = None,
+    dns_cache: Optional[DNSCache] = None,
+    skip_dead_domains: bool = True,
+    dkim_selectors: Optional[List[str]] = None,
+    resolver_pool: Optional[ResolverPool] = None,
+    http_session: Optional[requests.Session] = None,
+    html_backend: str = "scanner",
+    scan_cache: Optional[ScanCache] = None,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    on_result: Optional[Callable[[Dict], None]] = None,
+    total: Optional[int] = None,
+) -> List[Dict]:
+    """Analyze ``domains`` on the running event loop and return results in input order.
+
+    ``concurrency`` caps outstanding DNS queries across the whole run and
+    ``max_domains`` caps how many domains are being analyzed at once. HTTP
+    fetches run on a thread pool of ``http_workers`` threads (default:
+    ``min(max_domains, 128)``). Pass a shared ``dns_cache`` to reuse answers
+    across domains; ``skip_dead_domains`` short-circuits domains whose apex
+    does not exist; ``dkim_selectors`` replaces the bundled DKIM selector
+    list. ``resolver_pool`` overrides the system resolvers and ``http_session``
+    the pooled HTTP session (see :func:`~domain_security_analyzer.http_session.make_session`);
+    ``html_backend="bs4"`` extracts SRI tags with BeautifulSoup, and a shared
+    ``scan_cache`` lets identical pages reuse one parse.
+    ``progress_callback`` is invoked as
+    ``callback(completed, total)`` after each domain, like
+    :func:`~domain_security_analyzer.analyzer.analyze_domains_from_file`.
+
+    With ``on_result``, each result is passed to ``on_result(result)`` as soon
+    as its domain finishes, in completion order, instead of being collected;
+    an empty list is returned.
+
+    ``domains`` is consumed lazily, as workers free up. Given an iterator,
+    pass its length as ``total`` (the total reported to ``progress_callback``)
+    so it is not read into a list first.
+    """
+    if total is None:
+        domains = domains if isinstance(domains, Sized) else list(domains)
+        total = len(domains)
+    results: List[Optional[Dict]] = [None] * total if on_result is None else []
+    completed = 0
+
+    http_threads = http_workers or min(max_domains, 128)
+    http_executor = concurrent.futures.ThreadPoolExecutor(max_workers=http_threads)
+    analyzer = AsyncDomainAnalyzer(
+        include_wildcard_matches=include_wildcard_matches,
+        collect_filtered=collect_filtered,
+        limiter=asyncio.Semaphore(concurrency),
+        http_executor=http_executor,
+        dns_cache=dns_cache,
+        skip_dead_domains=skip_dead_domains,
+        dkim_selectors=dkim_selectors,
+        resolver_pool=resolver_pool,
+        http_session=http_session if http_session is not None else make_session(pool_maxsize=http_threads),
+        html_backend=html_backend,
+        scan_cache=scan_cache,
+    )
+    pending = iter(enumerate(domains))
+
+    async def worker() -> None:
+        nonlocal completed
+        # Workers share one iterator, so at most max_domains are in flight.
+        for index, domain in pending:
+            try:
+                result = await analyzer.analyze_domain(domain)
+            except Exception as e:
+                result = _error_result(domain, str(e))
+            if on_result is None:
+                results[index] = result
+            else:
+                on_result(result)
+
+            completed += 1
+            if progress_callback is not None:
+                try:
+                    progress_callback(completed, total)
+                except Exception:
+                    pass  # progress reporting must never break analysis
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, min(max_domains, total)))))
+    finally:
+        http_executor.shutdown(wait=False)
+    return results
@@ -0,0 +1,364 @@
+"""Wordlist subdomain brute-forcing.
+
+:func:`bruteforce_subdomains` streams candidate labels from a wordlist,
+resolves ``<label>.<domain>`` with a fixed number of concurrent workers on the
+event loop, and yields each name that exists as soon as it is found. Nothing
+proportional to the wordlist is held in memory, so lists of a million entries
+work as well as the 27 built-in prefixes of
+:meth:`~domain_security_analyzer.analyzer.DomainAnalyzer.discover_subdomains`.
+
+Each candidate costs one A query: the CNAME, if any, is read from the chain
+in the same response. Results go through the same wildcard-baseline filtering
+as ``discover_subdomains``.
+
+To reach thousands of queries per second on one core, candidates bypass
+``dns.asyncresolver``'s per-query setup: all queries to a nameserver share one
+UDP socket and are matched to their responses by message ID
+(:class:`_QueryMux`). That path still goes through the resolver pool's
+controls: upstreams are picked by the pool, ejected ones are skipped, each
+query holds a slot in the upstream's AIMD limiter, and outcomes feed the
+pool's health and latency tracking. Anything that path cannot answer
+cleanly — a timeout, SERVFAIL, a truncated response — is retried through the
+analyzer's regular resolver, so results are the same either way.
+
+Typical use::
+
+    import asyncio
+    from domain_security_analyzer.bruteforce import bruteforce_subdomains, iter_wordlist
+
+    async def main():
+        async for found in bruteforce_subdomains("example.com", iter_wordlist("words.txt")):
+            print(found["subdomain"])
+
+    asyncio.run(main())
+"""
+from __future__ import annotations
+
+import asyncio
+import csv
+import struct
+import time
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import dns.entropy
+import dns.exception
+import dns.flags
+import dns.message
+import dns.name
+import dns.rcode
+import dns.rdatatype
+import dns.resolver
+
+from .async_analyzer import AsyncDomainAnalyzer
+from .planner import chain_cname
+from .resolver import ResolverPool, Upstream
+
+__all__ = ["bruteforce_subdomains", "bruteforce_domains_to_csv", "iter_wordlist", "BRUTEFORCE_COLUMNS"]
+
+# Column order of the brute-force CSV report
+BRUTEFORCE_COLUMNS = ['Domain', 'Subdomain', 'CNAME', 'A Records', 'Wildcard Match']
+
+_LABEL_CHARS = set("abcdefghijklmnopqrstuvwxyz0123456789-_.")
+
+# Limits of a DNS label and of a whole name in text form (RFC 1035)
+_MAX_LABEL = 63
+_MAX_NAME = 253
+
+
+def _is_host_name(name: str) -> bool:
+    """Whether ``name`` has no empty or over-long labels and fits in a DNS name."""
+    return len(name) <= _MAX_NAME and all(0 < len(label) <= _MAX_LABEL for label in name.split('.'))
+
+
+def iter_wordlist(path: str) -> Iterator[str]:
+    """Yield candidate labels from ``path`` one line at a time.
+
+    Labels are lower-cased; blank lines, ``#`` comments and entries that
+    cannot form a host name (bad characters, empty or over-long labels) are
+    skipped.
+    """
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            word = line.strip().lower().strip('.')
+            if word and not word.startswith('#') and set(word) <= _LABEL_CHARS and _is_host_name(word):
+                yield word
+
+
+async def bruteforce_subdomains(
+    domain: str,
+    words: Iterable[str],
+    *,
+    concurrency: int = 500,
+    include_wildcard_matches: bool = False,
+    analyzer: Optional[AsyncDomainAnalyzer] = None,
+) -> AsyncIterator[Dict]:
+    """Resolve ``<word>.<domain>`` for every word and yield the names that exist.
+
+    ``concurrency`` workers pull from ``words`` lazily, so at most that many
+    queries are in flight and only ``concurrency`` results are buffered. Each
+    result is a dict with ``subdomain``, ``cname`` (first target or ``None``),
+    ``a_records`` and ``wildcard_match``; the last is only ever ``True`` with
+    ``include_wildcard_matches``, otherwise such names are dropped. Results
+    arrive in completion order.
+
+    Nothing is yielded when ``domain`` itself is NXDOMAIN (RFC 8020). Pass
+    ``analyzer`` to reuse one resolver across calls.
+    """
+    if analyzer is None:
+        # No shared cache: brute-force answers are almost never reused
+        analyzer = AsyncDomainAnalyzer()
+    prober = _Prober(analyzer)
+    try:
+        await prober.open()
+        wildcard_probe = analyzer._wildcard_probe_name(domain)
+        apex, probe = await asyncio.gather(prober.resolve(domain), prober.resolve(wildcard_probe))
+        if apex is _NXDOMAIN:
+            return
+        wildcard = analyzer._wildcard_baseline((probe[1], probe[0]))
+        async for result in _probe_all(prober, domain, words, wildcard, concurrency, include_wildcard_matches):
+            yield result
+    finally:
+        prober.close()
+
+
+async def _probe_all(prober: "_Prober", domain: str, words: Iterable[str], wildcard, concurrency: int,
+                     include_wildcard_matches: bool) -> AsyncIterator[Dict]:
+    """Fan ``words`` out over ``concurrency`` workers, yielding reportable names."""
+    found: asyncio.Queue = asyncio.Queue(maxsize=max(1, concurrency))
+    candidates = iter(words)
+    done = object()
+
+    async def worker() -> None:
+        try:
+            for word in candidates:
+                fqdn = f"{word}.{domain}"
+                if not _is_host_name(fqdn):
+                    continue  # words need not come from iter_wordlist
+                cname, a_records = await prober.resolve(fqdn)
+                if not (cname or a_records):
+                    continue
+                wildcard_match = AsyncDomainAnalyzer._matches_wildcard(wildcard, cname, a_records)
+                if wildcard_match and not include_wildcard_matches:
+                    continue
+                await found.put({
+                    "subdomain": fqdn,
+                    "cname": cname[0] if cname else None,
+                    "a_records": a_records or [],
+                    "wildcard_match": wildcard_match,
+                })
+        except Exception as exc:
+            await found.put(exc)  # re-raised by the consumer below
+        else:
+            await found.put(done)
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(max(1, concurrency))]
+    try:
+        remaining = len(workers)
+        while remaining:
+            item = await found.get()
+            if item is done:
+                remaining -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        # Also reached when the caller stops iterating early
+        for task in workers:
+            task.cancel()
+
+
+# resolve() result for a name that does not exist at all
+_NXDOMAIN = (None, None)
+
+
+class _QueryMux(asyncio.DatagramProtocol):
+    """Many in-flight queries on one connected UDP socket, matched by message ID."""
+
+    def __init__(self) -> None:
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.pending: Dict[int, asyncio.Future] = {}
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        if len(data) >= 2:
+            future = self.pending.pop(struct.unpack('!H', data[:2])[0], None)
+            if future is not None and not future.done():
+                future.set_result(data)
+
+    def error_received(self, exc: Exception) -> None:
+        pass  # e.g. ICMP port unreachable; the affected query times out
+
+    async def exchange(self, qname: dns.name.Name, timeout: float) -> Optional[dns.message.Message]:
+        """Send an A query for ``qname``; the response, or ``None`` on timeout."""
+        # IDs come from a CSPRNG: a predictable ID lets an off-path attacker
+        # race a forged answer in (the reason dnspython does the same)
+        query_id = dns.entropy.random_16()
+        while query_id in self.pending:
+            query_id = dns.entropy.random_16()
+        future = asyncio.get_running_loop().create_future()
+        self.pending[query_id] = future
+        # Header: ID, RD set, one question
+        wire = struct.pack('!HHHHHH', query_id, 0x0100, 1, 0, 0, 0) + qname.to_wire() + b'\x00\x01\x00\x01'
+        try:
+            self.transport.sendto(wire)
+            data = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self.pending.pop(query_id, None)
+        try:
+            response = dns.message.from_wire(data)
+        except dns.exception.DNSException:
+            return None
+        if not response.question or response.question[0].name != qname:
+            return None  # not the answer to this query
+        return response
+
+
+class _Prober:
+    """Resolve candidate names to ``(CNAME answer, A answer)`` pairs.
+
+    Uses one :class:`_QueryMux` per upstream of ``analyzer.resolver``, picked
+    and throttled by the pool (see :meth:`_exchange`), and the analyzer's own
+    lookup for anything that path cannot answer cleanly.
+    """
+
+    def __init__(self, analyzer: AsyncDomainAnalyzer, timeout: float = 2.0) -> None:
+        self.analyzer = analyzer
+        self.timeout = timeout
+        self._muxes: Dict[Upstream, _QueryMux] = {}
+
+    async def open(self) -> None:
+        """Open one socket per nameserver; without any, every query takes the slow path."""
+        loop = asyncio.get_running_loop()
+        for upstream in self.analyzer.resolver.upstreams:
+            try:
+                _, mux = await loop.create_datagram_endpoint(_QueryMux, remote_addr=(upstream.address, upstream.port))
+            except OSError:
+                continue
+            self._muxes[upstream] = mux
+
+    async def _exchange(self, name: str) -> Optional[dns.message.Message]:
+        """Query ``name`` on the pool's best upstream with a socket, as a regular lookup would.
+
+        ``None`` when no usable upstream has one (ejected upstreams are
+        skipped) or the query failed; either way the caller takes the slow
+        path. The query holds a slot in the upstream's limiter, and its
+        outcome is recorded with the pool.
+        """
+        pool = self.analyzer.resolver
+        now = time.monotonic()
+        upstream = next((u for u in pool.candidates() if u in self._muxes and u.ejected_until <= now), None)
+        if upstream is None:
+            return None
+        await upstream.limiter.acquire_async()
+        start = time.monotonic()
+        rtt, congested = None, False
+        try:
+            response = await self._muxes[upstream].exchange(dns.name.from_text(name), self.timeout)
+            if response is None:
+                congested = True
+                pool.record(upstream, None, dns.exception.Timeout())
+            elif response.rcode() in (dns.rcode.SERVFAIL, dns.rcode.REFUSED):
+                congested = True
+                pool.record(upstream, None, dns.resolver.NoNameservers())
+                response = None
+            else:
+                rtt = time.monotonic() - start
+                pool.record(upstream, rtt)
+            return response
+        finally:
+            upstream.limiter.release(rtt, congested)
+
+    async def resolve(self, name: str) -> Tuple[Optional[List[str]], Optional[List[str]]]:
+        """``(CNAME answer, A answer)`` for ``name``; :data:`_NXDOMAIN` if it does not exist."""
+        response = await self._exchange(name) if self._muxes else None
+        if response is not None and not response.flags & dns.flags.TC:
+            rcode = response.rcode()
+            if rcode in (dns.rcode.NOERROR, dns.rcode.NXDOMAIN):
+                cname = chain_cname(name, response)
+                if rcode == dns.rcode.NXDOMAIN and cname is None:
+                    return _NXDOMAIN
+                return cname, _chain_a_records(name, response)
+        # Slow path: full resolver with its retries and fallbacks
+        lookup = await self.analyzer._lookup(name, 'A')
+        if lookup.nxdomain:
+            return _NXDOMAIN
+        cname = chain_cname(name, lookup.response) if lookup.response is not None else None
+        return cname, lookup.records if isinstance(lookup.records, list) else None
+
+    def close(self) -> None:
+        for mux in self._muxes.values():
+            mux.transport.close()
+        self._muxes = {}
+
+
+def _chain_a_records(name: str, response: dns.message.Message) -> Optional[List[str]]:
+    """A records at the end of ``name``'s CNAME chain in ``response``, formatted like get_dns_record."""
+    owner = dns.name.from_text(name)
+    for _ in range(16):  # bound the walk, as resolvers do
+        target = None
+        for rrset in response.answer:
+            if rrset.name != owner:
+                continue
+            if rrset.rdtype == dns.rdatatype.A:
+                return [str(rdata) for rdata in rrset]
+            if rrset.rdtype == dns.rdatatype.CNAME:
+                target = rrset[0].target
+        if target is None:
+            return None
+        owner = target
+    return None
+
+
+async def bruteforce_domains_to_csv(
+    input_file: str,
+    output_file: str,
+    wordlist: str,
+    *,
+    concurrency: int = 500,
+    include_wildcard_matches: bool = False,
+    resolver_pool: Optional[ResolverPool] = None,
+    progress_callback: Optional[Callable[[str, int], None]] = None,
+) -> int:
+    """Brute-force every domain in ``input_file`` with ``wordlist`` into a CSV.
+
+    Rows (:data:`BRUTEFORCE_COLUMNS`) are written and flushed as names are
+    found. The wordlist is re-streamed from disk for each domain.
+    ``resolver_pool`` overrides the system resolvers.
+    ``progress_callback`` is invoked as ``callback(domain, found)`` after each
+    domain. Returns the total number of rows written.
+    """
+    with open(input_file, 'r') as f:
+        domains = [line.strip() for line in f if line.strip()]
+
+    analyzer = AsyncDomainAnalyzer(resolver_pool=resolver_pool)
+    total = 0
+    with open(output_file, 'w', newline='', encoding='utf-8') as out:
+        writer = csv.writer(out)
+        writer.writerow(BRUTEFORCE_COLUMNS)
+        for domain in domains:
+            found = 0
+            async for result in bruteforce_subdomains(
+                domain, iter_wordlist(wordlist), concurrency=concurrency,
+                include_wildcard_matches=include_wildcard_matches, analyzer=analyzer,
+            ):
+                writer.writerow([
+                    domain,
+                    result["subdomain"],
+                    result["cname"] or '',
+                    ';'.join(result["a_records"]),
+                    result["wildcard_match"],
+                ])
+                out.flush()
+                found += 1
+            total += found
+            if progress_callback is not None:
+                try:
+                    progress_callback(domain, found)
+                except Exception:
+                    pass  # progress reporting must never break the run
+    return total
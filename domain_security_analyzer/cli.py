@@ -12,6 +12,8 @@ examples:
   domain-analyzer domains.txt report.csv
   domain-analyzer domains.txt report.csv 20
   domain-analyzer domains.txt report.csv --filtered-subdomains-file filtered.csv
+  domain-analyzer domains.txt report.csv 200 --async --concurrency 1000
+  domain-analyzer domains.txt subdomains.csv --wordlist words.txt --concurrency 1000
 """
 
 
@@ -68,6 +70,40 @@ def _configure_windows_console():
         pass
 
 
+def _nameservers(args):
+    """The --resolvers list, or ``None`` for the system resolvers."""
+    if not args.resolvers:
+        return None
+    return [ns.strip() for ns in args.resolvers.split(',') if ns.strip()]
+
+
+def _run_bruteforce(args, input_file: str, output_file: str) -> None:
+    """Run the --wordlist mode: brute-force subdomains into output_file."""
+    import asyncio
+
+    from .bruteforce import bruteforce_domains_to_csv
+    from .resolver import ResolverPool
+
+    try:
+        total = asyncio.run(bruteforce_domains_to_csv(
+            input_file,
+            output_file,
+            os.path.normpath(args.wordlist),
+            concurrency=args.concurrency,
+            include_wildcard_matches=args.include_wildcard_matches,
+            resolver_pool=ResolverPool(_nameservers(args), strategy=args.resolver_strategy,
+                                       hedge_budget=args.hedge_budget, max_inflight=args.max_inflight),
+            progress_callback=lambda domain, found: print(f"{domain}: {found} subdomains"),
+        ))
+    except KeyboardInterrupt:
+        print("\nBrute-force interrupted by user. Rows found so far have been saved.")
+        return
+    except Exception as e:
+        print(f"\nError during brute-force: {str(e)}")
+        sys.exit(1)
+    print(f"\nFound {total} subdomains. Results saved to {output_file}")
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog='domain-analyzer',
@@ -91,6 +127,98 @@ def build_parser() -> argparse.ArgumentParser:
         '--filtered-subdomains-file', metavar='PATH', default=None,
         help='Write subdomains excluded by wildcard filtering to a separate CSV',
     )
+    parser.add_argument(
+        '--resume', action='store_true',
+        help='Continue an interrupted run: skip domains already in output_file '
+             'and append the rest to it',
+    )
+    parser.add_argument(
+        '--schedule', action='store_true',
+        help='Normalize (lower case, IDNA) and dedupe the domain list, then order it by '
+             'registered domain and name servers so related lookups hit warm caches',
+    )
+    parser.add_argument(
+        '--async', dest='async_engine', action='store_true',
+        help='Use the asyncio engine: max_workers domains in flight on one '
+             'event loop instead of one blocking thread per domain',
+    )
+    parser.add_argument(
+        '--concurrency', type=int, default=500, metavar='N',
+        help='With --async, maximum concurrent DNS queries across the run (default: 500)',
+    )
+    parser.add_argument(
+        '--per-domain-concurrency', type=int, default=16, metavar='N',
+        help='Resolve up to N of a domain\'s DNS lookups at once and overlap them '
+             'with its HTTP fetch (threaded engine; default: 16, 1 = serial)',
+    )
+    parser.add_argument(
+        '--dns-cache-mb', type=int, default=64, metavar='MB',
+        help='Memory cap for the DNS answer cache shared by all workers; 0 disables it (default: 64)',
+    )
+    parser.add_argument(
+        '--cache', dest='disk_cache', action='store_true', default=False,
+        help='Keep DNS answers in an on-disk cache (in DSA_DATA_DIR, default '
+             '~/.domain-security-analyzer) and reuse unexpired ones on later runs',
+    )
+    parser.add_argument(
+        '--no-cache', dest='disk_cache', action='store_false',
+        help='Do not use the on-disk DNS cache (default)',
+    )
+    parser.add_argument(
+        '--cache-max-mb', type=int, default=256, metavar='MB',
+        help='Size cap for the on-disk DNS cache; entries closest to expiry go first (default: 256)',
+    )
+    parser.add_argument(
+        '--http-pool-hosts', type=int, default=64, metavar='N',
+        help='Hosts to keep pooled HTTP connections for (default: 64)',
+    )
+    parser.add_argument(
+        '--http-pool-size', type=int, default=None, metavar='N',
+        help='Idle keep-alive connections kept per host (default: one per worker)',
+    )
+    parser.add_argument(
+        '--no-http-keep-alive', dest='http_keep_alive', action='store_false',
+        help='Close every HTTP connection after its request instead of reusing it',
+    )
+    parser.add_argument(
+        '--html-parser', dest='html_backend', choices=('scanner', 'bs4'), default='scanner',
+        help='How SRI tags are extracted from pages: the streaming scanner (default) '
+             'or BeautifulSoup as a fallback',
+    )
+    parser.add_argument(
+        '--dkim-selectors', metavar='PATH', default=None,
+        help='File of DKIM selectors to probe, one per line, replacing the bundled list of 16 common ones; '
+             '"extended" for the bundled list of several hundred (that many lookups per domain with DKIM)',
+    )
+    parser.add_argument(
+        '--resolvers', metavar='IP[,IP...]', default=None,
+        help='Upstream DNS resolvers to use instead of the system ones '
+             '(comma-separated; IP, IP:port or [IPv6]:port)',
+    )
+    parser.add_argument(
+        '--resolver-strategy', choices=['round-robin', 'least-latency'], default='round-robin',
+        help='How queries are spread over the resolvers (default: round-robin)',
+    )
+    parser.add_argument(
+        '--hedge-budget', type=float, default=0.05, metavar='FRACTION',
+        help='Resend a query to another resolver when it is slower than the recent '
+             'p95, for at most this fraction of queries; 0 disables (default: 0.05)',
+    )
+    parser.add_argument(
+        '--max-inflight', type=int, default=256, metavar='N',
+        help='Upper bound on concurrent queries per resolver; the actual limit adapts '
+             'down on timeouts/SERVFAIL/REFUSED and back up while answers are fast (default: 256)',
+    )
+    parser.add_argument(
+        '--wordlist', metavar='PATH', default=None,
+        help='Brute-force subdomains from this wordlist instead of running the '
+             'full analysis; found names stream to output_file as they resolve '
+             '(uses --concurrency)',
+    )
+    parser.add_argument(
+        '--no-dead-domain-skip', dest='skip_dead_domains', action='store_false',
+        help='Run every check even when the domain does not exist (NXDOMAIN or no SOA/NS)',
+    )
     parser.add_argument(
         '--version', action='version', version=f'%(prog)s {__version__}',
     )
@@ -106,7 +234,7 @@ def main(argv=None):
     # Check dependencies only after argparse has handled --help/--version so
     # those work even in a minimal environment.
     check_required_modules()
-    from .analyzer import analyze_domains_from_file
+    from .analyzer import EXTENDED_DKIM_SELECTORS_FILE, analyze_domains_from_file, load_dkim_selectors
 
     default_workers = min(10, (os.cpu_count() or 4) * 2)
     max_workers = args.max_workers or default_workers
@@ -117,6 +245,16 @@ def main(argv=None):
         os.path.normpath(args.filtered_subdomains_file)
         if args.filtered_subdomains_file else None
     )
+    try:
+        if args.dkim_selectors == 'extended':
+            dkim_selectors = load_dkim_selectors(EXTENDED_DKIM_SELECTORS_FILE)
+        elif args.dkim_selectors:
+            dkim_selectors = load_dkim_selectors(os.path.normpath(args.dkim_selectors))
+        else:
+            dkim_selectors = None
+    except OSError as e:
+        print(f"Error reading DKIM selectors file: {e}")
+        sys.exit(1)
 
     print("\nStarting domain analysis:")
     print(f"Operating System: {platform.system()} {platform.release()}")
@@ -127,8 +265,22 @@ def main(argv=None):
         print("Include wildcard-matched subdomains: True")
     if filtered_subdomains_file:
         print(f"Filtered subdomains file: {filtered_subdomains_file}")
+    if args.async_engine:
+        print(f"Engine: async ({args.concurrency} concurrent DNS queries)")
+    if args.disk_cache:
+        print(f"On-disk DNS cache: enabled (up to {args.cache_max_mb} MB)")
+    if dkim_selectors is not None:
+        print(f"DKIM selectors: {len(dkim_selectors)} from {args.dkim_selectors}")
+    if args.resolvers:
+        print(f"Resolvers: {args.resolvers} ({args.resolver_strategy})")
+    if args.wordlist:
+        print(f"Wordlist: {args.wordlist} ({args.concurrency} concurrent DNS queries)")
     print("")
 
+    if args.wordlist:
+        _run_bruteforce(args, input_file, output_file)
+        return
+
     try:
         analyze_domains_from_file(
             input_file,
@@ -136,9 +288,28 @@ def main(argv=None):
             max_workers,
             include_wildcard_matches=args.include_wildcard_matches,
             filtered_subdomains_file=filtered_subdomains_file,
+            engine='async' if args.async_engine else 'threads',
+            concurrency=args.concurrency,
+            dns_cache_mb=args.dns_cache_mb,
+            query_concurrency=args.per_domain_concurrency,
+            skip_dead_domains=args.skip_dead_domains,
+            dkim_selectors=dkim_selectors,
+            nameservers=_nameservers(args),
+            resolver_strategy=args.resolver_strategy,
+            hedge_budget=args.hedge_budget,
+            max_inflight=args.max_inflight,
+            disk_cache=args.disk_cache,
+            disk_cache_mb=args.cache_max_mb,
+            http_pool_hosts=args.http_pool_hosts,
+            http_pool_size=args.http_pool_size,
+            http_keep_alive=args.http_keep_alive,
+            html_backend=args.html_backend,
+            resume=args.resume,
+            schedule=args.schedule,
         )
     except KeyboardInterrupt:
-        print("\nAnalysis interrupted by user. Partial results may have been saved.")
+        print(f"\nAnalysis interrupted by user. Results for the domains already analyzed are in {output_file}; "
+              "rerun with --resume to analyze the rest.")
     except Exception as e:
         print(f"\nError during analysis: {str(e)}")
         sys.exit(1)
@@ -0,0 +1,21 @@
+"""Location of the per-user data directory.
+
+Everything the package persists between runs — web UI run history, the
+on-disk DNS cache — lives under one directory: ``~/.domain-security-analyzer``
+unless the ``DSA_DATA_DIR`` environment variable points elsewhere.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+__all__ = ["data_dir"]
+
+
+def data_dir(*parts: str) -> Path:
+    """The data directory, or a subdirectory of it; created on first use."""
+    override = os.environ.get("DSA_DATA_DIR")
+    base = Path(override) if override else Path.home() / ".domain-security-analyzer"
+    path = base.joinpath(*parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
@@ -0,0 +1,189 @@
+"""Persistent DNS answer cache shared across runs.
+
+:class:`DiskDNSCache` keeps the answers :class:`~domain_security_analyzer.dnscache.DNSCache`
+stores in an SQLite database (by default ``dns-cache.sqlite3`` in the data
+directory, see :mod:`~domain_security_analyzer.datadir`), so a portfolio
+re-analyzed the next day only goes to the network for answers whose TTL has
+run out. It sits behind the in-memory cache: memory misses fall through to
+disk, and everything stored in memory is written through to disk.
+
+* Expiry is stored as wall-clock time; entries past it are never returned.
+* Writes are buffered and committed in batches, so a run costs a few
+  transactions rather than one per lookup.
+* The database is in WAL mode and every thread gets its own connection, so
+  worker threads and concurrent runs can share it.
+* :meth:`DiskDNSCache.compact` drops expired entries and, above ``max_bytes``,
+  the entries closest to expiry; it runs when the cache is opened and closed.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from .datadir import data_dir
+
+__all__ = ["DiskDNSCache", "DiskEntry", "default_cache_path"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    name     TEXT    NOT NULL,
+    rdtype   TEXT    NOT NULL,
+    records  TEXT,              -- JSON list of strings; NULL for a negative answer
+    nxdomain INTEGER NOT NULL,
+    expires  REAL    NOT NULL,  -- time.time() deadline
+    size     INTEGER NOT NULL,
+    PRIMARY KEY (name, rdtype)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS answers_expires ON answers (expires);
+"""
+
+# Buffered writes are committed once this many are pending
+_FLUSH_EVERY = 256
+
+
+def default_cache_path() -> Path:
+    """``dns-cache.sqlite3`` in the data directory."""
+    return data_dir() / "dns-cache.sqlite3"
+
+
+class DiskEntry(NamedTuple):
+    records: Optional[Tuple[str, ...]]  # None for a negative answer
+    ttl: float                          # seconds left
+    nxdomain: bool
+
+
+class DiskDNSCache:
+    """SQLite-backed store of DNS answers keyed by ``(name, rdtype)``; see the module docstring."""
+
+    def __init__(self, path: Union[str, Path, None] = None, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.path = Path(path) if path is not None else default_cache_path()
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pending: List[tuple] = []
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        self.compact()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit; batches use explicit transactions
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, name: str, rdtype: str) -> Optional[DiskEntry]:
+        """The unexpired entry for ``(name, rdtype)`` (a canonical key), or ``None``."""
+        now = time.time()
+        row = self._connection().execute(
+            "SELECT records, nxdomain, expires FROM answers WHERE name = ? AND rdtype = ? AND expires > ?",
+            (name, rdtype, now),
+        ).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        records = tuple(json.loads(row[0])) if row[0] is not None else None
+        return DiskEntry(records, row[2] - now, bool(row[1]))
+
+    def put(self, name: str, rdtype: str, records: Optional[Tuple[str, ...]], ttl: float, nxdomain: bool) -> None:
+        """Queue an answer valid for ``ttl`` seconds; written with the next batch."""
+        encoded = json.dumps(list(records)) if records is not None else None
+        row = (name, rdtype, encoded, int(nxdomain), time.time() + ttl,
+               len(name) + len(rdtype) + len(encoded or ""))
+        with self._lock:
+            self._pending.append(row)
+            if len(self._pending) < _FLUSH_EVERY:
+                return
+            batch, self._pending = self._pending, []
+        self._write(batch)
+
+    def flush(self) -> None:
+        """Write every queued answer."""
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch: List[tuple]) -> None:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?)", batch)
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        with self._lock:
+            self.writes += len(batch)
+
+    def compact(self) -> int:
+        """Delete expired entries, then the soonest-expiring ones above ``max_bytes``.
+
+        Returns the number of entries removed. The file is vacuumed when that
+        frees a sizeable share of it.
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+            removed = conn.execute("DELETE FROM answers WHERE expires <= ?", (time.time(),)).rowcount
+            total = conn.execute("SELECT COALESCE(SUM(size), 0), COUNT(*) FROM answers").fetchone()
+            if total[0] > self.max_bytes:
+                # Drop the entries closest to expiry until under the cap
+                excess, dropped = total[0] - self.max_bytes, 0
+                cutoff = None
+                for expires, size in conn.execute("SELECT expires, size FROM answers ORDER BY expires"):
+                    dropped += size
+                    if dropped >= excess:
+                        cutoff = expires
+                        break
+                removed += conn.execute("DELETE FROM answers WHERE expires <= ?", (cutoff,)).rowcount
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        if removed and removed >= before // 4:
+            conn.execute("VACUUM")
+        return removed
+
+    def close(self) -> None:
+        """Flush, compact and close this thread's connection."""
+        self.flush()
+        self.compact()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+
+    def stats(self) -> Dict[str, object]:
+        """Hit/miss counters and the database's current contents."""
+        entries, size = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM answers").fetchone()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "path": str(self.path),
+                "entries": entries,
+                "bytes": size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,206 @@
+"""Shared in-process DNS answer cache.
+
+:class:`DNSCache` stores the answers returned by
+:meth:`DomainAnalyzer.get_dns_record <domain_security_analyzer.analyzer.DomainAnalyzer.get_dns_record>`
+so that lookups repeated across domains in one run — the same parent SOA,
+shared CNAME targets, common ``_spf`` include hosts — are resolved once.
+
+* Positive answers live for the record TTL (the minimum across any CNAME chain).
+* NXDOMAIN / NoAnswer are negatively cached for the SOA ``minimum`` carried in
+  the authority section (RFC 2308), or ``negative_ttl`` when none is present.
+* Errors and timeouts are never cached.
+* Entries are evicted least-recently-used once the estimated footprint exceeds
+  ``max_bytes``.
+* With a ``disk`` tier (:class:`~domain_security_analyzer.diskcache.DiskDNSCache`)
+  memory misses are looked up on disk and every answer stored is written
+  through, so answers outlive the run.
+
+One instance is safe to share between worker threads (and with the async
+engine, whose cache operations never block).
+"""
+from __future__ import annotations
+
+import collections
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Tuple
+
+import dns.rdatatype
+import dns.resolver
+
+from .planner import is_nxdomain
+
+if TYPE_CHECKING:
+    from .diskcache import DiskDNSCache
+
+__all__ = ["DNSCache", "CacheEntry", "answer_ttl", "negative_ttl"]
+
+# Rough per-entry bookkeeping overhead (tuple, OrderedDict node, floats) used
+# when estimating the cache footprint.
+_ENTRY_OVERHEAD = 200
+
+
+class CacheEntry(NamedTuple):
+    records: Optional[Tuple[str, ...]]  # None for a negative answer
+    expires: float                      # time.monotonic() deadline
+    nxdomain: bool
+    size: int
+
+
+def answer_ttl(answers: dns.resolver.Answer) -> float:
+    """Remaining lifetime in seconds of a positive answer."""
+    return max(0.0, answers.expiration - time.time())
+
+
+def negative_ttl(exc: Exception) -> Optional[float]:
+    """Negative-caching TTL for an NXDOMAIN / NoAnswer, from the response's SOA.
+
+    Returns ``None`` when the response carries no SOA to derive it from.
+    """
+    if isinstance(exc, dns.resolver.NXDOMAIN):
+        responses = list(exc.kwargs.get("responses", {}).values())
+    elif isinstance(exc, dns.resolver.NoAnswer):
+        responses = [exc.kwargs.get("response")]
+    else:
+        return None
+
+    for response in responses:
+        if response is None:
+            continue
+        for rrset in response.authority:
+            if rrset.rdtype == dns.rdatatype.SOA and len(rrset):
+                return float(min(rrset.ttl, rrset[0].minimum))
+    return None
+
+
+class DNSCache:
+    """Thread-safe, TTL-aware LRU cache of DNS answers keyed by ``(name, rdtype)``."""
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        negative_ttl: float = 300,
+        max_ttl: float = 86400,
+        disk: Optional["DiskDNSCache"] = None,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.negative_ttl = negative_ttl
+        self.max_ttl = max_ttl
+        self.disk = disk
+
+        self._entries: "collections.OrderedDict[Tuple[str, str], CacheEntry]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(name: str, rdtype: str) -> Tuple[str, str]:
+        return name.lower().rstrip('.'), rdtype.upper()
+
+    def get(self, name: str, rdtype: str) -> Optional[CacheEntry]:
+        """Return the live entry for ``(name, rdtype)``, or ``None`` on a miss."""
+        key = self._key(name, rdtype)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= now:
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._count_hit(entry)
+                return entry
+            if self.disk is None:
+                self.misses += 1
+                return None
+        stored = self.disk.get(*key)
+        if stored is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        entry = self._store(key, stored.records, stored.ttl, stored.nxdomain)
+        with self._lock:
+            self.disk_hits += 1
+            self._count_hit(entry)
+        return entry
+
+    def _count_hit(self, entry: CacheEntry) -> None:
+        self.hits += 1
+        if entry.records is None:
+            self.negative_hits += 1
+
+    def put(self, name: str, rdtype: str, records: Optional[List[str]], ttl: float, nxdomain: bool = False) -> None:
+        """Store an answer (``records=None`` for a negative one) for ``ttl`` seconds."""
+        ttl = min(ttl, self.max_ttl)
+        if ttl <= 0:
+            return
+        key = self._key(name, rdtype)
+        stored = tuple(records) if records is not None else None
+        self._store(key, stored, ttl, nxdomain)
+        if self.disk is not None:
+            self.disk.put(key[0], key[1], stored, ttl, nxdomain)
+
+    def _store(self, key: Tuple[str, str], stored: Optional[Tuple[str, ...]], ttl: float, nxdomain: bool) -> CacheEntry:
+        """Insert into the in-memory LRU only."""
+        size = _ENTRY_OVERHEAD + sys.getsizeof(key[0]) + sum(sys.getsizeof(r) for r in stored or ())
+        entry = CacheEntry(stored, time.monotonic() + ttl, nxdomain, size)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return entry
+
+    def put_negative(self, name: str, rdtype: str, exc: Exception) -> None:
+        """Negatively cache an NXDOMAIN / NoAnswer using its SOA-derived TTL."""
+        ttl = negative_ttl(exc)
+        self.put(
+            name, rdtype, None,
+            self.negative_ttl if ttl is None else ttl,
+            nxdomain=is_nxdomain(exc),
+        )
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def close(self) -> None:
+        """Write any buffered answers to the disk tier and close it."""
+        if self.disk is not None:
+            self.disk.close()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, object]:
+        """Counters and current size, suitable for logging at the end of a run."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
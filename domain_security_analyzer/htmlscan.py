@@ -0,0 +1,281 @@
+"""Fast extraction of the tags SRI analysis needs from HTML.
+
+Both :meth:`DomainAnalyzer.check_sri <domain_security_analyzer.analyzer.DomainAnalyzer.check_sri>`
+and :class:`~domain_security_analyzer.sri.SRIParser` only look at
+``<script src>``, ``<link rel="stylesheet">`` and (when crawling) ``<a href>``.
+:class:`ResourceScanner` pulls exactly those out of a page fed chunk by chunk,
+without building a document tree, so memory per page is bounded by the chunk
+size and the number of tags found rather than the page size.
+
+Tags are read by the same ``html.parser`` tokenizer BeautifulSoup's
+``"html.parser"`` backend uses, so the results match
+``soup.find_all('script', src=True)``, ``soup.find_all('link', href=True)``
+filtered on ``rel`` and ``soup.find_all('a', href=True)``: duplicate
+attributes keep the last value and valueless ones read as ``""``. The
+golden-corpus tests hold the two to the same output, and
+``scripts/bench_html_scan.py`` measures the speed difference.
+
+BeautifulSoup stays available as a fallback backend (``backend="bs4"``,
+see :func:`make_scanner`) with the same interface.
+
+Many domains serve byte-identical pages (parking pages, a shared landing
+page). Given a :class:`ScanCache`, :func:`make_scanner` returns a scanner
+that looks small pages up by a digest of their text and only parses those
+it has not seen before.
+"""
+from __future__ import annotations
+
+import collections
+import hashlib
+import threading
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+__all__ = ["ResourceScanner", "BS4Scanner", "ScanCache", "make_scanner", "scan_html", "BACKENDS"]
+
+BACKENDS = ("scanner", "bs4")
+
+# (kind, attributes) with kind "script" or "stylesheet"
+Resource = Tuple[str, Dict[str, str]]
+
+
+def _is_stylesheet(rel: str, ignore_case: bool) -> bool:
+    tokens = rel.split()
+    if ignore_case:
+        tokens = [token.lower() for token in tokens]
+    return 'stylesheet' in tokens
+
+
+class ResourceScanner(HTMLParser):
+    """Collect script/stylesheet tags (and optionally link targets) from HTML fed in pieces.
+
+    :attr:`resources` holds ``(kind, attrs)`` pairs in document order, where
+    ``kind`` is ``"script"`` or ``"stylesheet"`` and ``attrs`` the tag's
+    attributes. With ``links`` the ``href`` of every ``<a>`` is collected in
+    :attr:`links`. ``rel_ignore_case`` matches ``rel="StyleSheet"`` too.
+
+    :attr:`fed` counts the characters received; a parser failure is kept in
+    :attr:`error` (later input is then ignored) rather than raised into the
+    download loop.
+    """
+
+    def __init__(self, links: bool = False, rel_ignore_case: bool = False) -> None:
+        super().__init__(convert_charrefs=True)
+        self.collect_links = links
+        self.rel_ignore_case = rel_ignore_case
+        self.resources: List[Resource] = []
+        self.links: List[str] = []
+        self.fed = 0
+        self.error: Optional[Exception] = None
+
+    def feed(self, data: str) -> None:
+        self.fed += len(data)
+        if self.error is None:
+            try:
+                super().feed(data)
+            except Exception as e:
+                self.error = e
+
+    def close(self) -> None:
+        if self.error is None:
+            try:
+                super().close()
+            except Exception as e:
+                self.error = e
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag == 'script':
+            values = _attr_dict(attrs)
+            if 'src' in values:
+                self.resources.append(('script', values))
+        elif tag == 'link':
+            values = _attr_dict(attrs)
+            if 'href' in values and _is_stylesheet(values.get('rel', ''), self.rel_ignore_case):
+                self.resources.append(('stylesheet', values))
+        elif tag == 'a' and self.collect_links:
+            values = _attr_dict(attrs)
+            if 'href' in values:
+                self.links.append(values['href'])
+
+    # <link/> and <a/> arrive here rather than in handle_starttag
+    handle_startendtag = handle_starttag
+
+
+def _attr_dict(attrs: List[Tuple[str, Optional[str]]]) -> Dict[str, str]:
+    # Later duplicates win and valueless attributes read as "", as in bs4
+    return {name: value if value is not None else '' for name, value in attrs}
+
+
+class BS4Scanner:
+    """BeautifulSoup-backed drop-in for :class:`ResourceScanner`.
+
+    Buffers the whole page and parses it on :meth:`close`; kept as a fallback
+    and as the reference the fast scanner is tested against. Resources come
+    out scripts first, then stylesheets, as ``find_all`` returns them.
+    """
+
+    def __init__(self, links: bool = False, rel_ignore_case: bool = False) -> None:
+        self.collect_links = links
+        self.rel_ignore_case = rel_ignore_case
+        self.resources: List[Resource] = []
+        self.links: List[str] = []
+        self.fed = 0
+        self.error: Optional[Exception] = None
+        self._chunks: List[str] = []
+
+    def feed(self, data: str) -> None:
+        self.fed += len(data)
+        self._chunks.append(data)
+
+    def close(self) -> None:
+        from bs4 import BeautifulSoup
+
+        html, self._chunks = ''.join(self._chunks), []
+        try:
+            soup = BeautifulSoup(html, 'html.parser')
+            for script in soup.find_all('script', src=True):
+                self.resources.append(('script', _bs4_attrs(script)))
+            for link in soup.find_all('link', href=True):
+                rel = link.get('rel') or []
+                if self.rel_ignore_case:
+                    rel = [r.lower() for r in rel]
+                if 'stylesheet' in rel:
+                    self.resources.append(('stylesheet', _bs4_attrs(link)))
+            if self.collect_links:
+                self.links = [anchor.get('href') for anchor in soup.find_all('a', href=True)]
+        except Exception as e:
+            self.error = e
+
+
+def _bs4_attrs(tag) -> Dict[str, str]:
+    # Multi-valued attributes (rel, class) come back as lists; join them as written
+    return {name: ' '.join(value) if isinstance(value, list) else value for name, value in tag.attrs.items()}
+
+
+class ScanCache:
+    """Scan results of pages already seen, keyed by a digest of the page text.
+
+    Thread-safe and LRU-bounded to ``max_entries`` pages. Only non-empty
+    pages up to ``max_page_chars`` are looked up: they have to be held until complete
+    to be digested, and identical pages across domains are small ones.
+    :attr:`hits` counts the parses avoided.
+    """
+
+    def __init__(self, max_entries: int = 4096, max_page_chars: int = 64 * 1024) -> None:
+        self.max_entries = max_entries
+        self.max_page_chars = max_page_chars
+        self._entries: "collections.OrderedDict[Tuple, tuple]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0  # pages too large to look up
+
+    def get(self, key: Tuple) -> Optional[tuple]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Tuple, entry: tuple) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def count_uncached(self) -> None:
+        with self._lock:
+            self.uncached += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "pages": self.hits + self.misses + self.uncached,
+                "parses_avoided": self.hits,
+                "entries": len(self._entries),
+            }
+
+
+class _CachedScanner:
+    """Scanner front end that answers repeated small pages from a :class:`ScanCache`.
+
+    Text is held until the page ends or passes the cache's size limit; in
+    the latter case it is handed to a real scanner and streamed from then on.
+    """
+
+    def __init__(self, cache: ScanCache, backend: str, links: bool, rel_ignore_case: bool) -> None:
+        self.cache = cache
+        self._options = (backend, links, rel_ignore_case)
+        self.resources: List[Resource] = []
+        self.links: List[str] = []
+        self.fed = 0
+        self.error: Optional[Exception] = None
+        self._held: Optional[List[str]] = []
+        self._scanner = None
+
+    def _start_scanner(self):
+        backend, links, rel_ignore_case = self._options
+        self._scanner = make_scanner(backend, links=links, rel_ignore_case=rel_ignore_case)
+        for text in self._held or ():
+            self._scanner.feed(text)
+        self._held = None
+        return self._scanner
+
+    def feed(self, data: str) -> None:
+        self.fed += len(data)
+        if self._held is None:
+            self._scanner.feed(data)
+            return
+        self._held.append(data)
+        if self.fed > self.cache.max_page_chars:
+            self.cache.count_uncached()
+            self._start_scanner()
+
+    def close(self) -> None:
+        if self._held is not None and self.fed == 0:
+            # No page at all (dead domain, failed fetch): nothing to parse or share
+            self.cache.count_uncached()
+            self._held = None
+            return
+        if self._held is not None:
+            digest = hashlib.blake2b(''.join(self._held).encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+            key = (digest,) + self._options
+            entry = self.cache.get(key)
+            if entry is None:
+                scanner = self._start_scanner()
+                scanner.close()
+                entry = (tuple(scanner.resources), tuple(scanner.links), scanner.error)
+                self.cache.put(key, entry)
+            resources, links, self.error = entry
+            # Cached lists are shared between pages; hand out copies
+            self.resources, self.links = list(resources), list(links)
+            return
+        self._scanner.close()
+        self.resources, self.links, self.error = self._scanner.resources, self._scanner.links, self._scanner.error
+
+
+def make_scanner(backend: str = "scanner", *, links: bool = False, rel_ignore_case: bool = False,
+                 cache: Optional[ScanCache] = None):
+    """A scanner for ``backend`` (one of :data:`BACKENDS`), going through ``cache`` if given."""
+    if cache is not None:
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown HTML backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+        return _CachedScanner(cache, backend, links, rel_ignore_case)
+    if backend == "scanner":
+        return ResourceScanner(links=links, rel_ignore_case=rel_ignore_case)
+    if backend == "bs4":
+        return BS4Scanner(links=links, rel_ignore_case=rel_ignore_case)
+    raise ValueError(f"Unknown HTML backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+
+
+def scan_html(html: str, backend: str = "scanner", *, links: bool = False, rel_ignore_case: bool = False,
+              cache: Optional[ScanCache] = None):
+    """Scan a complete HTML string; returns the closed scanner."""
+    scanner = make_scanner(backend, links=links, rel_ignore_case=rel_ignore_case, cache=cache)
+    scanner.feed(html)
+    scanner.close()
+    return scanner
@@ -0,0 +1,118 @@
+"""Pooled HTTP session shared by the workers of a run.
+
+``requests.get`` builds a throwaway session per call, so every redirect hop
+of every domain pays a fresh TCP (and TLS) handshake. :func:`make_session`
+returns one ``requests.Session`` that all workers share instead:
+
+* Its adapter keeps up to ``pool_maxsize`` idle keep-alive connections per
+  host for ``pool_connections`` hosts, so domains redirecting to the same
+  canonical host reuse connections.
+* Cookies are refused, so nothing set while fetching one domain is sent to
+  another and the shared jar never changes under concurrent workers.
+* :class:`ConnectionStats` counts requests against newly opened
+  connections; the difference is the number of reused ones.
+
+Sending requests through one session from many threads is safe as long as
+its configuration is not changed meanwhile.
+"""
+from __future__ import annotations
+
+import http.cookiejar
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+__all__ = ["make_session", "ConnectionStats"]
+
+
+class ConnectionStats:
+    """Thread-safe tally of requests sent and connections opened."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+
+    def count_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def count_connection(self) -> None:
+        with self._lock:
+            self.connections += 1
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            reused = max(0, self.requests - self.connections)
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections,
+                "connections_reused": reused,
+                "reuse_rate": round(reused / self.requests, 4) if self.requests else 0.0,
+            }
+
+
+class _RefuseCookies(http.cookiejar.DefaultCookiePolicy):
+    def set_ok(self, cookie, request) -> bool:
+        return False
+
+    def return_ok(self, cookie, request) -> bool:
+        return False
+
+
+class _CountingAdapter(HTTPAdapter):
+    """``HTTPAdapter`` whose connection pools report to a :class:`ConnectionStats`."""
+
+    def __init__(self, stats: ConnectionStats, **kwargs) -> None:
+        self.connection_stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        stats = self.connection_stats
+
+        def counting(pool_cls):
+            # Count at connect(): pooled connections that were dropped are
+            # reconnected in place rather than replaced
+            class CountingConnection(pool_cls.ConnectionCls):
+                def connect(self):
+                    stats.count_connection()
+                    return super().connect()
+
+            return type(f"Counting{pool_cls.__name__}", (pool_cls,), {"ConnectionCls": CountingConnection})
+
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": counting(HTTPConnectionPool),
+            "https": counting(HTTPSConnectionPool),
+        }
+
+    def send(self, request, **kwargs):
+        self.connection_stats.count_request()
+        return super().send(request, **kwargs)
+
+
+def make_session(
+    pool_connections: int = 32,
+    pool_maxsize: int = 32,
+    keep_alive: bool = True,
+    stats: Optional[ConnectionStats] = None,
+) -> requests.Session:
+    """A session for fetching many sites from many threads; see the module docstring.
+
+    The session's :class:`ConnectionStats` is available as
+    ``session.connection_stats``. With ``keep_alive=False`` every request
+    asks the server to close the connection (useful for comparison runs).
+    """
+    session = requests.Session()
+    session.cookies.set_policy(_RefuseCookies())
+    stats = stats if stats is not None else ConnectionStats()
+    adapter = _CountingAdapter(stats, pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+    session.connection_stats = stats
+    return session
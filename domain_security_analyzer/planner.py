@@ -0,0 +1,153 @@
+"""Per-domain DNS query planning.
+
+Each check declares the ``(name, rdtype)`` lookups it needs; a
+:class:`QueryPlan` collects them, drops duplicates and merges lookups that
+another planned lookup already answers. The analyzer resolves the plan once,
+up front, into an answer set that the checks then read from instead of issuing
+their own queries.
+
+Merge rule: a CNAME lookup is dropped when an A lookup for the same name is
+planned, because the A response carries the CNAME chain (:func:`chain_cname`).
+If the A lookup yields no usable response (timeout, SERVFAIL, cache hit) the
+CNAME is resolved separately, so merging never changes results.
+
+Prune rule: once a name is NXDOMAIN, nothing below it exists either
+(RFC 8020), so every planned lookup under it is answered empty without being
+sent. Resolving a parent early (e.g. ``_domainkey.<domain>`` before the DKIM
+selectors) lets whole groups of lookups be skipped. :meth:`QueryPlan.skip`
+drops lookups for other reasons the same way (DKIM selectors under a
+wildcard).
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import dns.exception
+import dns.message
+import dns.name
+import dns.rdatatype
+import dns.resolver
+
+__all__ = ["QueryPlan", "Lookup", "query_key", "chain_cname", "response_from_exception", "is_nxdomain"]
+
+
+def query_key(name: str, rdtype: str) -> Tuple[str, str]:
+    """Canonical ``(name, rdtype)`` key: lower-case, no trailing dot."""
+    return name.lower().rstrip('.'), rdtype.upper()
+
+
+class Lookup(NamedTuple):
+    """One resolved query as seen by the planner."""
+    records: object                        # what get_dns_record would return
+    response: Optional[dns.message.Message]  # raw response, when one was received
+    issued: bool                           # False when served from cache
+    nxdomain: bool = False                 # the name does not exist at all
+
+
+def response_from_exception(exc: Exception) -> Optional[dns.message.Message]:
+    """The DNS response attached to an NXDOMAIN / NoAnswer, if any."""
+    if isinstance(exc, dns.resolver.NoAnswer):
+        return exc.kwargs.get("response")
+    if isinstance(exc, dns.resolver.NXDOMAIN):
+        responses = list(exc.kwargs.get("responses", {}).values())
+        return responses[0] if responses else None
+    return None
+
+
+def is_nxdomain(exc: Exception) -> bool:
+    """True when ``exc`` says the queried name itself does not exist.
+
+    An NXDOMAIN reached through a CNAME chain only says the *target* is
+    missing; the alias exists, so it does not count.
+    """
+    if not isinstance(exc, dns.resolver.NXDOMAIN):
+        return False
+    return not any(response.answer for response in exc.kwargs.get("responses", {}).values())
+
+
+def chain_cname(name: str, response: dns.message.Message) -> Optional[List[str]]:
+    """CNAME answer for ``name`` implied by a response to a query on ``name``.
+
+    Returns the targets formatted exactly as a direct CNAME query would, or
+    ``None`` when the response shows ``name`` has no CNAME.
+    """
+    qname = dns.name.from_text(name)
+    for rrset in response.answer:
+        if rrset.name == qname and rrset.rdtype == dns.rdatatype.CNAME:
+            return [str(rdata) for rdata in rrset]
+    return None
+
+
+class QueryPlan:
+    """Deduplicated, merged set of lookups needed to analyze one domain."""
+
+    def __init__(self) -> None:
+        self.planned = 0  # lookups declared by the checks, before dedupe/merge
+        self.pruned = 0   # lookups answered without being sent (see record and skip)
+        self._wanted: Dict[Tuple[str, str], Tuple[str, str]] = {}
+
+    def add(self, name: str, rdtype: str) -> None:
+        self.planned += 1
+        self._wanted.setdefault(query_key(name, rdtype), (name, rdtype.upper()))
+
+    def extend(self, queries: Iterable[Tuple[str, str]]) -> None:
+        for name, rdtype in queries:
+            self.add(name, rdtype)
+
+    def merges_cname(self, name: str) -> bool:
+        """True when the CNAME lookup for ``name`` rides on its A lookup."""
+        key = query_key(name, 'CNAME')
+        return key in self._wanted and (key[0], 'A') in self._wanted
+
+    def queries(self) -> List[Tuple[str, str]]:
+        """Lookups to issue, in declaration order."""
+        return [
+            (name, rdtype) for (key_name, key_type), (name, rdtype) in self._wanted.items()
+            if not (key_type == 'CNAME' and self.merges_cname(key_name))
+        ]
+
+    def __len__(self) -> int:
+        return len(self.queries())
+
+    def pending(self, answers: Dict[Tuple[str, str], object]) -> List[Tuple[str, str]]:
+        """Lookups from :meth:`queries` not yet present in ``answers``."""
+        return [query for query in self.queries() if query_key(*query) not in answers]
+
+    def record(self, answers: Dict[Tuple[str, str], object], name: str, rdtype: str, lookup: Lookup) -> None:
+        """Store ``lookup`` in ``answers``, deriving any CNAME merged into it.
+
+        An NXDOMAIN also answers (with ``None``) every planned lookup below
+        ``name`` that is still outstanding; see :meth:`pruned`.
+        """
+        answers[query_key(name, rdtype)] = lookup.records
+        if lookup.nxdomain:
+            suffix = '.' + query_key(name, rdtype)[0]
+            for key in self._wanted:
+                if key[0].endswith(suffix) and key not in answers:
+                    answers[key] = None
+                    if not (key[1] == 'CNAME' and self.merges_cname(key[0])):
+                        self.pruned += 1
+        if rdtype.upper() == 'A' and lookup.response is not None and self.merges_cname(name):
+            try:
+                answers[query_key(name, 'CNAME')] = chain_cname(name, lookup.response)
+            except dns.exception.DNSException:
+                pass  # left unanswered; resolved directly by unresolved()
+
+    def skip(self, answers: Dict[Tuple[str, str], object], queries: Iterable[Tuple[str, str]]) -> None:
+        """Answer the planned, still outstanding ``queries`` with ``None`` without sending them.
+
+        For lookups another answer has made pointless, such as DKIM selectors
+        under a wildcard; they count as :attr:`pruned`.
+        """
+        for name, rdtype in queries:
+            key = query_key(name, rdtype)
+            if key in self._wanted and key not in answers:
+                answers[key] = None
+                self.pruned += 1
+
+    def unresolved(self, answers: Dict[Tuple[str, str], object]) -> List[Tuple[str, str]]:
+        """Merged CNAME lookups whose A response could not supply the chain."""
+        return [
+            (name, rdtype) for key, (name, rdtype) in self._wanted.items()
+            if key not in answers
+        ]
@@ -0,0 +1,125 @@
+"""Registered domains from the Public Suffix List.
+
+The zone a name's SOA lives in is not its last two labels: under ``co.uk``
+or ``com.au`` it is the last three, and some suffixes are wildcards
+(``*.ck``) with exceptions (``!www.ck``). :func:`registered_domain` finds
+it with the ICANN section of the Public Suffix List, bundled as
+``data/public_suffix_list.dat``. The private section (``github.io``,
+``blogspot.com``, ...) is left out on purpose: those suffixes are not DNS
+zone cuts, so SOA lookups and zone grouping would go wrong with them.
+
+The list is compiled once, on first use, into a trie keyed by labels from
+the right, so a lookup walks one node per label of the name.
+"""
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+__all__ = ["PublicSuffixList", "default_list", "public_suffix", "registered_domain"]
+
+PUBLIC_SUFFIX_LIST_FILE = Path(__file__).parent / 'data' / 'public_suffix_list.dat'
+
+# Key marking the end of a rule in a trie node: True for a rule, False for
+# an exception ("!"). Labels are never empty, so it cannot clash with one.
+_RULE = ''
+
+
+def _rule_forms(rule: str) -> Iterable[str]:
+    """The rule as written and, for internationalized rules, in its ``xn--`` form."""
+    yield rule
+    try:
+        ascii_rule = rule.encode('idna').decode('ascii')
+    except UnicodeError:
+        return
+    if ascii_rule != rule:
+        yield ascii_rule
+
+
+class PublicSuffixList:
+    """Public suffix rules compiled into a reversed-label trie.
+
+    ``lines`` are in the list's file format: one rule per line, ``//``
+    comments and blank lines ignored, ``*`` wildcard labels and ``!``
+    exception rules.
+    """
+
+    def __init__(self, lines: Iterable[str]) -> None:
+        self._root: Dict[str, dict] = {}
+        for line in lines:
+            rule = line.split(None, 1)[0] if line.strip() else ''
+            if not rule or rule.startswith('//'):
+                continue
+            exception = rule.startswith('!')
+            for form in _rule_forms(rule.lstrip('!').lower()):
+                node = self._root
+                for label in reversed(form.split('.')):
+                    node = node.setdefault(label, {})
+                node[_RULE] = not exception
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> "PublicSuffixList":
+        with open(path, encoding='utf-8') as f:
+            return cls(f)
+
+    def suffix_labels(self, labels: list) -> int:
+        """How many trailing ``labels`` (lower-case) form the public suffix.
+
+        An unlisted TLD counts as a one-label suffix, as the list's ``*``
+        default rule prescribes.
+        """
+        node = self._root
+        suffix = 1
+        for depth, label in enumerate(reversed(labels), 1):
+            child = node.get(label)
+            if child is not None and child.get(_RULE) is False:
+                return depth - 1  # exception: the parent is the suffix
+            if '*' in node or (child is not None and child.get(_RULE)):
+                suffix = depth
+            node = child if child is not None else node.get('*')
+            if node is None:
+                break
+        return suffix
+
+    def public_suffix(self, name: str) -> str:
+        """The public suffix of ``name``, e.g. ``co.uk`` for ``shop.example.co.uk``."""
+        labels = name.rstrip('.').lower().split('.')
+        return '.'.join(labels[-self.suffix_labels(labels):])
+
+    def registered_domain(self, name: str) -> str:
+        """``name``'s public suffix plus one label, e.g. ``example.co.uk``.
+
+        ``name`` itself (without a trailing dot) when it is no longer than
+        its public suffix.
+        """
+        name = name.rstrip('.')
+        labels = name.lower().split('.')
+        keep = self.suffix_labels(labels) + 1
+        if len(labels) <= keep:
+            return name
+        return '.'.join(name.split('.')[-keep:])
+
+
+_default: Optional[PublicSuffixList] = None
+_default_lock = threading.Lock()
+
+
+def default_list() -> PublicSuffixList:
+    """The bundled list, compiled on first use and shared afterwards."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = PublicSuffixList.from_file(PUBLIC_SUFFIX_LIST_FILE)
+    return _default
+
+
+def public_suffix(name: str) -> str:
+    """:meth:`PublicSuffixList.public_suffix` with the bundled list."""
+    return default_list().public_suffix(name)
+
+
+def registered_domain(name: str) -> str:
+    """:meth:`PublicSuffixList.registered_domain` with the bundled list."""
+    return default_list().registered_domain(name)
@@ -0,0 +1,708 @@
+"""Pool of upstream DNS resolvers with health tracking.
+
+:class:`ResolverPool` replaces the single ``dns.resolver.Resolver`` (and the
+fresh system resolver built on every timeout) that the analyzers used to
+query with. It is built once per run and shared by every worker:
+
+* Upstreams are picked round-robin or by lowest smoothed latency.
+* A timeout or server failure fails over to the next upstream within the
+  same query, instead of rebuilding a resolver and starting over.
+* An upstream that fails ``max_failures`` times in a row is ejected for
+  ``cooldown`` seconds, then re-admitted on probation: one more failure
+  ejects it again. If every upstream is ejected the pool keeps using the one
+  due back soonest rather than failing every query.
+* Per-upstream query, error and latency counters are available from
+  :meth:`ResolverPool.stats`.
+
+NXDOMAIN and NoAnswer are answers, not failures: they count as healthy
+responses and are raised to the caller unchanged, exactly like
+``Resolver.resolve``.
+
+Each upstream has its own :class:`AIMDLimiter` capping the queries in
+flight to it. The cap grows by one per round trip while answers come back
+at close to the best latency seen, and halves on a timeout, SERVFAIL or
+REFUSED, so a resolver that starts rate-limiting is backed off from instead
+of being pushed into answering garbage. A query that still fails on every
+upstream is retried ``retries`` times after a short backoff.
+
+Hedging: when a query has not been answered after the recent p95 RTT, the
+same query is sent to the next upstream (or again to the only one) and the
+first answer wins. Every query a lookup sends beyond its first is charged
+to ``hedge_budget`` (a fraction of all lookups), so hedging costs at most
+that much extra load. On the threaded path the primary attempt runs on the
+caller's thread, cut off at the hedge delay; only a lookup still
+unanswered then races a re-send to its primary upstream against the hedge
+on a small shared executor, sized from the budget and the upstreams'
+in-flight caps. The re-send is charged too, and paid for before the
+primary is cut off: a lookup the budget cannot cover is not cut off at
+all. :meth:`ResolverPool.latency_stats`
+reports the hedge rate alongside p50/p99 of the primary attempts (what an
+unhedged run would have seen) and of the answers callers actually got.
+"""
+from __future__ import annotations
+
+import asyncio
+import collections
+import concurrent.futures
+import itertools
+import math
+import random
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import dns.asyncresolver
+import dns.exception
+import dns.resolver
+
+__all__ = ["ResolverPool", "Upstream", "AIMDLimiter", "parse_nameserver", "STRATEGIES"]
+
+STRATEGIES = ("round-robin", "least-latency")
+
+# Weight of the newest sample in an upstream's smoothed RTT
+_EWMA_ALPHA = 0.2
+
+# Failures that say something about the upstream rather than the name queried
+_UPSTREAM_FAILURES = (dns.exception.Timeout, dns.resolver.NoNameservers)
+
+# Negative answers: healthy responses that are raised like Resolver.resolve does
+_NEGATIVE_ANSWERS = (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer)
+
+# Hedging waits for this many primary RTT samples before it kicks in, and
+# recomputes its delay every _HEDGE_REFRESH samples
+_HEDGE_MIN_SAMPLES = 20
+_HEDGE_REFRESH = 64
+
+
+def _percentile(samples: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of ``samples`` (``q`` in 0..1), ``None`` if empty."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def parse_nameserver(spec: str, default_port: int = 53) -> Tuple[str, int]:
+    """Parse ``"1.1.1.1"``, ``"1.1.1.1:5353"`` or ``"[2606:4700::1111]:53"``."""
+    spec = spec.strip()
+    if spec.startswith('['):
+        host, _, rest = spec[1:].partition(']')
+        return host, int(rest[1:]) if rest.startswith(':') else default_port
+    if spec.count(':') == 1:
+        host, port = spec.split(':')
+        return host, int(port)
+    return spec, default_port
+
+
+class AIMDLimiter:
+    """Additive-increase / multiplicative-decrease cap on queries in flight.
+
+    Usable from threads (:meth:`acquire`) and coroutines
+    (:meth:`acquire_async`) at once; waiters are served in arrival order.
+    Every acquired slot must be given back with :meth:`release`, which also
+    feeds the outcome into the cap:
+
+    * an answer within ``2 * best RTT + 10 ms`` raises the cap by
+      ``1 / cap`` (about one per round trip's worth of answers);
+    * a congestion signal (timeout, SERVFAIL, REFUSED) multiplies it by
+      ``backoff``, at most once per smoothed RTT so one burst of failures
+      counts as a single signal;
+    * slower answers leave it unchanged.
+    """
+
+    def __init__(self, initial: int = 16, minimum: int = 1, maximum: int = 256, backoff: float = 0.5):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.backoff = backoff
+        self.inflight = 0
+        self.peak = self.limit
+        self.backoffs = 0
+        self._lock = threading.Lock()
+        self._waiters: collections.deque = collections.deque()
+        self._best_rtt: Optional[float] = None
+        self._smoothed_rtt = 0.1
+        self._last_backoff = float("-inf")
+
+    def _has_room(self) -> bool:
+        return self.inflight < int(self.limit)
+
+    def try_acquire(self) -> bool:
+        """Take a slot only if one is free right now (never queues)."""
+        with self._lock:
+            if self._waiters or not self._has_room():
+                return False
+            self.inflight += 1
+            return True
+
+    def acquire(self) -> None:
+        """Block the calling thread until a slot is free."""
+        with self._lock:
+            if not self._waiters and self._has_room():
+                self.inflight += 1
+                return
+            granted = threading.Event()
+            self._waiters.append(granted.set)
+        granted.wait()  # release() hands the slot over before waking us
+
+    async def acquire_async(self) -> None:
+        """Wait on the running event loop until a slot is free."""
+        with self._lock:
+            if not self._waiters and self._has_room():
+                self.inflight += 1
+                return
+            future = asyncio.get_running_loop().create_future()
+
+            def grant() -> None:
+                future.get_loop().call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+            self._waiters.append(grant)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if grant in self._waiters:
+                    self._waiters.remove(grant)
+                    raise
+            self.release()  # the slot was handed over as we were cancelled
+            raise
+
+    def release(self, rtt: Optional[float] = None, congested: bool = False) -> None:
+        """Give a slot back; ``rtt`` of an answer, or ``congested`` on a throttling failure."""
+        now = time.monotonic()
+        with self._lock:
+            self.inflight -= 1
+            if congested:
+                if now - self._last_backoff >= self._smoothed_rtt:
+                    self.limit = max(float(self.minimum), self.limit * self.backoff)
+                    self.backoffs += 1
+                    self._last_backoff = now
+            elif rtt is not None:
+                self._smoothed_rtt = (1 - _EWMA_ALPHA) * self._smoothed_rtt + _EWMA_ALPHA * rtt
+                if self._best_rtt is None or rtt < self._best_rtt:
+                    self._best_rtt = rtt
+                if rtt <= 2 * self._best_rtt + 0.01:
+                    self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+                    self.peak = max(self.peak, self.limit)
+            while self._waiters and self._has_room():
+                self.inflight += 1
+                self._waiters.popleft()()
+
+
+class Upstream:
+    """One upstream nameserver and its health counters."""
+
+    def __init__(self, address: str, port: int = 53, timeout: float = 5.0,
+                 limiter: Optional[AIMDLimiter] = None):
+        self.address = address
+        self.port = port
+        self.resolver = dns.resolver.Resolver(configure=False)
+        self.resolver.nameservers = [address]
+        self.resolver.port = port
+        self.resolver.timeout = timeout
+        self.resolver.lifetime = timeout
+        self._async_resolver: Optional[dns.asyncresolver.Resolver] = None
+        self.limiter = limiter if limiter is not None else AIMDLimiter()
+
+        self.queries = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.ejections = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.rtt: Optional[float] = None  # smoothed RTT in seconds
+        self.total_rtt = 0.0
+
+    @property
+    def name(self) -> str:
+        return f"{self.address}:{self.port}" if self.port != 53 else self.address
+
+    @property
+    def async_resolver(self) -> dns.asyncresolver.Resolver:
+        # Built lazily: only the async engine needs it
+        if self._async_resolver is None:
+            resolver = dns.asyncresolver.Resolver(configure=False)
+            resolver.nameservers = [self.address]
+            resolver.port = self.port
+            resolver.timeout = self.resolver.timeout
+            resolver.lifetime = self.resolver.lifetime
+            self._async_resolver = resolver
+        return self._async_resolver
+
+    def stats(self, now: float) -> Dict:
+        answered = self.queries - self.errors
+        return {
+            "queries": self.queries,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "error_rate": self.errors / self.queries if self.queries else 0.0,
+            "mean_ms": self.total_rtt / answered * 1000 if answered else None,
+            "ewma_ms": self.rtt * 1000 if self.rtt is not None else None,
+            "ejections": self.ejections,
+            "healthy": self.ejected_until <= now,
+            "inflight_limit": int(self.limiter.limit),
+            "inflight_peak": int(self.limiter.peak),
+            "backoffs": self.limiter.backoffs,
+        }
+
+
+class ResolverPool:
+    """Thread-safe pool of upstream resolvers; see the module docstring.
+
+    ``nameservers`` defaults to the system configuration, read once.
+    ``strategy`` is ``"round-robin"`` or ``"least-latency"``. Each query tries
+    at most ``attempts`` distinct upstreams, each for up to ``timeout``
+    seconds, and a query that failed everywhere is retried ``retries`` more
+    times. Each upstream starts at ``initial_inflight`` concurrent queries
+    and adapts between 1 and ``max_inflight`` (see :class:`AIMDLimiter`).
+
+    ``hedge_budget`` is the largest fraction of queries that may be hedged
+    (``0`` disables hedging); the hedge delay is the ``hedge_quantile`` of
+    recent primary RTTs, at least ``hedge_min_delay`` seconds.
+    """
+
+    def __init__(
+        self,
+        nameservers: Optional[Iterable[str]] = None,
+        *,
+        strategy: str = "round-robin",
+        timeout: float = 5.0,
+        attempts: int = 2,
+        max_failures: int = 3,
+        cooldown: float = 30.0,
+        retries: int = 1,
+        initial_inflight: int = 16,
+        max_inflight: int = 256,
+        hedge_budget: float = 0.05,
+        hedge_quantile: float = 0.95,
+        hedge_min_delay: float = 0.01,
+    ):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown resolver strategy {strategy!r}; expected one of {', '.join(STRATEGIES)}")
+        if nameservers is None:
+            system = dns.resolver.Resolver()
+            servers = [(ns, system.port) for ns in system.nameservers if isinstance(ns, str)]
+        else:
+            servers = [parse_nameserver(ns) for ns in nameservers]
+        if not servers:
+            raise ValueError("ResolverPool needs at least one nameserver")
+
+        self.upstreams: List[Upstream] = [
+            Upstream(address, port, timeout, AIMDLimiter(initial_inflight, maximum=max_inflight))
+            for address, port in servers
+        ]
+        self.strategy = strategy
+        self.attempts = max(1, attempts)
+        self.max_failures = max(1, max_failures)
+        self.cooldown = cooldown
+        self.retries = max(0, retries)
+        self.retried = 0  # lookups that needed another round after failing everywhere
+        self.failed = 0   # lookups that failed even after the retries
+        self._lock = threading.Lock()
+        self._rotation = itertools.count()
+
+        self.hedge_budget = max(0.0, hedge_budget)
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.lookups = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._primary_rtts: collections.deque = collections.deque(maxlen=2048)
+        self._effective_rtts: collections.deque = collections.deque(maxlen=2048)
+        self._hedge_delay: Optional[float] = None
+        self._samples_since_refresh = 0
+        self._hedge_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        # Threads for racing slow lookups: two per hedge, for the share of
+        # the upstreams' in-flight queries the budget allows to be hedged
+        self._race_threads = 2 * max(1, math.ceil(self.hedge_budget * max_inflight * len(self.upstreams)))
+        self._race_tasks = 0
+        self._stragglers: set = set()
+
+    def candidates(self) -> List[Upstream]:
+        """Upstreams to try for one query, best first, at most ``attempts`` long."""
+        now = time.monotonic()
+        with self._lock:
+            healthy = [u for u in self.upstreams if u.ejected_until <= now]
+            if not healthy:
+                # Everyone is ejected: fall back to whoever is due back first
+                healthy = sorted(self.upstreams, key=lambda u: u.ejected_until)[:1]
+            if self.strategy == "least-latency":
+                # Untried upstreams sort first so each gets measured
+                ordered = sorted(healthy, key=lambda u: -1.0 if u.rtt is None else u.rtt)
+            else:
+                start = next(self._rotation) % len(healthy)
+                ordered = healthy[start:] + healthy[:start]
+        return ordered[:self.attempts]
+
+    def record(self, upstream: Upstream, rtt: Optional[float], error: Optional[Exception] = None) -> None:
+        """Account one query against ``upstream``; ``error`` marks a failure."""
+        with self._lock:
+            upstream.queries += 1
+            if error is None:
+                upstream.consecutive_failures = 0
+                upstream.total_rtt += rtt
+                upstream.rtt = rtt if upstream.rtt is None else (1 - _EWMA_ALPHA) * upstream.rtt + _EWMA_ALPHA * rtt
+                return
+            upstream.errors += 1
+            if isinstance(error, dns.exception.Timeout):
+                upstream.timeouts += 1
+            upstream.consecutive_failures += 1
+            if upstream.consecutive_failures >= self.max_failures:
+                upstream.ejected_until = time.monotonic() + self.cooldown
+                upstream.ejections += 1
+                # On re-admission a single failure ejects it again
+                upstream.consecutive_failures = self.max_failures - 1
+
+    def _record_primary(self, rtt: float) -> None:
+        with self._lock:
+            self._primary_rtts.append(rtt)
+            self._samples_since_refresh += 1
+            if self._samples_since_refresh >= _HEDGE_REFRESH or (
+                    self._hedge_delay is None and len(self._primary_rtts) >= _HEDGE_MIN_SAMPLES):
+                delay = _percentile(list(self._primary_rtts), self.hedge_quantile)
+                self._hedge_delay = max(self.hedge_min_delay, delay)
+                self._samples_since_refresh = 0
+
+    def _start_lookup(self) -> Optional[float]:
+        """Count a lookup; returns the hedge delay, or ``None`` not to hedge it."""
+        with self._lock:
+            self.lookups += 1
+            return self._hedge_delay if self.hedge_budget > 0 else None
+
+    def _finish_lookup(self, start: float) -> None:
+        with self._lock:
+            self._effective_rtts.append(time.monotonic() - start)
+
+    def _take_hedge(self, count: int = 1) -> bool:
+        """Spend ``count`` extra queries from the budget, if that much is left."""
+        with self._lock:
+            if self.hedges + count > self.hedge_budget * self.lookups:
+                return False
+            self.hedges += count
+            return True
+
+    def _refund_hedge(self, count: int) -> None:
+        """Return extra queries taken by :meth:`_take_hedge` but never sent."""
+        if count:
+            with self._lock:
+                self.hedges -= count
+
+    def _targets(self) -> List[Upstream]:
+        # A lone upstream is hedged against itself (a retransmission)
+        upstreams = self.candidates()
+        return upstreams if len(upstreams) > 1 else upstreams * 2
+
+    def _attempt(self, upstream: Upstream, qname: str, rdtype: str, primary: bool,
+                 acquired: bool = False, within: Optional[float] = None,
+                 elapsed: float = 0.0) -> Optional[dns.resolver.Answer]:
+        """One query to one upstream, with health, latency and concurrency accounting.
+
+        Waits for a slot in the upstream's limiter unless the caller already
+        ``acquired`` one. With ``within``, the attempt is given up after that
+        many seconds and ``None`` returned, without counting against the
+        upstream. ``elapsed`` is time the lookup already spent on an earlier,
+        cut-off primary attempt, included in the primary latency sample.
+        """
+        if not acquired:
+            upstream.limiter.acquire()
+        start = time.monotonic()
+        rtt, congested, cut_off = None, False, False
+        try:
+            if within is None:
+                answer = upstream.resolver.resolve(qname, rdtype)
+            else:
+                answer = upstream.resolver.resolve(qname, rdtype, lifetime=within)
+            rtt = time.monotonic() - start
+        except _NEGATIVE_ANSWERS:
+            rtt = time.monotonic() - start
+            self.record(upstream, rtt)
+            raise
+        except _UPSTREAM_FAILURES as e:
+            if within is not None and isinstance(e, dns.resolver.LifetimeTimeout):
+                cut_off = True  # not an upstream failure: the caller hedges now
+                return None
+            congested = True
+            self.record(upstream, None, e)
+            raise
+        finally:
+            upstream.limiter.release(rtt, congested)
+            if primary and not cut_off:
+                self._record_primary(time.monotonic() - start + elapsed)
+        self.record(upstream, rtt)
+        return answer
+
+    async def _attempt_async(self, upstream: Upstream, qname: str, rdtype: str, primary: bool,
+                             acquired: bool = False) -> dns.resolver.Answer:
+        """Coroutine flavour of :meth:`_attempt`."""
+        if not acquired:
+            await upstream.limiter.acquire_async()
+        start = time.monotonic()
+        rtt, congested = None, False
+        try:
+            answer = await upstream.async_resolver.resolve(qname, rdtype)
+            rtt = time.monotonic() - start
+        except _NEGATIVE_ANSWERS:
+            rtt = time.monotonic() - start
+            self.record(upstream, rtt)
+            raise
+        except _UPSTREAM_FAILURES as e:
+            congested = True
+            self.record(upstream, None, e)
+            raise
+        finally:
+            upstream.limiter.release(rtt, congested)
+            if primary:
+                self._record_primary(time.monotonic() - start)
+        self.record(upstream, rtt)
+        return answer
+
+    def resolve(self, qname: str, rdtype: str) -> dns.resolver.Answer:
+        """Resolve like ``Resolver.resolve``, failing over between upstreams.
+
+        Raises the last upstream's exception when every attempt failed.
+        """
+        start = time.monotonic()
+        delay = self._start_lookup()
+        try:
+            for round_ in itertools.count():
+                try:
+                    if delay is None:
+                        return self._resolve_serial(qname, rdtype)
+                    return self._resolve_hedged(qname, rdtype, delay)
+                except _UPSTREAM_FAILURES:
+                    if not self._retry(round_):
+                        raise
+                time.sleep(self._backoff(round_))
+        finally:
+            self._finish_lookup(start)
+
+    def _retry(self, round_: int) -> bool:
+        """Whether a lookup that failed everywhere ``round_ + 1`` times gets another round."""
+        with self._lock:
+            if round_ < self.retries:
+                self.retried += 1
+                return True
+            self.failed += 1
+            return False
+
+    @staticmethod
+    def _backoff(round_: int) -> float:
+        # Jittered exponential backoff, so throttled queries do not return in lockstep
+        return 0.25 * 2 ** round_ * (0.5 + random.random())
+
+    def _hedge_slot(self, upstream: Upstream) -> bool:
+        """Reserve a slot on ``upstream`` and a hedge from the budget, or neither.
+
+        Hedges never queue: an upstream at its in-flight cap is congested,
+        and piling duplicates onto it would only make that worse.
+        """
+        if not upstream.limiter.try_acquire():
+            return False
+        if self._take_hedge():
+            return True
+        upstream.limiter.release()
+        return False
+
+    def _resolve_serial(self, qname: str, rdtype: str) -> dns.resolver.Answer:
+        upstreams = self.candidates()
+        try:
+            return self._attempt(upstreams[0], qname, rdtype, True)
+        except _UPSTREAM_FAILURES as e:
+            return self._fail_over(upstreams[1:], qname, rdtype, e)
+
+    def _fail_over(self, upstreams: List[Upstream], qname: str, rdtype: str,
+                   error: Exception) -> dns.resolver.Answer:
+        """Try ``upstreams`` in turn after a failure; raises the last ``error`` if all fail."""
+        for upstream in upstreams:
+            try:
+                return self._attempt(upstream, qname, rdtype, False)
+            except _UPSTREAM_FAILURES as e:
+                error = e
+        raise error
+
+    def _resolve_hedged(self, qname: str, rdtype: str, delay: float) -> dns.resolver.Answer:
+        # Most lookups are answered within the delay on the caller's thread.
+        # A slower one has its query re-sent to the primary upstream, which is
+        # usually still resolving it and answers from cache, and races that
+        # against the hedge on the executor. Both extra queries are paid for
+        # up front; whatever is not sent is refunded.
+        targets = self._targets()
+        primary, hedge = targets[0], targets[1]
+        others = [u for u in targets[1:] if u is not primary]
+        unspent = 1 if hedge is primary else 2
+        if not self._take_hedge(unspent):
+            return self._resolve_serial(qname, rdtype)
+        try:
+            answer = self._attempt(primary, qname, rdtype, True, within=delay)
+            if answer is not None:
+                return answer
+            if hedge is primary:
+                # A lone upstream: the re-send is the hedge
+                unspent = 0
+                answer = self._attempt(primary, qname, rdtype, True, elapsed=delay)
+                self._count_win(True)
+                return answer
+            unspent = 1  # the re-send goes out either way; the hedge only if it can race
+            if not self._reserve_race(hedge):
+                return self._attempt(primary, qname, rdtype, True, elapsed=delay)
+            unspent = 0
+        except _UPSTREAM_FAILURES as e:
+            return self._fail_over(others, qname, rdtype, e)
+        finally:
+            self._refund_hedge(unspent)
+
+        executor = self._executor()
+        running = {
+            executor.submit(self._attempt, primary, qname, rdtype, True, False, None, delay): primary,
+            executor.submit(self._attempt, hedge, qname, rdtype, False, True): hedge,
+        }
+        for future in running:
+            future.add_done_callback(self._race_task_done)
+        last_error: Optional[Exception] = None
+        while running:
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                upstream = running.pop(future)
+                try:
+                    answer = future.result()
+                except _UPSTREAM_FAILURES as e:
+                    last_error = e
+                    continue
+                except _NEGATIVE_ANSWERS:
+                    self._count_win(upstream is hedge)
+                    raise
+                self._count_win(upstream is hedge)
+                return answer
+        # Both failed: fail over to whoever is left, as the serial path does
+        return self._fail_over(others[1:], qname, rdtype, last_error)
+
+    def _reserve_race(self, hedge: Upstream) -> bool:
+        """Reserve two executor threads and a slot on ``hedge``, or nothing.
+
+        Races never queue for a thread: without a free pair the lookup just
+        waits for its primary upstream.
+        """
+        with self._lock:
+            if self._race_tasks + 2 > self._race_threads:
+                return False
+            self._race_tasks += 2
+        # Hedges never queue on a congested upstream (see _hedge_slot)
+        if hedge.limiter.try_acquire():
+            return True
+        with self._lock:
+            self._race_tasks -= 2
+        return False
+
+    def _race_task_done(self, future: concurrent.futures.Future) -> None:
+        # Losers finish in the background; their thread is only free then
+        with self._lock:
+            self._race_tasks -= 1
+
+    async def resolve_async(self, qname: str, rdtype: str) -> dns.resolver.Answer:
+        """Coroutine flavour of :meth:`resolve` on ``dns.asyncresolver``."""
+        start = time.monotonic()
+        delay = self._start_lookup()
+        try:
+            for round_ in itertools.count():
+                try:
+                    return await self._resolve_once_async(qname, rdtype, delay)
+                except _UPSTREAM_FAILURES:
+                    if not self._retry(round_):
+                        raise
+                await asyncio.sleep(self._backoff(round_))
+        finally:
+            self._finish_lookup(start)
+
+    async def _resolve_once_async(self, qname: str, rdtype: str, delay: Optional[float]) -> dns.resolver.Answer:
+        targets = self._targets()
+        running = {asyncio.ensure_future(self._attempt_async(targets[0], qname, rdtype, True)): 0}
+        launched = 1
+        may_hedge = delay is not None
+        hedge: Optional[int] = None
+        last_error: Optional[Exception] = None
+        try:
+            while running:
+                done, _ = await asyncio.wait(
+                    running, timeout=delay if may_hedge else None, return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    may_hedge = False
+                    if launched < len(targets) and self._hedge_slot(targets[launched]):
+                        task = asyncio.ensure_future(self._attempt_async(targets[launched], qname, rdtype, False, True))
+                        running[task] = launched
+                        hedge = launched
+                        launched += 1
+                    continue
+                for task in done:
+                    index = running.pop(task)
+                    try:
+                        answer = task.result()
+                    except _UPSTREAM_FAILURES as e:
+                        last_error = e
+                        continue
+                    except _NEGATIVE_ANSWERS:
+                        self._count_win(index == hedge)
+                        raise
+                    self._count_win(index == hedge)
+                    return answer
+                if not running and launched < len(targets) and targets[launched] is not targets[0]:
+                    may_hedge = False
+                    task = asyncio.ensure_future(self._attempt_async(targets[launched], qname, rdtype, False))
+                    running[task] = launched
+                    launched += 1
+            raise last_error
+        except asyncio.CancelledError:
+            for task in running:
+                task.cancel()
+            running.clear()
+            raise
+        finally:
+            # Losers run to completion, as on the threaded path, so the primary
+            # latency samples include the slow answers that hedging avoided.
+            for task in running:
+                self._stragglers.add(task)
+                task.add_done_callback(self._stragglers.discard)
+
+    def _count_win(self, hedge_won: bool) -> None:
+        if hedge_won:
+            with self._lock:
+                self.hedge_wins += 1
+
+    def _executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._hedge_executor is None:
+                # Only slow lookups race here (see _reserve_race); threads
+                # are only started as needed.
+                self._hedge_executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self._race_threads, thread_name_prefix="dns-hedge")
+            return self._hedge_executor
+
+    def latency_stats(self) -> Dict:
+        """Hedge rate and p50/p99 latency of primary attempts vs. answers returned.
+
+        ``hedged`` counts the extra queries sent (hedges and re-sends).
+        """
+        with self._lock:
+            primary, effective = list(self._primary_rtts), list(self._effective_rtts)
+            lookups, hedges, wins, delay = self.lookups, self.hedges, self.hedge_wins, self._hedge_delay
+
+        def ms(value: Optional[float]) -> Optional[float]:
+            return value * 1000 if value is not None else None
+
+        return {
+            "lookups": lookups,
+            "hedged": hedges,
+            "hedge_rate": hedges / lookups if lookups else 0.0,
+            "hedge_wins": wins,
+            "hedge_delay_ms": ms(delay),
+            "primary_p50_ms": ms(_percentile(primary, 0.50)),
+            "primary_p99_ms": ms(_percentile(primary, 0.99)),
+            "effective_p50_ms": ms(_percentile(effective, 0.50)),
+            "effective_p99_ms": ms(_percentile(effective, 0.99)),
+        }
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-upstream counters keyed by ``address[:port]``."""
+        now = time.monotonic()
+        with self._lock:
+            return {u.name: u.stats(now) for u in self.upstreams}
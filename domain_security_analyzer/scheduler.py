@@ -0,0 +1,91 @@
+"""Order a domain list so related domains are analyzed close together.
+
+Input lists arrive in arbitrary order, so domains sharing a parent zone or
+name servers are spread across the run. By the time the second subdomain
+of a zone comes up its parent SOA may have left the bounded
+:class:`~domain_security_analyzer.dnscache.DNSCache`, and the upstream
+resolver has long since moved on from that zone's servers.
+:func:`schedule_domains` normalizes and dedupes the list, then sorts it so
+that:
+
+* every name under one registered domain (see
+  :func:`~domain_security_analyzer.psl.registered_domain`) is adjacent,
+  apex first;
+* registered domains served by the same set of name servers are adjacent.
+
+Sorting needs the whole list, so a scheduled run holds it in memory
+instead of reading the input lazily.
+"""
+from __future__ import annotations
+
+import concurrent.futures
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .psl import registered_domain
+
+__all__ = ["normalize_domain", "schedule_domains"]
+
+
+def normalize_domain(name: str) -> str:
+    """``name`` lower-cased, without a trailing dot, and IDNA-encoded.
+
+    ``Bücher.Example.`` becomes ``xn--bcher-kva.example``, the form DNS
+    answers and other input lines use. Names the IDNA codec rejects (an
+    over-long or empty label) are returned lower-cased, for the analysis to
+    report.
+    """
+    name = name.strip().rstrip('.').lower()
+    try:
+        return name.encode('idna').decode('ascii')
+    except UnicodeError:
+        return name
+
+
+def schedule_domains(
+    domains: Iterable[str],
+    *,
+    ns_lookup: Optional[Callable[[str], Optional[List[str]]]] = None,
+    workers: int = 10,
+) -> Tuple[List[str], Dict[str, int]]:
+    """Normalize, dedupe and cluster ``domains``; see the module docstring.
+
+    ``ns_lookup(zone)`` returns the NS records of a registered domain (or
+    ``None``); it is called once per registered domain, on up to ``workers``
+    threads. Without it, domains are clustered by registered domain only.
+
+    Returns the ordered domains and counts: ``input`` names read,
+    ``duplicates`` removed, ``zones`` (registered domains) and ``ns_groups``
+    (distinct name-server sets among them).
+    """
+    seen = set()
+    read = 0
+    for domain in domains:
+        read += 1
+        seen.add(normalize_domain(domain))
+
+    zones: Dict[str, Tuple[str, ...]] = {name: () for name in map(registered_domain, seen)}
+    if ns_lookup is not None and zones:
+        def name_servers(zone: str) -> Tuple[str, ...]:
+            try:
+                records = ns_lookup(zone)
+            except Exception:
+                records = None
+            if not isinstance(records, list):
+                return ()
+            return tuple(sorted({record.rstrip('.').lower() for record in records}))
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(workers, len(zones)))) as pool:
+            zones = dict(zip(zones, pool.map(name_servers, zones)))
+
+    def key(name: str) -> tuple:
+        zone = registered_domain(name)
+        # Reversed labels put the apex first and group sub-zones within it
+        return zones[zone], zone, name.split('.')[::-1]
+
+    ordered = sorted(seen, key=key)
+    return ordered, {
+        "input": read,
+        "duplicates": read - len(ordered),
+        "zones": len(zones),
+        "ns_groups": len(set(zones.values())),
+    }
@@ -19,6 +19,8 @@ Each unsafe resource carries machine-readable ``reasons`` drawn from:
 * ``mixed-invalid-hashes``  - some hashes valid, some malformed
 * ``non-https-resource``    - loaded over plain HTTP
 * ``missing-crossorigin``   - cross-origin resource without a ``crossorigin`` attribute
+* ``integrity-mismatch``    - hash does not match the resource as served (only
+  with ``verify_integrity=True``, see :mod:`~domain_security_analyzer.sridigest`)
 
 The report also surfaces any ``Content-Security-Policy`` headers and whether a
 restrictive one is present as a compensating control.
@@ -26,15 +28,24 @@ restrictive one is present as a compensating control.
 from __future__ import annotations
 
 import collections
+import hashlib
+import itertools
+import math
 import re
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
-from typing import Dict, Iterable, List, Optional, Set, Tuple
-from urllib.parse import urljoin, urlparse
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import ParseResult, urljoin, urlparse, urlsplit, urlunsplit
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 
-__all__ = ["SRIParser", "UnsafeResource", "scan_url", "INTEGRITY_PATTERN"]
+from .htmlscan import BACKENDS as HTML_BACKENDS, ScanCache, scan_html
+from .http_session import make_session
+from .sridigest import DigestCache, verify_integrity as _integrity_matches
+
+__all__ = ["SRIParser", "UnsafeResource", "scan_url", "scan_urls", "INTEGRITY_PATTERN"]
 
 # Regular expression to validate integrity hashes (sha256/sha384/sha512)
 INTEGRITY_PATTERN = re.compile(r"^(sha(256|384|512))-[A-Za-z0-9+/=]+$")
@@ -57,6 +68,109 @@ DEFAULT_USER_AGENT = (
 )
 
 
+# The crawl frontier holds at most this many URLs per page still to crawl;
+# the slack covers queued pages that turn out not to be HTML
+_FRONTIER_SLACK = 2
+
+_DEFAULT_PORTS = {"http": ":80", "https": ":443"}
+
+
+def _canonical_url(url: str) -> str:
+    """``url`` as the crawl queues and dedupes it.
+
+    Scheme and host are lower-cased, the default port and the fragment
+    dropped, and an empty path becomes ``/``. The query is kept as is, since
+    servers may depend on parameter order.
+    """
+    parts = urlsplit(url)
+    scheme, netloc = parts.scheme.lower(), parts.netloc.lower()
+    default_port = _DEFAULT_PORTS.get(scheme)
+    if default_port and netloc.endswith(default_port):
+        netloc = netloc[:-len(default_port)]
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+def _fingerprint(url: str) -> int:
+    """64-bit digest of the canonical form of ``url``."""
+    digest = hashlib.blake2b(_canonical_url(url).encode("utf-8", "surrogatepass"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class _URLSet:
+    """Set of URLs stored as 64-bit fingerprints of their canonical form."""
+
+    def __init__(self) -> None:
+        self._fingerprints: Set[int] = set()
+
+    def add(self, url: str) -> None:
+        self._fingerprints.add(_fingerprint(url))
+
+    def __contains__(self, url: str) -> bool:
+        return _fingerprint(url) in self._fingerprints
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+
+class _BloomURLSet:
+    """Bloom filter over canonical URLs: fixed memory, rare false positives.
+
+    Sized for ``capacity`` URLs at a false-positive rate of ``error_rate``
+    (about 2.4 bytes per URL at the default 1e-4); past ``capacity`` the rate
+    rises. A false positive makes the crawl skip a page it has not seen.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 1e-4) -> None:
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self._count = 0
+
+    def _positions(self, url: str):
+        digest = hashlib.blake2b(_canonical_url(url).encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, url: str) -> None:
+        for position in self._positions(url):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self._count += 1
+
+    def __contains__(self, url: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(url))
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class _PageURLs:
+    """``urljoin``/``urlparse`` relative to one page, memoized.
+
+    A page repeats the same references (navigation links, several assets
+    from one CDN path), and each joined URL is parsed by more than one check.
+    """
+
+    __slots__ = ("page_url", "_joined", "_parsed")
+
+    def __init__(self, page_url: str) -> None:
+        self.page_url = page_url
+        self._joined: Dict[str, str] = {}
+        self._parsed: Dict[str, ParseResult] = {}
+
+    def join(self, ref: str) -> str:
+        url = self._joined.get(ref)
+        if url is None:
+            url = self._joined[ref] = urljoin(self.page_url, ref)
+        return url
+
+    def parse(self, url: str) -> ParseResult:
+        parsed = self._parsed.get(url)
+        if parsed is None:
+            parsed = self._parsed[url] = urlparse(url)
+        return parsed
+
+
 @dataclass
 class UnsafeResource:
     page_url: str
@@ -77,6 +191,14 @@ class SRIParser:
         max_pages: int = 1,
         timeout: int = 10,
         user_agent: str = DEFAULT_USER_AGENT,
+        html_backend: str = "scanner",
+        concurrency: int = 1,
+        max_per_host: int = 4,
+        bloom_capacity: Optional[int] = None,
+        session: Optional[requests.Session] = None,
+        verify_integrity: bool = False,
+        digest_cache: Optional[DigestCache] = None,
+        scan_cache: Optional[ScanCache] = None,
     ) -> None:
         parsed = urlparse(base_url)
         if not parsed.scheme:
@@ -85,16 +207,49 @@ class SRIParser:
 
         if not parsed.netloc:
             raise ValueError("A valid domain or URL is required")
+        if html_backend not in HTML_BACKENDS:
+            raise ValueError(f"Unknown HTML backend {html_backend!r}; expected one of {', '.join(HTML_BACKENDS)}")
 
         self.base_url = base_url.rstrip('/') or base_url
         self.base_netloc = parsed.netloc.lower()
         self.max_depth = max_depth
         self.max_pages = max_pages
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({"User-Agent": user_agent})
-
-        self.visited: Set[str] = set()
+        # Tag extractor: the fast scanner, or "bs4" as a fallback (see htmlscan)
+        self.html_backend = html_backend
+        # Scan results of identical pages seen before (see htmlscan.ScanCache)
+        self.scan_cache = scan_cache
+        # Pages fetched at once (1 crawls serially), and at most max_per_host
+        # of them from any one host
+        self.concurrency = max(1, concurrency)
+        self.max_per_host = max(1, max_per_host)
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_slots_lock = threading.Lock()
+        if session is not None:
+            # Shared with other crawls (see scan_urls); used as configured
+            self.session = session
+        else:
+            self.session = requests.Session()
+            self.session.headers.update({"User-Agent": user_agent})
+            if self.concurrency > 1:
+                adapter = HTTPAdapter(pool_maxsize=self.concurrency)
+                self.session.mount("http://", adapter)
+                self.session.mount("https://", adapter)
+
+        # Check integrity hashes against the resources themselves, downloading
+        # each through a (possibly shared) digest cache
+        self.verify_integrity = verify_integrity
+        self.digest_cache = digest_cache
+        if verify_integrity and digest_cache is None:
+            self.digest_cache = DigestCache(self.session, timeout=timeout)
+
+        # Pages fetched, and every URL ever queued (exact fingerprints, or a
+        # Bloom filter sized for bloom_capacity URLs on very large crawls).
+        # Both compare canonical URLs, see _canonical_url.
+        self.visited = _URLSet()
+        self._seen = _BloomURLSet(bloom_capacity) if bloom_capacity else _URLSet()
+        self._seen.add(self.base_url)
+        # Deduplicated, and capped in proportion to the pages left to crawl
         self.to_visit: collections.deque[Tuple[str, int]] = collections.deque([(self.base_url, 0)])
         self.unsafe_resources: List[UnsafeResource] = []
         self.csp_policies: List[Tuple[str, str, str]] = []  # (page_url, header_name, policy_value)
@@ -103,18 +258,18 @@ class SRIParser:
     # ------------------------------------------------------------------
     # Crawling helpers
     # ------------------------------------------------------------------
-    def _is_same_origin(self, url: str) -> bool:
+    def _is_same_origin(self, url: str, parsed: Optional[ParseResult] = None) -> bool:
         if not url:
             return False
-        parsed = urlparse(url)
+        parsed = parsed or urlparse(url)
         if not parsed.scheme:
             return True  # relative URL -> same origin
         return parsed.netloc.lower() == self.base_netloc
 
-    def _is_external_resource(self, url: str) -> bool:
+    def _is_external_resource(self, url: str, parsed: Optional[ParseResult] = None) -> bool:
         if not url or not url.startswith(("http://", "https://")):
             return False
-        parsed = urlparse(url)
+        parsed = parsed or urlparse(url)
         resource_domain = parsed.netloc.lower().replace("www.", "")
         base_domain = self.base_netloc.replace("www.", "")
         return resource_domain != base_domain
@@ -128,12 +283,54 @@ class SRIParser:
         except requests.RequestException:
             return None
 
-    def _extract_links(self, html: str, page_url: str) -> Iterable[str]:
-        soup = BeautifulSoup(html, "html.parser")
-        for anchor in soup.find_all("a", href=True):
-            href = urljoin(page_url, anchor.get("href"))
-            if self._is_same_origin(href):
-                yield href.split("#", 1)[0]
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc.lower()
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return slot
+
+    def _fetch_polite(self, url: str) -> Optional[requests.Response]:
+        with self._host_slot(url):
+            return self._fetch(url)
+
+    def _prefetcher(self, executor: ThreadPoolExecutor):
+        """A drop-in for :meth:`_fetch` that fetches the pages queued next in the background.
+
+        The crawl still consumes pages strictly in queue order, so which pages
+        are crawled, at what depth, and the report are the same as a serial
+        crawl; only the waiting overlaps. At most ``concurrency`` fetches run
+        or wait to be consumed at a time, and none are started beyond the
+        pages ``max_pages`` still allows.
+        """
+        pending: Dict[str, Future] = {}
+
+        def fetch(url: str, pages_left: int) -> Optional[requests.Response]:
+            if url not in pending:
+                pending[url] = executor.submit(self._fetch_polite, url)
+            window = min(self.concurrency, pages_left)
+            for queued, depth in self.to_visit:
+                if len(pending) >= window:
+                    break
+                if queued not in pending and queued not in self.visited and depth <= self.max_depth:
+                    pending[queued] = executor.submit(self._fetch_polite, queued)
+            return pending.pop(url).result()
+
+        def cancel() -> None:
+            for future in pending.values():
+                future.cancel()
+            pending.clear()
+
+        return fetch, cancel
+
+    def _extract_links(self, hrefs: Iterable[str], page_url: str,
+                       urls: Optional[_PageURLs] = None) -> Iterable[str]:
+        urls = urls or _PageURLs(page_url)
+        for href in hrefs:
+            href = _canonical_url(urls.join(href))
+            if self._is_same_origin(href, urls.parse(href)):
+                yield href
 
     # ------------------------------------------------------------------
     # SRI evaluation
@@ -148,19 +345,23 @@ class SRIParser:
                 invalid_tokens.append(token)
         return valid_tokens, invalid_tokens
 
-    def _analyze_resource(self, tag, tag_type: str, page_url: str) -> Optional[UnsafeResource]:
+    def _analyze_resource(self, tag, tag_type: str, page_url: str,
+                          urls: Optional[_PageURLs] = None) -> Optional[UnsafeResource]:
+        # ``tag`` is anything with the tag's attributes behind ``.get``: an
+        # attribute dict from the scanner, or a bs4 Tag
         src_attr = "src" if tag_type == "script" else "href"
         resource_url = tag.get(src_attr)
         if not resource_url:
             return None
 
-        resource_url = urljoin(page_url, resource_url)
-        if not self._is_external_resource(resource_url):
+        urls = urls or _PageURLs(page_url)
+        resource_url = urls.join(resource_url)
+        parsed = urls.parse(resource_url)
+        if not self._is_external_resource(resource_url, parsed):
             return None
 
         integrity = tag.get("integrity")
         crossorigin = tag.get("crossorigin")
-        parsed = urlparse(resource_url)
         reasons: List[str] = []
 
         valid_hashes: List[str] = []
@@ -168,17 +369,21 @@ class SRIParser:
 
         if integrity:
             valid_hashes, invalid_hashes = self._parse_integrity_tokens(integrity)
-            self.resources_with_integrity.append(
-                {
-                    "page_url": page_url,
-                    "resource_url": resource_url,
-                    "tag_type": tag_type,
-                    "integrity": integrity,
-                    "crossorigin": crossorigin,
-                    "valid_hashes": valid_hashes,
-                    "invalid_hashes": invalid_hashes,
-                }
-            )
+            entry = {
+                "page_url": page_url,
+                "resource_url": resource_url,
+                "tag_type": tag_type,
+                "integrity": integrity,
+                "crossorigin": crossorigin,
+                "valid_hashes": valid_hashes,
+                "invalid_hashes": invalid_hashes,
+            }
+            if self.verify_integrity:
+                # None when the resource could not be fetched
+                entry["integrity_verified"] = self._verify(resource_url, valid_hashes)
+                if entry["integrity_verified"] is False:
+                    reasons.append("integrity-mismatch")
+            self.resources_with_integrity.append(entry)
         else:
             reasons.append("missing-integrity")
 
@@ -205,6 +410,14 @@ class SRIParser:
             )
         return None
 
+    def _verify(self, resource_url: str, valid_hashes: List[str]) -> Optional[bool]:
+        if not valid_hashes:
+            return None
+        digests = self.digest_cache.get(resource_url)
+        if digests is None:
+            return None
+        return _integrity_matches(valid_hashes, digests)
+
     def _is_cross_origin(self, parsed_url) -> bool:
         return parsed_url.netloc.lower() != self.base_netloc
 
@@ -255,42 +468,62 @@ class SRIParser:
             directives[name] = sources
         return directives
 
+    # ------------------------------------------------------------------
+    # Page processing
+    # ------------------------------------------------------------------
+    def _process_page(self, url: str, depth: int, html: str, frontier_limit: Optional[int] = None) -> None:
+        """Analyze one page's resources and queue its links, from a single scan.
+
+        Links already queued or crawled are skipped, and none are queued
+        once the frontier holds ``frontier_limit`` URLs.
+        """
+        follow = depth < self.max_depth
+        scanner = scan_html(html, self.html_backend, links=follow, rel_ignore_case=True, cache=self.scan_cache)
+        urls = _PageURLs(url)
+        # Scripts before stylesheets, each in document order
+        resources = sorted(scanner.resources, key=lambda resource: resource[0] != "script")
+        for tag_type, attrs in resources:
+            unsafe = self._analyze_resource(attrs, tag_type, url, urls)
+            if unsafe:
+                self.unsafe_resources.append(unsafe)
+
+        if follow:
+            for href in self._extract_links(scanner.links, url, urls):
+                if frontier_limit is not None and len(self.to_visit) >= frontier_limit:
+                    break
+                if href not in self._seen:
+                    self._seen.add(href)
+                    self.to_visit.append((href, depth + 1))
+
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
     def crawl(self) -> Dict[str, object]:
+        if self.concurrency == 1:
+            return self._crawl(lambda url, pages_left: self._fetch(url))
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            fetch, cancel = self._prefetcher(executor)
+            try:
+                return self._crawl(fetch)
+            finally:
+                cancel()
+
+    def _crawl(self, fetch: Callable[[str, int], Optional[requests.Response]]) -> Dict[str, object]:
         pages_crawled = 0
         while self.to_visit and pages_crawled < self.max_pages:
             url, depth = self.to_visit.popleft()
             if url in self.visited or depth > self.max_depth:
                 continue
 
-            response = self._fetch(url)
+            response = fetch(url, self.max_pages - pages_crawled)
             self.visited.add(url)
             if not response:
                 continue
 
             pages_crawled += 1
-            html = response.text
             self._record_csp(url, response)
-
-            soup = BeautifulSoup(html, "html.parser")
-            for script in soup.find_all("script", src=True):
-                unsafe = self._analyze_resource(script, "script", url)
-                if unsafe:
-                    self.unsafe_resources.append(unsafe)
-
-            for link in soup.find_all("link", href=True):
-                rel = link.get("rel") or []
-                if "stylesheet" in [r.lower() for r in rel]:
-                    unsafe = self._analyze_resource(link, "stylesheet", url)
-                    if unsafe:
-                        self.unsafe_resources.append(unsafe)
-
-            if depth < self.max_depth:
-                for href in self._extract_links(html, url):
-                    if href not in self.visited:
-                        self.to_visit.append((href, depth + 1))
+            self._process_page(url, depth, response.text,
+                               frontier_limit=_FRONTIER_SLACK * (self.max_pages - pages_crawled))
 
         report = {
             "base_url": self.base_url,
@@ -314,6 +547,12 @@ def scan_url(
     max_pages: int = 25,
     timeout: int = 10,
     user_agent: str = DEFAULT_USER_AGENT,
+    html_backend: str = "scanner",
+    concurrency: int = 1,
+    max_per_host: int = 4,
+    bloom_capacity: Optional[int] = None,
+    verify_integrity: bool = False,
+    digest_cache: Optional[DigestCache] = None,
 ) -> Dict[str, object]:
     """Scan a single URL (or crawl a site) for unsafe SRI usage.
 
@@ -326,6 +565,19 @@ def scan_url(
     ``unsafe_resources`` entries carry machine-readable ``reasons`` plus the
     raw ``integrity`` / ``crossorigin`` values, alongside any observed CSP
     headers and whether a restrictive one acts as a compensating control.
+
+    ``html_backend="bs4"`` extracts tags with BeautifulSoup instead of the
+    built-in scanner (same results, slower).
+
+    With ``concurrency`` above 1 a crawl fetches up to that many pages at
+    once, at most ``max_per_host`` from the same host. The report is the
+    same as a serial crawl's. URLs are deduplicated on a canonical form;
+    ``bloom_capacity`` trades exact dedupe for a fixed-size Bloom filter on
+    very large crawls.
+
+    ``verify_integrity=True`` downloads each external resource that has an
+    ``integrity`` hash and flags ``integrity-mismatch`` when it does not
+    match; pass a shared ``digest_cache`` to hash each URL once across calls.
     """
     parser = SRIParser(
         base_url=url,
@@ -333,5 +585,148 @@ def scan_url(
         max_pages=max_pages if crawl else 1,
         timeout=timeout,
         user_agent=user_agent,
+        html_backend=html_backend,
+        concurrency=concurrency,
+        max_per_host=max_per_host,
+        bloom_capacity=bloom_capacity,
+        verify_integrity=verify_integrity,
+        digest_cache=digest_cache,
     )
     return parser.crawl()
+
+
+def scan_urls(
+    urls: Iterable[str],
+    concurrency: int = 16,
+    crawl: bool = False,
+    max_depth: int = 1,
+    max_pages: int = 25,
+    timeout: int = 10,
+    user_agent: Optional[str] = None,
+    html_backend: str = "scanner",
+    crawl_concurrency: int = 1,
+    max_per_host: int = 4,
+    bloom_capacity: Optional[int] = None,
+    session: Optional[requests.Session] = None,
+    verify_integrity: bool = False,
+    digest_cache: Optional[DigestCache] = None,
+    scan_cache: Optional[ScanCache] = None,
+) -> Iterator[Tuple[str, Dict[str, object]]]:
+    """Scan many sites, yielding ``(url, report)`` as each one finishes.
+
+    Up to ``concurrency`` sites are scanned at once, each as
+    :func:`scan_url` would with the same options, and ``urls`` is read only
+    as fast as sites finish, so it can be a lazy iterable. Reports come in
+    completion order; ``url`` is the item from ``urls``. A URL that cannot
+    be scanned at all (say, an empty line, or a host name the HTTP stack
+    rejects) yields a report with no pages and an ``error`` message rather
+    than stopping the batch.
+
+    All sites share one connection-pooling session (cookies refused so
+    nothing leaks between sites), sending ``user_agent`` (default
+    ``DEFAULT_USER_AGENT``); pass ``session`` to supply your own, with its
+    own headers, instead. Passing both raises ``ValueError``. With
+    ``verify_integrity`` the sites also share one
+    :class:`~domain_security_analyzer.sridigest.DigestCache` (or
+    ``digest_cache``), so a CDN file used by many of them is hashed once.
+    Likewise identical pages (parking pages, say) are parsed once through a
+    shared :class:`~domain_security_analyzer.htmlscan.ScanCache`; pass
+    ``scan_cache`` to read its ``stats()["parses_avoided"]``.
+
+    ``crawl_concurrency``, ``max_per_host`` and ``bloom_capacity`` apply to
+    each site's crawl as ``concurrency``, ``max_per_host`` and
+    ``bloom_capacity`` do in :func:`scan_url`.
+    """
+    if session is not None and user_agent is not None:
+        raise ValueError("Pass either user_agent or session, not both; set the User-Agent on the session")
+    return _scan_urls(
+        urls, concurrency, crawl, max_depth, max_pages, timeout, user_agent, html_backend,
+        crawl_concurrency, max_per_host, bloom_capacity, session, verify_integrity,
+        digest_cache, scan_cache,
+    )
+
+
+def _scan_urls(
+    urls: Iterable[str],
+    concurrency: int,
+    crawl: bool,
+    max_depth: int,
+    max_pages: int,
+    timeout: int,
+    user_agent: Optional[str],
+    html_backend: str,
+    crawl_concurrency: int,
+    max_per_host: int,
+    bloom_capacity: Optional[int],
+    session: Optional[requests.Session],
+    verify_integrity: bool,
+    digest_cache: Optional[DigestCache],
+    scan_cache: Optional[ScanCache],
+) -> Iterator[Tuple[str, Dict[str, object]]]:
+    # The generator behind scan_urls, which checks its arguments eagerly
+    concurrency = max(1, concurrency)
+    own_session = session is None
+    if own_session:
+        connections = concurrency * max(1, crawl_concurrency)
+        session = make_session(pool_connections=connections, pool_maxsize=connections)
+        session.headers["User-Agent"] = user_agent or DEFAULT_USER_AGENT
+    if verify_integrity and digest_cache is None:
+        digest_cache = DigestCache(session, timeout=timeout)
+    if scan_cache is None:
+        scan_cache = ScanCache()
+
+    def scan(url: str) -> Dict[str, object]:
+        try:
+            parser = SRIParser(
+                base_url=url,
+                max_depth=max_depth if crawl else 0,
+                max_pages=max_pages if crawl else 1,
+                timeout=timeout,
+                html_backend=html_backend,
+                concurrency=crawl_concurrency,
+                max_per_host=max_per_host,
+                bloom_capacity=bloom_capacity,
+                session=session,
+                verify_integrity=verify_integrity,
+                digest_cache=digest_cache,
+                scan_cache=scan_cache,
+            )
+            return parser.crawl()
+        except Exception as e:
+            # One bad site (say, a URL the HTTP stack cannot parse) must not
+            # end the batch
+            return _failed_report(url, str(e) or type(e).__name__)
+
+    pending_urls = iter(urls)
+    running: Dict[Future, str] = {}
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        for url in itertools.islice(pending_urls, concurrency):
+            running[executor.submit(scan, url)] = url
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = running.pop(future)
+                for next_url in itertools.islice(pending_urls, 1):
+                    running[executor.submit(scan, next_url)] = next_url
+                yield url, future.result()
+    finally:
+        for future in running:
+            future.cancel()
+        executor.shutdown(wait=True)
+        if own_session:
+            session.close()
+
+
+def _failed_report(url: str, error: str) -> Dict[str, object]:
+    """Report for a site that could not be scanned, shaped like :meth:`SRIParser.crawl`'s."""
+    return {
+        "base_url": url,
+        "pages_crawled": 0,
+        "unsafe_resources": [],
+        "compensating_control_detected": False,
+        "csp_policies": [],
+        "resources_with_integrity_count": 0,
+        "resources_with_integrity": [],
+        "error": error,
+    }
@@ -0,0 +1,232 @@
+"""Digests of third-party scripts and stylesheets, for checking SRI hashes.
+
+An ``integrity`` attribute can be well-formed and still wrong: a CDN file
+updated in place leaves the page with a stale hash, and browsers then refuse
+to load it. Checking that takes the resource's actual digest, and the same
+jQuery or Bootstrap URL turns up on thousands of sites, so
+:class:`DigestCache` downloads and hashes each URL once:
+
+* Within a run, every URL is fetched at most once, however many pages or
+  threads ask for it at the same time.
+* With a ``path``, digests are also kept in an SQLite file together with the
+  response's ``ETag`` / ``Last-Modified``. For ``max_age`` seconds they are
+  reused as is; after that the URL is revalidated with a conditional
+  request and only re-downloaded when it has changed.
+
+Digests are the base64 sha256/sha384/sha512 values SRI uses.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import requests
+
+from .datadir import data_dir
+from .http_session import make_session
+
+__all__ = ["DigestCache", "default_digest_cache_path", "verify_integrity"]
+
+ALGORITHMS = ("sha256", "sha384", "sha512")
+
+# Resources larger than this are left unverified
+MAX_RESOURCE_BYTES = 16 * 1024 * 1024
+
+_CHUNK_SIZE = 64 * 1024
+
+# Headers for a request that must return the body: None drops a session's
+# default validators, and no-cache asks caches on the way not to answer 304
+_UNCONDITIONAL = {"If-None-Match": None, "If-Modified-Since": None, "Cache-Control": "no-cache"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS digests (
+    url           TEXT PRIMARY KEY,
+    etag          TEXT,
+    last_modified TEXT,
+    sha256        TEXT NOT NULL,
+    sha384        TEXT NOT NULL,
+    sha512        TEXT NOT NULL,
+    checked       REAL NOT NULL  -- time.time() of the last download or revalidation
+)
+"""
+
+Digests = Dict[str, str]
+
+
+def default_digest_cache_path() -> Path:
+    """``sri-digests.sqlite3`` in the data directory."""
+    return data_dir() / "sri-digests.sqlite3"
+
+
+def verify_integrity(valid_tokens, digests: Digests) -> bool:
+    """Whether ``digests`` satisfy the well-formed ``integrity`` tokens, as a browser decides.
+
+    Only the strongest algorithm present counts, and any one of its values
+    matching is enough.
+    """
+    by_algorithm: Dict[str, list] = {}
+    for token in valid_tokens:
+        algorithm, _, value = token.strip().partition("-")
+        by_algorithm.setdefault(algorithm, []).append(value)
+    strongest = max(by_algorithm, key=ALGORITHMS.index)
+    return digests[strongest] in by_algorithm[strongest]
+
+
+class DigestCache:
+    """Thread-safe cache of resource digests; see the module docstring.
+
+    :meth:`get` returns ``None`` for a resource that could not be fetched
+    (or is over :data:`MAX_RESOURCE_BYTES`); that outcome is remembered for
+    the rest of the run too.
+    """
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        path: Union[str, Path, None] = None,
+        max_age: float = 24 * 3600,
+        timeout: int = 10,
+    ) -> None:
+        self.session = session if session is not None else make_session()
+        self.max_age = max_age
+        self.timeout = timeout
+        self._memory: Dict[str, Optional[Digests]] = {}
+        self._inflight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if path is not None:
+            self._db = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(_SCHEMA)
+            self._db.commit()
+
+        self.hits = 0           # answered from memory, shared by pages and sites
+        self.disk_hits = 0      # answered from the file without a request
+        self.revalidated = 0    # 304 Not Modified
+        self.downloads = 0
+        self.failures = 0
+
+    def get(self, url: str) -> Optional[Digests]:
+        """The digests of ``url``, downloading it only if no cached copy is usable."""
+        while True:
+            with self._lock:
+                if url in self._memory:
+                    self.hits += 1
+                    return self._memory[url]
+                event = self._inflight.get(url)
+                if event is None:
+                    event = self._inflight[url] = threading.Event()
+                    break
+            event.wait()  # another thread is fetching it
+
+        digests = None
+        try:
+            digests = self._load(url)
+        finally:
+            with self._lock:
+                self._memory[url] = digests
+                del self._inflight[url]
+            event.set()
+        return digests
+
+    def _load(self, url: str) -> Optional[Digests]:
+        row = self._read(url)
+        if row is not None and time.time() - row["checked"] < self.max_age:
+            with self._lock:
+                self.disk_hits += 1
+            return {name: row[name] for name in ALGORITHMS}
+
+        headers = {}
+        if row is not None:
+            if row["etag"]:
+                headers["If-None-Match"] = row["etag"]
+            if row["last_modified"]:
+                headers["If-Modified-Since"] = row["last_modified"]
+        try:
+            fetched = self._fetch(url, headers)
+            if fetched is None and row is None:
+                # 304 with nothing stored to reuse (a proxy or session adding
+                # validators): ask again for the body itself
+                fetched = self._fetch(url, _UNCONDITIONAL)
+                if fetched is None:
+                    raise ValueError("304 Not Modified to an unconditional request")
+        except (requests.RequestException, ValueError):
+            with self._lock:
+                self.failures += 1
+            return None
+
+        if fetched is None:
+            digests = {name: row[name] for name in ALGORITHMS}
+            self._write(url, row["etag"], row["last_modified"], digests)
+            with self._lock:
+                self.revalidated += 1
+            return digests
+        digests, etag, last_modified = fetched
+        self._write(url, etag, last_modified, digests)
+        with self._lock:
+            self.downloads += 1
+        return digests
+
+    def _fetch(
+        self, url: str, headers: Dict[str, Optional[str]]
+    ) -> Optional[Tuple[Digests, Optional[str], Optional[str]]]:
+        """Download and hash ``url``: its digests, ``ETag`` and ``Last-Modified``, or ``None`` on a 304."""
+        with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+            hashes = [hashlib.new(name) for name in ALGORITHMS]
+            size = 0
+            for chunk in response.iter_content(_CHUNK_SIZE):
+                size += len(chunk)
+                if size > MAX_RESOURCE_BYTES:
+                    raise ValueError("resource too large to verify")
+                for h in hashes:
+                    h.update(chunk)
+            digests = {name: base64.b64encode(h.digest()).decode("ascii") for name, h in zip(ALGORITHMS, hashes)}
+            return digests, response.headers.get("ETag"), response.headers.get("Last-Modified")
+
+    def _read(self, url: str) -> Optional[Dict[str, object]]:
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified, sha256, sha384, sha512, checked FROM digests WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("etag", "last_modified") + ALGORITHMS + ("checked",), row))
+
+    def _write(self, url: str, etag: Optional[str], last_modified: Optional[str], digests: Digests) -> None:
+        if self._db is None:
+            return
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, digests["sha256"], digests["sha384"], digests["sha512"], time.time()),
+            )
+            self._db.commit()
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "urls": len(self._memory),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "revalidated": self.revalidated,
+                "downloads": self.downloads,
+                "failures": self.failures,
+            }
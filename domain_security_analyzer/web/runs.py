@@ -8,11 +8,12 @@ improvements, and informational changes (MVP: last two runs only, no database).
 from __future__ import annotations
 
 import csv
-import os
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from ..datadir import data_dir as shared_data_dir
+
 # Timestamp format used for run filenames (sortable, filesystem-safe).
 RUN_TS_FORMAT = "%Y%m%d-%H%M%S"
 
@@ -34,11 +35,7 @@ IGNORED_COLUMNS = {"Timestamp"}
 
 def data_dir() -> Path:
     """Directory where run CSVs are stored (override with DSA_DATA_DIR)."""
-    override = os.environ.get("DSA_DATA_DIR")
-    base = Path(override) if override else Path.home() / ".domain-security-analyzer"
-    runs = base / "runs"
-    runs.mkdir(parents=True, exist_ok=True)
-    return runs
+    return shared_data_dir("runs")
 
 
 def new_run_path(timestamp: Optional[datetime] = None) -> Path:
@@ -0,0 +1,79 @@
+"""Benchmark SRI tag extraction: the streaming scanner against BeautifulSoup.
+
+Runs both backends of ``domain_security_analyzer.htmlscan`` over the same
+pages and prints pages/sec for each. By default the pages are the golden
+corpus in ``tests/data/html_corpus`` plus synthetic pages of typical
+landing-page size; pass HTML files to benchmark real pages instead::
+
+    python scripts/bench_html_scan.py
+    python scripts/bench_html_scan.py saved/*.html --seconds 5
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+try:
+    from domain_security_analyzer.htmlscan import BACKENDS, scan_html
+except ModuleNotFoundError:  # pragma: no cover - running from a source checkout
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from domain_security_analyzer.htmlscan import BACKENDS, scan_html
+
+CORPUS = Path(__file__).resolve().parent.parent / "tests" / "data" / "html_corpus"
+
+
+def synthetic_page(kilobytes: int) -> str:
+    """A landing page of roughly ``kilobytes`` KB: head resources, nav, then body filler."""
+    head = "".join(
+        f'<script src="https://cdn{i}.example.net/lib{i}.js" integrity="sha384-{"A" * 64}" '
+        f'crossorigin="anonymous"></script>\n<link rel="stylesheet" href="https://cdn{i}.example.net/s{i}.css">\n'
+        for i in range(10)
+    )
+    block = (
+        '<div class="card"><h2 class="title">Product</h2><p>Lorem ipsum dolor sit amet, '
+        '<b>consectetur</b> adipiscing elit, <i>sed do</i> eiusmod tempor.</p>'
+        '<a href="/products/item?id=1&amp;ref=home">More</a><img src="/img/p.png" alt=""></div>\n'
+    )
+    body = block * max(1, kilobytes * 1024 // len(block))
+    return f"<!DOCTYPE html><html><head>{head}</head><body>{body}</body></html>"
+
+
+def load_pages(paths: List[str]) -> List[str]:
+    if paths:
+        return [Path(p).read_text(encoding="utf-8", errors="replace") for p in paths]
+    pages = [p.read_text() for p in sorted(CORPUS.glob("*.html"))]
+    return pages + [synthetic_page(kb) for kb in (20, 100, 400)]
+
+
+def pages_per_second(pages: List[str], backend: str, seconds: float) -> float:
+    done, start = 0, time.perf_counter()
+    while True:
+        for page in pages:
+            scan_html(page, backend, links=True)
+        done += len(pages)
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return done / elapsed
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pages", nargs="*", help="HTML files to scan (default: corpus + synthetic pages)")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Time per backend (default: 2)")
+    args = parser.parse_args(argv)
+
+    pages = load_pages(args.pages)
+    size = sum(len(p) for p in pages) / len(pages) / 1024
+    print(f"{len(pages)} pages, {size:.1f} KB on average")
+    rates = {backend: pages_per_second(pages, backend, args.seconds) for backend in BACKENDS}
+    for backend, rate in rates.items():
+        print(f"  {backend:8s} {rate:10.1f} pages/sec")
+    print(f"  speedup  {rates['scanner'] / rates['bs4']:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -61,6 +61,24 @@ def build_arg_parser() -> argparse.ArgumentParser:
         default=10,
         help="Timeout for HTTP requests in seconds (default: 10)",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Pages to fetch at once when --crawl is set (default: 1)",
+    )
+    parser.add_argument(
+        "--max-per-host",
+        type=int,
+        default=4,
+        help="Most pages fetched at once from one host (default: 4)",
+    )
+    parser.add_argument(
+        "--verify-hashes",
+        action="store_true",
+        help="Download each external resource with an integrity hash and flag hashes that "
+             "do not match it (digests are cached in the data directory)",
+    )
     parser.add_argument(
         "--json",
         action="store_true",
@@ -125,6 +143,9 @@ def print_report(report: Dict[str, object], as_json: bool = False, list_all: boo
                 print(f"  Crossorigin: {entry['crossorigin'] or 'None'}")
                 print(f"  Valid hashes: {valid}")
                 print(f"  Invalid hashes: {invalid}")
+                if "integrity_verified" in entry:
+                    verified = {True: "match", False: "MISMATCH", None: "not checked"}[entry["integrity_verified"]]
+                    print(f"  Hash check: {verified}")
                 print()
         else:
             print("No resources with integrity attributes detected.")
@@ -134,13 +155,24 @@ def main() -> None:
     parser = build_arg_parser()
     args = parser.parse_args()
 
+    digest_cache = None
+    if args.verify_hashes:
+        from domain_security_analyzer.sridigest import DigestCache, default_digest_cache_path
+
+        digest_cache = DigestCache(path=default_digest_cache_path(), timeout=args.timeout)
     report = scan_url(
         args.url,
         crawl=args.crawl,
         max_depth=args.max_depth,
         max_pages=args.max_pages,
         timeout=args.timeout,
+        concurrency=args.concurrency,
+        max_per_host=args.max_per_host,
+        verify_integrity=args.verify_hashes,
+        digest_cache=digest_cache,
     )
+    if digest_cache is not None:
+        digest_cache.close()
     print_report(report, as_json=args.json, list_all=args.list_sri)
 
 
@@ -1,6 +1,7 @@
 """Unit tests for DomainAnalyzer pure logic (no network required)."""
 
 import csv
+import time
 
 import pytest
 
@@ -19,6 +20,8 @@ def analyzer():
         ("example.com", "example.com"),
         ("www.example.com", "example.com"),
         ("a.b.example.com", "example.com"),
+        ("shop.example.co.uk", "example.co.uk"),
+        ("www.example.com.au", "example.com.au"),
     ],
 )
 def test_get_parent_domain(analyzer, domain, expected):
@@ -116,3 +119,103 @@ def test_analyze_domains_from_file_writes_29_columns(tmp_path, monkeypatch):
     assert rows[0][0] == "Domain"
     assert len(rows) == 2  # header + one data row
     assert rows[1][0] == "example.com"
+
+
+def test_results_are_streamed_and_survive_an_interrupt(tmp_path, monkeypatch):
+    def analyze(self, domain):
+        if domain == "c.example":
+            time.sleep(0.2)  # a and b are written out meanwhile
+            raise KeyboardInterrupt
+        return analyzer_mod._error_result(domain, "stub")
+
+    monkeypatch.setattr(analyzer_mod.DomainAnalyzer, "analyze_domain", analyze)
+    input_file = tmp_path / "in.txt"
+    input_file.write_text("a.example\nb.example\nc.example\n")
+    output_file = tmp_path / "out.csv"
+
+    with pytest.raises(KeyboardInterrupt):
+        analyzer_mod.analyze_domains_from_file(str(input_file), str(output_file), max_workers=1)
+
+    with open(output_file, newline="") as f:
+        rows = list(csv.reader(f))
+    assert sorted(row[0] for row in rows) == ["Domain", "a.example", "b.example"]
+
+
+def test_result_writer_syncs_periodically(tmp_path, monkeypatch):
+    syncs = []
+    monkeypatch.setattr(analyzer_mod.os, "fsync", syncs.append)
+    output_file = tmp_path / "out.csv"
+    filtered_file = tmp_path / "filtered.csv"
+
+    with analyzer_mod.ResultWriter(str(output_file), str(filtered_file), sync_every=2, sync_interval=3600) as writer:
+        for name in ("a", "b", "c"):
+            result = analyzer_mod._error_result(f"{name}.example", "stub")
+            result["subdomains"]["filtered_subdomains"] = [f"www.{name}.example"] if name != "b" else []
+            writer.write(result)
+        assert len(syncs) == 2  # both files, after the second row
+        assert len(output_file.read_text().splitlines()) == 3  # the third is still buffered
+
+    assert len(syncs) == 4 and writer.rows == 3
+    assert len(output_file.read_text().splitlines()) == 4
+    assert filtered_file.read_text().splitlines() == [
+        "Domain,Filtered Subdomains", "a.example,www.a.example", "c.example,www.c.example"]
+
+
+def test_resume_skips_reported_domains_and_drops_a_partial_row(tmp_path, monkeypatch):
+    analyzed = []
+
+    def analyze(self, domain):
+        analyzed.append(domain)
+        return analyzer_mod._error_result(domain, "stub")
+
+    monkeypatch.setattr(analyzer_mod.DomainAnalyzer, "analyze_domain", analyze)
+    input_file = tmp_path / "in.txt"
+    input_file.write_text("a.example\nb.example\nc.example\n")
+    output_file = tmp_path / "out.csv"
+    analyzer_mod.write_results_csv([analyzer_mod._error_result("a.example", "stub")], str(output_file))
+    with open(output_file, "a", newline="") as f:
+        f.write("b.example,2026-06-21T00:0")  # the run died mid-row
+
+    assert analyzer_mod.completed_domains(str(output_file)) == {"a.example"}
+    analyzer_mod.analyze_domains_from_file(str(input_file), str(output_file), max_workers=1, resume=True)
+
+    assert sorted(analyzed) == ["b.example", "c.example"]
+    with open(output_file, newline="") as f:
+        rows = list(csv.reader(f))
+    assert [row[0] for row in rows[:2]] == ["Domain", "a.example"]
+    assert sorted(row[0] for row in rows[2:]) == ["b.example", "c.example"]
+    assert all(len(row) == 29 for row in rows)
+
+
+def test_resume_refuses_a_file_that_is_not_a_report(tmp_path):
+    other = tmp_path / "notes.csv"
+    other.write_text("name,value\r\n")
+    with pytest.raises(ValueError):
+        analyzer_mod.completed_domains(str(other))
+    assert analyzer_mod.completed_domains(str(tmp_path / "missing.csv")) == set()
+
+
+def test_input_is_read_lazily_with_a_bounded_window(tmp_path, monkeypatch):
+    monkeypatch.setattr(analyzer_mod.DomainAnalyzer, "analyze_domain",
+                        lambda self, domain: analyzer_mod._error_result(domain, "stub"))
+    submitted = []
+    real_submit = analyzer_mod.concurrent.futures.ThreadPoolExecutor.submit
+
+    def submit(self, fn, domain):
+        submitted.append(domain)
+        in_flight.append(len(submitted) - progress[-1])
+        return real_submit(self, fn, domain)
+
+    monkeypatch.setattr(analyzer_mod.concurrent.futures.ThreadPoolExecutor, "submit", submit)
+    progress, in_flight = [0], []
+    input_file = tmp_path / "in.txt"
+    input_file.write_text("".join(f"d{i}.example\n" for i in range(200)))
+    output_file = tmp_path / "out.csv"
+
+    analyzer_mod.analyze_domains_from_file(
+        str(input_file), str(output_file), max_workers=2,
+        progress_callback=lambda done, total: progress.append(done),
+    )
+
+    assert len(submitted) == 200 and progress[-1] == 200
+    assert max(in_flight) <= analyzer_mod._WINDOW_PER_WORKER * 2
@@ -0,0 +1,154 @@
+"""Tests for the asyncio analysis engine (no network required)."""
+
+import asyncio
+import concurrent.futures
+
+import pytest
+
+from domain_security_analyzer import AsyncDomainAnalyzer, DomainAnalyzer, analyze_domains_async
+from domain_security_analyzer import async_analyzer as async_mod
+from domain_security_analyzer.planner import Lookup
+
+# Canned DNS answers shared by the sync and async fakes.
+ANSWERS = {
+    ("example.com", "SOA"): ["ns1.example.com. hostmaster.example.com. 1 2 3 4 5"],
+    ("example.com", "TXT"): ['"v=spf1 -all"'],
+    ("_dmarc.example.com", "TXT"): ["v=DMARC1; p=reject"],
+    ("google._domainkey.example.com", "TXT"): ["v=DKIM1; k=rsa; p=abc"],
+    ("www.example.com", "A"): ["192.0.2.1"],
+    ("shop.example.com", "CNAME"): ["shops.myshopify.com."],
+    ("mail.example.com", "CNAME"): ["mail.secureserver.net."],
+}
+
+
+def _lookup(domain, record_type):
+    return ANSWERS.get((domain, record_type))
+
+
+@pytest.fixture
+def fake_network(monkeypatch):
+    async def fake_async_lookup(self, domain, record_type):
+        await asyncio.sleep(0)
+        return Lookup(_lookup(domain, record_type), None, True)
+
+    monkeypatch.setattr(DomainAnalyzer, "_lookup", lambda self, d, t: Lookup(_lookup(d, t), None, True))
+    monkeypatch.setattr(AsyncDomainAnalyzer, "_lookup", fake_async_lookup)
+    # Both engines fetch through DomainAnalyzer._fetch_page; no page is streamed
+    monkeypatch.setattr(
+        DomainAnalyzer, "_fetch_page",
+        lambda self, domain, on_text: {"http_accessible": False, "redirects_to_https": False,
+                                       "final_url": None, "error": "stubbed", "redirect_chain": []},
+    )
+
+
+def _comparable(result):
+    result = dict(result, timestamp=None)
+    result["subdomains"] = dict(
+        result["subdomains"],
+        subdomains=sorted(result["subdomains"]["subdomains"]),
+        filtered_subdomains=sorted(result["subdomains"]["filtered_subdomains"]),
+    )
+    return result
+
+
+def test_async_results_match_sync_engine(fake_network):
+    sync_result = DomainAnalyzer().analyze_domain("example.com")
+    async_result = asyncio.run(AsyncDomainAnalyzer().analyze_domain("example.com"))
+
+    assert _comparable(async_result) == _comparable(sync_result)
+    assert async_result["dkim"]["records"] == [{"selector": "google", "record": "v=DKIM1; k=rsa; p=abc"}]
+    assert async_result["subdomains"]["hosting_provider"] == "GoDaddy"
+
+
+def test_analyze_domains_async_preserves_order_and_reports_progress(fake_network):
+    progress = []
+    domains = ["example.com", "example.org", "example.net"]
+    results = asyncio.run(analyze_domains_async(
+        domains, concurrency=4, max_domains=2,
+        progress_callback=lambda done, total: progress.append((done, total)),
+    ))
+
+    assert [r["domain"] for r in results] == domains
+    assert progress[-1] == (3, 3)
+
+
+def test_on_result_streams_results_instead_of_collecting(fake_network):
+    streamed = []
+    domains = ["example.com", "example.org", "example.net"]
+    results = asyncio.run(analyze_domains_async(domains, max_domains=2, on_result=streamed.append))
+
+    assert results == []
+    assert sorted(r["domain"] for r in streamed) == sorted(domains)
+
+
+def test_domains_iterator_is_consumed_lazily(fake_network):
+    read = []
+
+    def domains():
+        for domain in ["example.com", "example.org", "example.net"]:
+            read.append(domain)
+            yield domain
+
+    progress = []
+
+    def on_result(result):
+        progress.append(len(read))
+
+    asyncio.run(analyze_domains_async(domains(), max_domains=1, on_result=on_result, total=3))
+    assert progress == [1, 2, 3]  # one domain read ahead of the results at a time
+
+
+def test_global_concurrency_limit_is_respected(monkeypatch):
+    in_flight = 0
+    peak = 0
+
+    async def slow_query(self, domain, record_type):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        return Lookup(None, None, True)
+
+    monkeypatch.setattr(AsyncDomainAnalyzer, "_query", slow_query)
+    monkeypatch.setattr(
+        async_mod.AsyncDomainAnalyzer, "_check_http_and_sri",
+        lambda self, domain: ({}, {}),
+    )
+
+    asyncio.run(analyze_domains_async(["a.test", "b.test", "c.test"], concurrency=5, max_domains=3))
+    assert 1 < peak <= 5
+
+
+def test_async_engine_short_circuits_dead_domains(monkeypatch):
+    async def nxdomain(self, domain, record_type):
+        return Lookup(None, None, True, nxdomain=True)
+
+    monkeypatch.setattr(AsyncDomainAnalyzer, "_lookup", nxdomain)
+    result = asyncio.run(AsyncDomainAnalyzer().analyze_domain("gone.test"))
+
+    assert result["liveness"]["reason"] == "NXDOMAIN"
+    assert result["liveness"]["skipped_http"] is True
+    assert result["dns_queries"]["issued"] == 3
+
+
+def test_failed_dns_checks_cancel_the_pending_http_fetch(fake_network, monkeypatch):
+    class IdleExecutor:
+        """Queues jobs without ever running them."""
+
+        def __init__(self):
+            self.jobs = []
+
+        def submit(self, fn, *args):
+            self.jobs.append(concurrent.futures.Future())
+            return self.jobs[-1]
+
+    async def broken_spf(self, domain):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(AsyncDomainAnalyzer, "check_spf", broken_spf)
+    executor = IdleExecutor()
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(AsyncDomainAnalyzer(http_executor=executor).analyze_domain("example.com"))
+    assert len(executor.jobs) == 1 and executor.jobs[0].cancelled()
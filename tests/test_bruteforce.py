@@ -0,0 +1,184 @@
+"""Tests for wordlist subdomain brute-forcing (no network required)."""
+
+import asyncio
+import csv
+import itertools
+
+import dns.message
+import dns.name
+import dns.rcode
+import dns.rrset
+import pytest
+
+from domain_security_analyzer import bruteforce
+from domain_security_analyzer.async_analyzer import AsyncDomainAnalyzer
+from domain_security_analyzer.bruteforce import bruteforce_domains_to_csv, bruteforce_subdomains, iter_wordlist
+from domain_security_analyzer.planner import Lookup
+from domain_security_analyzer.resolver import ResolverPool
+
+# name -> (A records, CNAME target); names ending in .wild.test match *.wild.test
+ZONE = {
+    "example.test": (["192.0.2.10"], None),
+    "www.example.test": (["192.0.2.1"], None),
+    "shop.example.test": (None, "shops.myshopify.com"),
+    "shops.myshopify.com": (["23.227.38.32"], None),
+    "wild.test": (["192.0.2.20"], None),
+    "api.wild.test": (["192.0.2.21"], None),
+}
+
+
+def _answer(qname):
+    name = qname.to_text().rstrip(".")
+    query = dns.message.make_query(qname, "A")
+    response = dns.message.make_response(query)
+    if name not in ZONE and name.endswith(".wild.test"):
+        response.answer.append(dns.rrset.from_text(qname, 60, "IN", "A", "192.0.2.99"))
+        return response
+    while name in ZONE:
+        a_records, cname = ZONE[name]
+        owner = name + "."
+        if cname:
+            response.answer.append(dns.rrset.from_text(owner, 60, "IN", "CNAME", cname + "."))
+            name = cname
+            continue
+        response.answer.append(dns.rrset.from_text(owner, 60, "IN", "A", *a_records))
+        return response
+    response.set_rcode(dns.rcode.NXDOMAIN)
+    return response
+
+
+@pytest.fixture
+def fake_mux(monkeypatch):
+    sent = []
+
+    async def exchange(self, qname, timeout):
+        sent.append(qname.to_text())
+        await asyncio.sleep(0)
+        return _answer(qname)
+
+    monkeypatch.setattr(bruteforce._QueryMux, "exchange", exchange)
+    return sent
+
+
+async def _collect(domain, words, **kwargs):
+    return [found async for found in bruteforce_subdomains(domain, words, **kwargs)]
+
+
+def test_finds_names_and_reads_cname_from_a_response(fake_mux):
+    found = asyncio.run(_collect("example.test", ["www", "shop", "nope", "ftp"], concurrency=3))
+
+    by_name = {f["subdomain"]: f for f in found}
+    assert set(by_name) == {"www.example.test", "shop.example.test"}
+    assert by_name["shop.example.test"]["cname"] == "shops.myshopify.com."
+    assert by_name["shop.example.test"]["a_records"] == ["23.227.38.32"]
+    # One A query per candidate plus the apex and wildcard probes
+    assert len(fake_mux) == 4 + 2
+
+
+def test_wildcard_baseline_filters_echoes(fake_mux):
+    found = asyncio.run(_collect("wild.test", ["api", "random1", "random2"]))
+    assert [f["subdomain"] for f in found] == ["api.wild.test"]
+
+    found = asyncio.run(_collect("wild.test", ["api", "random1"], include_wildcard_matches=True))
+    assert {f["subdomain"]: f["wildcard_match"] for f in found} == {"api.wild.test": False, "random1.wild.test": True}
+
+
+def test_streams_from_unbounded_wordlist(fake_mux):
+    async def first_two():
+        words = (f"w{i}" for i in itertools.count())  # never ends
+        results = []
+        async for found in bruteforce_subdomains("wild.test", words, concurrency=4, include_wildcard_matches=True):
+            results.append(found)
+            if len(results) == 2:
+                break
+        return results
+
+    assert len(asyncio.run(first_two())) == 2
+
+
+def test_failed_fast_path_falls_back_to_resolver(monkeypatch):
+    async def timeout(self, qname, timeout):
+        return None
+
+    async def slow_lookup(self, domain, record_type):
+        if domain == "www.example.test" or domain == "example.test":
+            return Lookup(["192.0.2.1"], None, True)
+        return Lookup(None, None, True, nxdomain=True)
+
+    monkeypatch.setattr(bruteforce._QueryMux, "exchange", timeout)
+    monkeypatch.setattr(AsyncDomainAnalyzer, "_lookup", slow_lookup)
+
+    found = asyncio.run(_collect("example.test", ["www", "nope"]))
+    assert [f["subdomain"] for f in found] == ["www.example.test"]
+
+
+def test_fast_path_is_throttled_and_tracked_by_the_resolver_pool(monkeypatch):
+    sent = {}
+
+    async def exchange(self, qname, timeout):
+        server = self.transport.get_extra_info("peername")[0]
+        sent[server] = sent.get(server, 0) + 1
+        return None if server == "192.0.2.53" else _answer(qname)
+
+    async def slow_lookup(self, domain, record_type):
+        a_records = ZONE.get(domain, (None, None))[0]
+        return Lookup(a_records, None, True, nxdomain=a_records is None)
+
+    monkeypatch.setattr(bruteforce._QueryMux, "exchange", exchange)
+    monkeypatch.setattr(AsyncDomainAnalyzer, "_lookup", slow_lookup)
+    pool = ResolverPool(["192.0.2.53", "198.51.100.53"], max_failures=2)
+    analyzer = AsyncDomainAnalyzer(resolver_pool=pool)
+
+    found = asyncio.run(_collect("example.test", [f"w{i}" for i in range(10)] + ["www"], analyzer=analyzer))
+
+    assert [f["subdomain"] for f in found] == ["www.example.test"]
+    dead, live = pool.upstreams
+    # The timing-out upstream is ejected after two failures and not queried again
+    assert sent["192.0.2.53"] == dead.queries == dead.timeouts == 2
+    assert dead.ejected_until > 0
+    assert sent["198.51.100.53"] == live.queries and live.errors == 0
+    assert dead.limiter.inflight == live.limiter.inflight == 0
+
+
+def test_query_ids_come_from_dnspython_entropy_and_skip_pending_ids(monkeypatch):
+    ids = iter([7, 7, 9])
+    monkeypatch.setattr(bruteforce.dns.entropy, "random_16", lambda: next(ids))
+
+    class Transport:
+        def sendto(self, wire):
+            self.sent = wire
+
+    async def query():
+        mux = bruteforce._QueryMux()
+        mux.connection_made(Transport())
+        mux.pending[7] = asyncio.get_running_loop().create_future()
+        assert await mux.exchange(dns.name.from_text("www.example.test"), 0.01) is None
+        return mux.transport.sent
+
+    assert asyncio.run(query())[:2] == b"\x00\x09"
+
+
+def test_csv_mode_writes_rows_and_skips_bad_words(fake_mux, tmp_path):
+    domains = tmp_path / "domains.txt"
+    domains.write_text("example.test\nmissing.test\n")
+    words = tmp_path / "words.txt"
+    words.write_text("# comment\nWWW\n\nshop\nbad word\n")
+    out = tmp_path / "out.csv"
+
+    assert list(iter_wordlist(words)) == ["www", "shop"]
+    total = asyncio.run(bruteforce_domains_to_csv(str(domains), str(out), str(words)))
+
+    rows = list(csv.reader(out.open()))
+    assert total == 2
+    assert rows[0] == bruteforce.BRUTEFORCE_COLUMNS
+    assert sorted(row[1] for row in rows[1:]) == ["shop.example.test", "www.example.test"]
+
+
+def test_malformed_words_are_skipped_not_fatal(fake_mux, tmp_path):
+    words = tmp_path / "words.txt"
+    words.write_text("a" * 64 + "\na..b\nwww\n" + "x." * 130 + "y\n")
+    assert list(iter_wordlist(words)) == ["www"]
+
+    # Words from any other source are checked again before they are queried
+    found = asyncio.run(_collect("example.test", ["a" * 64, "a..b", "www"]))
+    assert [f["subdomain"] for f in found] == ["www.example.test"]
@@ -40,3 +40,45 @@ def test_parser_optional_workers_defaults_none():
     args = parser.parse_args(["in.txt", "out.csv"])
     assert args.max_workers is None
     assert args.include_wildcard_matches is False
+
+
+def test_parser_async_engine_flags():
+    parser = cli.build_parser()
+    args = parser.parse_args(["in.txt", "out.csv", "--async", "--concurrency", "1000"])
+    assert args.async_engine is True
+    assert args.concurrency == 1000
+    assert parser.parse_args(["in.txt", "out.csv"]).async_engine is False
+
+
+def test_parser_dead_domain_skip_defaults_on():
+    parser = cli.build_parser()
+    assert parser.parse_args(["in.txt", "out.csv"]).skip_dead_domains is True
+    assert parser.parse_args(["in.txt", "out.csv", "--no-dead-domain-skip"]).skip_dead_domains is False
+
+
+def test_parser_dkim_selectors_file():
+    parser = cli.build_parser()
+    assert parser.parse_args(["in.txt", "out.csv"]).dkim_selectors is None
+    assert parser.parse_args(["in.txt", "out.csv", "--dkim-selectors", "sel.txt"]).dkim_selectors == "sel.txt"
+
+
+def test_parser_disk_cache_switch():
+    parser = cli.build_parser()
+    assert parser.parse_args(["in.txt", "out.csv"]).disk_cache is False
+    args = parser.parse_args(["in.txt", "out.csv", "--cache", "--cache-max-mb", "32"])
+    assert args.disk_cache is True and args.cache_max_mb == 32
+    assert parser.parse_args(["in.txt", "out.csv", "--cache", "--no-cache"]).disk_cache is False
+
+
+def test_parser_html_backend():
+    parser = cli.build_parser()
+    assert parser.parse_args(["in.txt", "out.csv"]).html_backend == "scanner"
+    assert parser.parse_args(["in.txt", "out.csv", "--html-parser", "bs4"]).html_backend == "bs4"
+
+
+def test_parser_resume_and_schedule_flags():
+    parser = cli.build_parser()
+    args = parser.parse_args(["in.txt", "out.csv"])
+    assert args.resume is False and args.schedule is False
+    args = parser.parse_args(["in.txt", "out.csv", "--resume", "--schedule"])
+    assert args.resume is True and args.schedule is True
@@ -0,0 +1,112 @@
+"""Tests for the persistent on-disk DNS cache (no network required)."""
+
+import threading
+
+import pytest
+
+from domain_security_analyzer import analyzer as analyzer_mod, diskcache as disk_mod
+from domain_security_analyzer.diskcache import DiskDNSCache, default_cache_path
+from domain_security_analyzer.dnscache import DNSCache
+
+
+@pytest.fixture
+def wall_clock(monkeypatch):
+    """Controllable replacement for time.time inside the disk cache module."""
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(disk_mod.time, "time", lambda: now[0])
+    return now
+
+
+def test_default_path_is_under_dsa_data_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("DSA_DATA_DIR", str(tmp_path))
+    assert default_cache_path() == tmp_path / "dns-cache.sqlite3"
+
+
+def test_answers_survive_reopening_until_they_expire(tmp_path, wall_clock):
+    path = tmp_path / "cache.sqlite3"
+    cache = DiskDNSCache(path)
+    cache.put("example.com", "TXT", ('"v=spf1 -all"',), 300, False)
+    cache.put("missing.example.com", "A", None, 60, True)
+    cache.close()
+
+    cache = DiskDNSCache(path)
+    entry = cache.get("example.com", "TXT")
+    assert entry.records == ('"v=spf1 -all"',) and entry.ttl == 300
+    assert cache.get("missing.example.com", "A").nxdomain is True
+
+    wall_clock[0] += 120
+    assert cache.get("missing.example.com", "A") is None
+    assert cache.compact() == 1
+    assert len(cache) == 1
+
+
+def test_compaction_enforces_size_cap_dropping_soonest_expiry(tmp_path, wall_clock):
+    cache = DiskDNSCache(tmp_path / "cache.sqlite3", max_bytes=200)
+    for i in range(10):
+        cache.put(f"host{i}.example.com", "A", ("192.0.2.1",), 100 + i, False)
+    cache.flush()
+    cache.compact()
+
+    assert cache.stats()["bytes"] <= 200
+    assert cache.get("host9.example.com", "A") is not None
+    assert cache.get("host0.example.com", "A") is None
+
+
+def test_compaction_vacuums_when_a_quarter_of_the_entries_go(tmp_path, wall_clock):
+    cache = DiskDNSCache(tmp_path / "cache.sqlite3")
+    for i in range(12):
+        cache.put(f"host{i}.example.com", "A", ("192.0.2.1",), 60 if i < 2 else 300, False)
+    cache.flush()
+    statements = []
+    cache._connection().set_trace_callback(statements.append)
+
+    wall_clock[0] += 120
+    assert cache.compact() == 2  # 2 of 12: not worth a VACUUM
+    assert "VACUUM" not in statements
+
+    wall_clock[0] += 300
+    assert cache.compact() == 10
+    assert "VACUUM" in statements
+
+
+def test_run_reports_disk_stats_without_reopening_the_cache(tmp_path, monkeypatch):
+    opened = []
+    monkeypatch.setattr(analyzer_mod.DomainAnalyzer, "analyze_domain",
+                        lambda self, domain: analyzer_mod._error_result(domain, "stub"))
+    monkeypatch.setattr(DiskDNSCache, "_connection",
+                        lambda self, connect=DiskDNSCache._connection: opened.append(self) or connect(self))
+    input_file = tmp_path / "in.txt"
+    input_file.write_text("example.com\n")
+
+    analyzer_mod.analyze_domains_from_file(str(input_file), str(tmp_path / "out.csv"), max_workers=1,
+                                           disk_cache=True, disk_cache_path=str(tmp_path / "cache.sqlite3"))
+    assert opened and opened[0]._local.conn is None
+
+
+def test_memory_cache_falls_through_to_disk_across_runs(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    first = DNSCache(disk=DiskDNSCache(path))
+    first.put("Example.com.", "txt", ['"v=spf1 -all"'], ttl=300)
+    first.close()
+
+    second = DNSCache(disk=DiskDNSCache(path))
+    assert second.get("example.com", "TXT").records == ('"v=spf1 -all"',)
+    assert second.get("example.com", "TXT") is not None  # now served from memory
+    stats = second.stats()
+    assert stats["hits"] == 2 and stats["disk_hits"] == 1
+
+
+def test_concurrent_writers_share_the_database(tmp_path):
+    cache = DiskDNSCache(tmp_path / "cache.sqlite3")
+
+    def writer(n):
+        for i in range(300):
+            cache.put(f"w{n}-{i}.example.com", "A", ("192.0.2.1",), 300, False)
+        cache.flush()
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache) == 1200
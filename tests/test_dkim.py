@@ -0,0 +1,97 @@
+"""Tests for the DKIM selector scan (no network required)."""
+
+import asyncio
+
+import pytest
+
+from domain_security_analyzer import AsyncDomainAnalyzer, DomainAnalyzer
+from domain_security_analyzer.analyzer import (
+    DEFAULT_DKIM_SELECTORS,
+    EXTENDED_DKIM_SELECTORS_FILE,
+    load_dkim_selectors,
+)
+from domain_security_analyzer.planner import Lookup
+
+# (name, rdtype) -> records; "*" labels are wildcards, as in a zone file.
+ZONE = {
+    ("example.org", "SOA"): ["ns1.example.org. hostmaster.example.org. 1 2 3 4 5"],
+    ("s2._domainkey.example.org", "TXT"): ['"v=DKIM1; k=rsa; p=abc"'],
+    ("wild.example", "SOA"): ["ns1.wild.example. hostmaster.wild.example. 1 2 3 4 5"],
+    ("*._domainkey.wild.example", "TXT"): ['"v=spf1 include:_spf.wild.example -all"'],
+}
+
+
+def _resolve(name, rdtype):
+    """Answer from ZONE: records, an empty answer for a name that exists, or NXDOMAIN."""
+    wildcard = "*." + name.split(".", 1)[-1]
+    records = ZONE.get((name, rdtype), ZONE.get((wildcard, rdtype)))
+    if records is not None:
+        return Lookup(list(records), None, True)
+    exists = any(owner in (name, wildcard) or owner.endswith("." + name) for owner, _ in ZONE)
+    return Lookup(None, None, True, nxdomain=not exists)
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    """The lookups both engines send, in order."""
+    sent = []
+
+    def lookup(self, name, rdtype):
+        sent.append((name, rdtype))
+        return _resolve(name, rdtype)
+
+    async def lookup_async(self, name, rdtype):
+        return lookup(self, name, rdtype)
+
+    monkeypatch.setattr(DomainAnalyzer, "_lookup", lookup)
+    monkeypatch.setattr(AsyncDomainAnalyzer, "_lookup", lookup_async)
+    monkeypatch.setattr(
+        DomainAnalyzer, "_fetch_page",
+        lambda self, domain, on_text: {"http_accessible": False, "redirects_to_https": False,
+                                       "final_url": None, "error": "stubbed", "redirect_chain": []},
+    )
+    return sent
+
+
+def test_dkim_scan_probes_bundled_selectors_when_domainkey_exists(queries):
+    analyzer = DomainAnalyzer()
+    result = analyzer.analyze_domain("example.org")
+
+    assert result["dkim"]["records"] == [{"selector": "s2", "record": '"v=DKIM1; k=rsa; p=abc"'}]
+    assert result["dns_queries"]["issued"] > len(analyzer.dkim_selectors)
+    assert analyzer.check_dkim("example.com") == {"exists": False, "records": []}
+
+
+def test_wildcard_txt_under_domainkey_skips_the_selector_scan(queries):
+    analyzer = DomainAnalyzer()
+    result = analyzer.analyze_domain("wild.example")
+    async_result = asyncio.run(AsyncDomainAnalyzer().analyze_domain("wild.example"))
+
+    assert result["dkim"] == async_result["dkim"] == {"exists": False, "records": []}
+    selector_queries = {f"{selector}._domainkey.wild.example" for selector in analyzer.dkim_selectors}
+    assert not selector_queries & {name for name, _ in queries}
+    assert result["dns_queries"]["issued"] == result["dns_queries"]["planned"] - len(selector_queries)
+
+    del queries[:]
+    assert analyzer.check_dkim("wild.example") == {"exists": False, "records": []}
+    assert asyncio.run(AsyncDomainAnalyzer().check_dkim("wild.example")) == {"exists": False, "records": []}
+    assert len(queries) == 4  # _domainkey and one random selector, per engine
+
+
+def test_load_dkim_selectors_skips_comments_and_duplicates(tmp_path):
+    path = tmp_path / "selectors.txt"
+    path.write_text("# custom\nselector1\n\ns1  # SendGrid\nSelector1\n", encoding="utf-8")
+
+    assert load_dkim_selectors(path) == ["selector1", "s1"]
+    assert len(DEFAULT_DKIM_SELECTORS) == 16
+    assert DEFAULT_DKIM_SELECTORS[:3] == ["google", "selector1", "selector2"]
+    extended = load_dkim_selectors(EXTENDED_DKIM_SELECTORS_FILE)
+    assert len(extended) > 300 and set(DEFAULT_DKIM_SELECTORS) <= set(extended)
+
+
+def test_default_selector_scan_costs_about_one_round(queries):
+    result = DomainAnalyzer().analyze_domain("example.org")
+    dkim_queries = [name for name, rdtype in queries if name.endswith("._domainkey.example.org")]
+
+    assert len(dkim_queries) == len(DEFAULT_DKIM_SELECTORS) + 1  # plus the wildcard probe
+    assert result["dns_queries"]["issued"] < 100
@@ -0,0 +1,103 @@
+"""Tests for the shared DNS answer cache (no network required)."""
+
+import dns.message
+import dns.name
+import dns.resolver
+import dns.rrset
+import pytest
+
+from domain_security_analyzer import DomainAnalyzer
+from domain_security_analyzer import dnscache as cache_mod
+from domain_security_analyzer.dnscache import DNSCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable replacement for time.monotonic inside the cache module."""
+    now = [1000.0]
+    monkeypatch.setattr(cache_mod.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _negative_response(qname="missing.example.com.", soa_ttl=600, soa_minimum=30):
+    response = dns.message.make_response(dns.message.make_query(qname, "A"))
+    response.authority.append(dns.rrset.from_text(
+        "example.com.", soa_ttl, "IN", "SOA",
+        f"ns1.example.com. hostmaster.example.com. 1 7200 900 1209600 {soa_minimum}",
+    ))
+    return response
+
+
+def test_positive_entry_expires_after_ttl(clock):
+    cache = DNSCache()
+    cache.put("Example.com.", "txt", ['"v=spf1 -all"'], ttl=60)
+
+    assert cache.get("example.com", "TXT").records == ('"v=spf1 -all"',)
+    clock[0] += 61
+    assert cache.get("example.com", "TXT") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_nxdomain_negative_ttl_uses_soa_minimum(clock):
+    qname = dns.name.from_text("missing.example.com.")
+    exc = dns.resolver.NXDOMAIN(qnames=[qname], responses={qname: _negative_response()})
+    cache = DNSCache()
+    cache.put_negative("missing.example.com", "A", exc)
+
+    entry = cache.get("missing.example.com", "A")
+    assert entry.records is None and entry.nxdomain is True
+    clock[0] += 31  # min(SOA TTL 600, minimum 30)
+    assert cache.get("missing.example.com", "A") is None
+
+
+def test_noanswer_without_soa_falls_back_to_default(clock):
+    bare = dns.message.make_response(dns.message.make_query("example.com.", "AAAA"))
+    cache = DNSCache(negative_ttl=10)
+    cache.put_negative("example.com", "AAAA", dns.resolver.NoAnswer(response=bare))
+
+    assert cache.get("example.com", "AAAA").nxdomain is False
+    clock[0] += 11
+    assert cache.get("example.com", "AAAA") is None
+
+
+def test_lru_eviction_under_memory_cap():
+    probe = DNSCache()
+    probe.put("a.com", "A", ["192.0.2.1"], ttl=60)
+    cache = DNSCache(max_bytes=3 * probe.stats()["bytes"])  # room for three entries
+    for name in ("a.com", "b.com", "c.com"):
+        cache.put(name, "A", ["192.0.2.1"], ttl=60)
+    cache.get("a.com", "A")  # a.com becomes most recently used
+    cache.put("d.com", "A", ["192.0.2.4"], ttl=60)
+
+    assert cache.get("b.com", "A") is None
+    assert cache.get("a.com", "A") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_get_dns_record_serves_repeats_from_cache(monkeypatch):
+    calls = []
+
+    class FakeAnswer(list):
+        expiration = cache_mod.time.time() + 300
+        response = None
+
+    def fake_resolve(name, rdtype):
+        calls.append((name, rdtype))
+        if name == "gone.example.com":
+            raise dns.resolver.NXDOMAIN()
+        return FakeAnswer(["192.0.2.1"])
+
+    cache = DNSCache()
+    first = DomainAnalyzer(dns_cache=cache)
+    second = DomainAnalyzer(dns_cache=cache)
+    monkeypatch.setattr(first.resolver, "resolve", fake_resolve)
+    monkeypatch.setattr(second.resolver, "resolve", fake_resolve)
+
+    assert first.get_dns_record("example.com", "A") == ["192.0.2.1"]
+    assert second.get_dns_record("example.com", "A") == ["192.0.2.1"]
+    assert first.get_dns_record("gone.example.com", "A") is None
+    assert second.get_dns_record("gone.example.com", "A") is None
+
+    assert calls == [("example.com", "A"), ("gone.example.com", "A")]
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["negative_hits"] == 1 and stats["misses"] == 2
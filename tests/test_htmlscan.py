@@ -0,0 +1,133 @@
+"""Tests for the SRI tag scanner, including the golden corpus shared with the bs4 backend."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from domain_security_analyzer.analyzer import DomainAnalyzer
+from domain_security_analyzer.htmlscan import BACKENDS, ResourceScanner, ScanCache, make_scanner, scan_html
+from domain_security_analyzer.sri import SRIParser, _canonical_url
+
+CORPUS = Path(__file__).parent / "data" / "html_corpus"
+# Results of the BeautifulSoup-based code the scanner replaced
+EXPECTED = json.loads((CORPUS / "expected.json").read_text())
+PAGES = sorted(EXPECTED)
+
+PAGE = (
+    '<html><head>'
+    '<script src="https://cdn.example.net/a.js" integrity="sha384-abc" crossorigin="anonymous"></script>'
+    '<link rel="preload stylesheet" href="https://cdn.example.net/a.css"/>'
+    '<link rel="icon" href="/favicon.ico">'
+    '<script>var s = "<script src=fake.js>";</script>'
+    '</head><body><script src></script><a href="/next">next</a></body></html>'
+)
+
+
+def test_finds_scripts_stylesheets_and_links():
+    scanner = scan_html(PAGE, links=True)
+    assert scanner.resources == [
+        ('script', {'src': 'https://cdn.example.net/a.js', 'integrity': 'sha384-abc', 'crossorigin': 'anonymous'}),
+        ('stylesheet', {'rel': 'preload stylesheet', 'href': 'https://cdn.example.net/a.css'}),
+        ('script', {'src': ''}),
+    ]
+    assert scanner.links == ['/next']
+    assert scan_html(PAGE).links == []  # only collected on request
+
+
+def test_result_does_not_depend_on_chunk_boundaries():
+    expected = scan_html(PAGE, links=True)
+    for split in range(1, len(PAGE)):
+        scanner = ResourceScanner(links=True)
+        scanner.feed(PAGE[:split])
+        scanner.feed(PAGE[split:])
+        scanner.close()
+        assert (scanner.resources, scanner.links) == (expected.resources, expected.links), split
+        assert scanner.fed == len(PAGE)
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        make_scanner("lxml")
+    with pytest.raises(ValueError):
+        DomainAnalyzer(html_backend="lxml")
+
+
+@pytest.mark.parametrize("page", PAGES)
+@pytest.mark.parametrize("rel_ignore_case", [False, True])
+def test_scanner_matches_bs4_on_corpus(page, rel_ignore_case):
+    html = (CORPUS / page).read_text()
+    fast = scan_html(html, "scanner", links=True, rel_ignore_case=rel_ignore_case)
+    reference = scan_html(html, "bs4", links=True, rel_ignore_case=rel_ignore_case)
+    # bs4 lists scripts before stylesheets; the scanner keeps document order
+    assert sorted(fast.resources, key=lambda r: r[0] != 'script') == reference.resources
+    assert fast.links == reference.links
+
+
+class _Page:
+    def __init__(self, text):
+        self.text = text
+        self.headers = {"content-type": "text/html"}
+
+
+@pytest.mark.parametrize("page", PAGES)
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_golden_corpus(page, backend):
+    html = (CORPUS / page).read_text()
+    expected = EXPECTED[page]
+
+    assert DomainAnalyzer(html_backend=backend).check_sri("example.com", html) == expected["check_sri"]
+
+    parser = SRIParser("https://example.com", max_depth=1, max_pages=1, html_backend=backend)
+    parser._fetch = lambda url: _Page(html)
+    report = parser.crawl()
+    queued = report["queued"] = expected["sri_report"]["queued"]
+    assert report == expected["sri_report"]
+
+    # Same links, now canonical and deduplicated (the crawled page itself aside)
+    hrefs = scan_html(html, backend, links=True, rel_ignore_case=True).links
+    found = parser._extract_links(hrefs, "https://example.com")
+    canonical = [_canonical_url(url) for url in queued]
+    assert [url for url in dict.fromkeys(found) if url not in parser.visited] == [
+        url for url in dict.fromkeys(canonical) if url not in parser.visited]
+
+
+def test_identical_pages_are_parsed_once(monkeypatch):
+    cache = ScanCache(max_page_chars=len(PAGE))
+    parses = []
+    real_feed = ResourceScanner.feed
+    monkeypatch.setattr(ResourceScanner, "feed", lambda self, data: parses.append(data) or real_feed(self, data))
+
+    first = scan_html(PAGE, links=True, cache=cache)
+    scanner = make_scanner(links=True, cache=cache)
+    for i in range(0, len(PAGE), 7):  # chunking does not change the key
+        scanner.feed(PAGE[i:i + 7])
+    scanner.close()
+    assert (scanner.resources, scanner.links) == (first.resources, first.links)
+    assert len(parses) == 1
+
+    scan_html(PAGE, links=False, cache=cache)  # other options: a separate entry
+    scan_html(PAGE + " ", links=True, cache=cache)  # over max_page_chars: streamed, not cached
+    assert len(parses) == 3
+    assert cache.stats() == {"pages": 4, "parses_avoided": 1, "entries": 2}
+
+
+def test_analyzer_reuses_scan_across_domains():
+    cache = ScanCache()
+    page = '<script src="https://cdn.example.net/a.js"></script><script src="https://b.example/app.js"></script>'
+    a = DomainAnalyzer(scan_cache=cache).check_sri("a.example", page)
+    b = DomainAnalyzer(scan_cache=cache).check_sri("b.example", page)
+    # The parse is shared, the per-domain external/internal split is not
+    assert a["total_external_resources"] == 2 and b["total_external_resources"] == 1
+    assert cache.stats()["parses_avoided"] == 1
+
+
+def test_empty_pages_are_not_counted_as_cache_hits():
+    cache = ScanCache()
+    analyzer = DomainAnalyzer(scan_cache=cache)
+    plan = analyzer.plan_queries("gone.example", "x")
+    for domain in ("gone.example", "gone.test"):  # dead domains: no page fetched
+        result = analyzer._dead_domain_result(domain, "NXDOMAIN", plan, {}, 3)
+        assert result["sri"]["total_external_resources"] == 0
+    assert analyzer.check_sri("down.example", "")["error"] == "No HTML content available"
+    assert cache.stats() == {"pages": 3, "parses_avoided": 0, "entries": 0}
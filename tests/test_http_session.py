@@ -0,0 +1,116 @@
+"""Tests for the pooled HTTP session (local server only, no network)."""
+
+import http.server
+import threading
+
+import pytest
+
+from domain_security_analyzer import DomainAnalyzer
+from domain_security_analyzer import analyzer as analyzer_mod
+from domain_security_analyzer.http_session import make_session
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        if self.path in ("/big", "/binary"):
+            # Far larger than the analyzer's HTML cap, sent in pieces
+            html = self.path == "/big"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8" if html else "application/octet-stream")
+            self.send_header("Content-Length", str(64 * 1024 * 1024))
+            self.end_headers()
+            head = b'<html><head><script src="https://cdn.example.net/a.js"></script></head><body>'
+            try:
+                self.wfile.write(head)
+                for _ in range(64 * 1024):
+                    self.server.bytes_sent += 1024
+                    self.wfile.write(b"x" * 1024)
+            except OSError:
+                pass  # client hung up
+            return
+        if self.path == "/":
+            self.send_response(301)
+            self.send_header("Location", "/home")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = b"<html><body>ok</body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Set-Cookie", "session=abc; Path=/")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.bytes_sent = 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.host = f"127.0.0.1:{httpd.server_address[1]}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_connections_are_reused_across_requests_and_redirects(server):
+    session = make_session()
+    for _ in range(3):
+        response = session.get(f"http://{server.host}/", timeout=5)
+        assert response.status_code == 200 and len(response.history) == 1
+
+    stats = session.connection_stats.stats()
+    assert stats["requests"] == 6
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == 5
+
+
+def test_cookies_are_not_carried_between_requests(server):
+    session = make_session()
+    session.get(f"http://{server.host}/home", timeout=5)
+    assert len(session.cookies) == 0
+
+
+def test_analyzers_share_one_session(server):
+    session = make_session()
+    for _ in range(2):
+        analyzer = DomainAnalyzer(http_session=session)
+        result, html = analyzer.check_http_redirect(server.host)
+        assert result["http_accessible"] and result["final_url"].endswith("/home")
+        assert "ok" in html
+    assert session.connection_stats.stats()["connections_opened"] == 1
+
+
+def test_keep_alive_can_be_disabled(server):
+    session = make_session(keep_alive=False)
+    session.get(f"http://{server.host}/home", timeout=5)
+    session.get(f"http://{server.host}/home", timeout=5)
+    assert session.connection_stats.stats()["connections_opened"] == 2
+
+
+def test_html_body_is_streamed_up_to_the_cap(server):
+    analyzer = DomainAnalyzer(http_session=make_session())
+    chunks = []
+    result = analyzer._fetch_page(f"{server.host}/big", chunks.append)
+
+    assert result["http_accessible"] and result["error"] is None
+    assert max(len(chunk) for chunk in chunks) <= analyzer_mod._CHUNK_SIZE
+    assert sum(len(chunk) for chunk in chunks) == analyzer_mod.MAX_HTML_BYTES
+    assert server.bytes_sent < 16 * 1024 * 1024  # the server was cut off early
+
+    http_info, sri = analyzer._check_http_and_sri(f"{server.host}/big")
+    assert sri["total_external_resources"] == 1 and sri["missing_sri_count"] == 1
+
+
+def test_non_html_body_is_not_read(server):
+    analyzer = DomainAnalyzer(http_session=make_session())
+    result, html = analyzer.check_http_redirect(f"{server.host}/binary")
+    assert result["http_accessible"] and html == ""
+    assert server.bytes_sent < 16 * 1024 * 1024
@@ -0,0 +1,200 @@
+"""Tests for per-domain DNS query planning (no network required)."""
+
+import time
+
+import dns.message
+import dns.name
+import dns.rdatatype
+import dns.resolver
+import dns.rrset
+import pytest
+
+from domain_security_analyzer import DomainAnalyzer
+from domain_security_analyzer.planner import Lookup, QueryPlan, chain_cname
+
+# name -> list of (rdtype, rdata) for the fake zone; CNAMEs are followed.
+ZONE = {
+    "example.com": [("SOA", "ns1.example.com. hostmaster.example.com. 1 2 3 4 5"),
+                    ("TXT", '"v=spf1 -all"')],
+    "_dmarc.example.com": [("TXT", '"v=DMARC1; p=reject"')],
+    "www.example.com": [("A", "192.0.2.1")],
+    "portal.example.com": [("CNAME", "shops.myshopify.com.")],
+    "shops.myshopify.com": [("A", "23.227.38.32")],
+}
+
+
+class FakeAnswer(list):
+    def __init__(self, rdatas, response):
+        super().__init__(rdatas)
+        self.response = response
+        self.expiration = time.time() + 300
+
+
+def fake_resolve(name, rdtype):
+    """Answer like dnspython: follow CNAMEs and attach the full response."""
+    qname = name.rstrip(".")
+    response = dns.message.make_response(dns.message.make_query(qname + ".", rdtype))
+    current = qname
+    while True:
+        records = ZONE.get(current)
+        if records is None and any(other.endswith("." + current) for other in ZONE):
+            records = []  # empty non-terminal: exists, but holds no records
+        if records is None:
+            if current == qname:
+                raise dns.resolver.NXDOMAIN(qnames=[dns.name.from_text(qname)],
+                                            responses={dns.name.from_text(qname): response})
+            raise dns.resolver.NoAnswer(response=response)
+        wanted = [value for kind, value in records if kind == rdtype]
+        if wanted:
+            rrset = dns.rrset.from_text(current + ".", 300, "IN", rdtype, *wanted)
+            response.answer.append(rrset)
+            return FakeAnswer(list(rrset), response)
+        cnames = [value for kind, value in records if kind == "CNAME"]
+        if not cnames:
+            raise dns.resolver.NoAnswer(response=response)
+        response.answer.append(dns.rrset.from_text(current + ".", 300, "IN", "CNAME", cnames[0]))
+        current = cnames[0].rstrip(".")
+
+
+@pytest.fixture
+def analyzer(monkeypatch):
+    a = DomainAnalyzer()
+    monkeypatch.setattr(a.resolver, "resolve", fake_resolve)
+    monkeypatch.setattr(
+        DomainAnalyzer, "_fetch_page",
+        lambda self, domain, on_text: {"http_accessible": False, "redirects_to_https": False,
+                                       "final_url": None, "error": "stubbed", "redirect_chain": []},
+    )
+    return a
+
+
+def test_plan_dedupes_and_merges_cname_into_a():
+    plan = QueryPlan()
+    plan.extend([("www.example.com", "CNAME"), ("www.example.com", "A"),
+                 ("Example.com.", "TXT"), ("example.com", "TXT")])
+
+    assert plan.planned == 4
+    assert plan.queries() == [("www.example.com", "A"), ("Example.com.", "TXT")]
+    assert plan.merges_cname("www.example.com")
+
+
+def test_chain_cname_reads_cname_from_a_response():
+    answer = fake_resolve("portal.example.com", "A")
+    assert chain_cname("portal.example.com", answer.response) == ["shops.myshopify.com."]
+    assert chain_cname("www.example.com", fake_resolve("www.example.com", "A").response) is None
+
+
+def test_analyze_domain_matches_unplanned_checks_with_fewer_queries(analyzer):
+    result = analyzer.analyze_domain("example.com")
+
+    # Same answers as running each check on its own
+    assert result["spf"] == analyzer.check_spf("example.com")
+    assert result["dmarc"] == analyzer.check_dmarc("example.com")
+    assert result["soa"] == analyzer.get_soa_record("example.com")
+    assert result["subdomains"]["cname_records"] == {"portal.example.com": "shops.myshopify.com."}
+    assert "www.example.com" in result["subdomains"]["subdomains"]
+
+    # _domainkey.example.com is NXDOMAIN, so no DKIM selector is probed
+    queries = result["dns_queries"]
+    assert queries["planned"] == 2 + 2 * len(analyzer.common_subdomains) + 4 + len(analyzer.dkim_selectors)
+    assert queries["issued"] == 1 + len(analyzer.common_subdomains) + 4
+
+
+def test_query_concurrency_fans_out_lookups_under_cap(monkeypatch):
+    import threading
+
+    lock = threading.Lock()
+    in_flight = peak = 0
+
+    def slow_lookup(self, name, rdtype):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.02)
+        with lock:
+            in_flight -= 1
+        return Lookup(None, None, True)
+
+    monkeypatch.setattr(DomainAnalyzer, "_lookup", slow_lookup)
+    monkeypatch.setattr(DomainAnalyzer, "_check_http_and_sri", lambda self, domain: ({}, {}))
+
+    analyzer = DomainAnalyzer(query_concurrency=8, dkim_selectors=["s1", "s2", "k1", "google"])
+    start = time.monotonic()
+    result = analyzer.analyze_domain("example.com")
+    elapsed = time.monotonic() - start
+
+    assert peak == 8
+    # 64 lookups x 20 ms would take ~1.3 s serially
+    assert elapsed < 0.6
+    assert result["dns_queries"]["issued"] == result["dns_queries"]["planned"]
+
+
+def test_shared_executor_reuses_threads_across_domains(monkeypatch):
+    import concurrent.futures
+    import threading
+
+    lock = threading.Lock()
+    in_flight = peak = 0
+
+    def lookup(self, name, rdtype):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.001)
+        with lock:
+            in_flight -= 1
+        return Lookup(None, None, True)
+
+    monkeypatch.setattr(DomainAnalyzer, "_lookup", lookup)
+    monkeypatch.setattr(DomainAnalyzer, "_check_http_and_sri", lambda self, domain: ({}, {}))
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=5)
+
+    def no_new_pools(*args, **kwargs):
+        raise AssertionError("thread pool started per domain")
+
+    monkeypatch.setattr(concurrent.futures, "ThreadPoolExecutor", no_new_pools)
+    analyzer = DomainAnalyzer(query_concurrency=4, executor=executor, dkim_selectors=["s1", "s2"])
+    for domain in ["a.example", "b.example", "c.example"]:
+        result = analyzer.analyze_domain(domain)
+        assert result["dns_queries"]["issued"] == result["dns_queries"]["planned"]
+    executor.shutdown()
+
+    assert peak <= 4  # the per-domain cap still holds on the shared threads
+    assert len(executor._threads) <= 5
+
+
+def test_dead_domain_skips_remaining_checks_and_http(analyzer, monkeypatch):
+    def no_http(self, domain, on_text):
+        raise AssertionError("HTTP fetch for a dead domain")
+
+    monkeypatch.setattr(DomainAnalyzer, "_fetch_page", no_http)
+    result = analyzer.analyze_domain("gone.example.com")
+
+    assert result["liveness"]["alive"] is False
+    assert result["liveness"]["reason"] == "NXDOMAIN"
+    assert result["dns_queries"]["issued"] == 3  # preflight only: parent SOA, TXT, _domainkey
+    assert result["liveness"]["skipped_queries"] == len(analyzer.plan_queries("gone.example.com", "x")) - 2
+    assert result["http_redirect"]["error"].startswith("Skipped: domain is dead")
+    assert result["soa"]["exists"] is True and result["subdomains"]["subdomains"] == []
+
+
+def test_dead_reason_ignores_failed_lookups():
+    negative = Lookup(None, dns.message.Message(), True)
+    failed = Lookup(None, None, True)  # timeout / SERVFAIL
+    live = Lookup(["ns1.example.com."], None, True)
+
+    assert DomainAnalyzer._dead_reason(negative, negative, negative) == "no SOA/NS"
+    assert DomainAnalyzer._dead_reason(negative, negative, live) is None
+    assert DomainAnalyzer._dead_reason(failed, failed, failed) is None
+    assert DomainAnalyzer._dead_reason(failed, Lookup(None, None, True, nxdomain=True)) == "NXDOMAIN"
+
+
+def test_refused_everywhere_is_unresolved_not_an_error_string(analyzer, monkeypatch):
+    def refused(name, rdtype):
+        raise dns.resolver.NoNameservers(request=dns.message.make_query(name, rdtype),
+                                         errors=[("192.0.2.53", False, 53, "REFUSED", None)])
+
+    monkeypatch.setattr(analyzer.resolver, "resolve", refused)
+    assert analyzer.get_dns_record("example.com", "TXT") is None
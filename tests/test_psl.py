@@ -0,0 +1,39 @@
+"""Tests for registered-domain lookups with the bundled Public Suffix List."""
+
+import pytest
+
+from domain_security_analyzer.psl import PublicSuffixList, public_suffix, registered_domain
+from domain_security_analyzer.scheduler import schedule_domains
+
+
+@pytest.mark.parametrize(
+    "name,expected",
+    [
+        ("example.com", "example.com"),
+        ("www.Example.COM.", "Example.COM"),
+        ("shop.example.co.uk", "example.co.uk"),
+        ("co.uk", "co.uk"),  # a public suffix is its own parent
+        ("a.b.example.com.au", "example.com.au"),
+        ("www.example.unlistedtld", "example.unlistedtld"),
+        ("foo.bar.kawasaki.jp", "foo.bar.kawasaki.jp"),  # *.kawasaki.jp
+        ("www.city.kawasaki.jp", "city.kawasaki.jp"),  # !city.kawasaki.jp
+        ("shop.example.xn--55qx5d.cn", "example.xn--55qx5d.cn"),  # 公司.cn
+        ("user.github.io", "github.io"),  # private section not applied
+    ],
+)
+def test_registered_domain(name, expected):
+    assert registered_domain(name) == expected
+
+
+def test_rules_wildcards_and_exceptions():
+    psl = PublicSuffixList(["// comment", "", "uk", "co.uk", "*.ck", "!www.ck"])
+    assert psl.public_suffix("a.example.co.uk") == "co.uk"
+    assert psl.public_suffix("a.example.ck") == "example.ck"
+    assert psl.registered_domain("a.www.ck") == "www.ck"
+    assert public_suffix("shop.example.co.uk") == "co.uk"
+
+
+def test_scheduler_groups_by_registered_domain():
+    domains, stats = schedule_domains(["b.example.co.uk", "a.other.co.uk", "example.co.uk"])
+    assert domains == ["example.co.uk", "b.example.co.uk", "a.other.co.uk"]
+    assert stats["zones"] == 2
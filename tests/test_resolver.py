@@ -0,0 +1,261 @@
+"""Tests for the upstream resolver pool (no network required)."""
+
+import asyncio
+import time
+
+import dns.exception
+import dns.resolver
+import pytest
+
+from domain_security_analyzer import resolver as resolver_mod
+from domain_security_analyzer.resolver import AIMDLimiter, ResolverPool, parse_nameserver
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable replacement for time.monotonic inside the resolver module."""
+    now = [1000.0]
+    monkeypatch.setattr(resolver_mod.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _script(pool, behaviour):
+    """Replace each upstream's resolve with ``behaviour[address](qname, rdtype, lifetime)``."""
+    calls = []
+    for upstream in pool.upstreams:
+        def resolve(qname, rdtype, lifetime=None, address=upstream.address):
+            calls.append(address)
+            return behaviour[address](qname, rdtype, lifetime)
+        upstream.resolver.resolve = resolve
+    return calls
+
+
+def _timeout(qname, rdtype, lifetime=None):
+    raise dns.exception.Timeout()
+
+
+def _answer(qname, rdtype, lifetime=None):
+    return ["192.0.2.1"]
+
+
+def test_parse_nameserver_forms():
+    assert parse_nameserver("1.1.1.1") == ("1.1.1.1", 53)
+    assert parse_nameserver("127.0.0.1:5353") == ("127.0.0.1", 5353)
+    assert parse_nameserver("[2606:4700::1111]:53") == ("2606:4700::1111", 53)
+    assert parse_nameserver("2606:4700::1111") == ("2606:4700::1111", 53)
+
+
+def test_timeout_fails_over_to_next_upstream(clock):
+    pool = ResolverPool(["192.0.2.53", "198.51.100.53"])
+    calls = _script(pool, {"192.0.2.53": _timeout, "198.51.100.53": _answer})
+
+    assert pool.resolve("example.com", "A") == ["192.0.2.1"]
+    assert calls == ["192.0.2.53", "198.51.100.53"]
+    stats = pool.stats()
+    assert stats["192.0.2.53"]["timeouts"] == 1
+    assert stats["198.51.100.53"]["errors"] == 0
+
+
+def test_failing_upstream_is_ejected_then_readmitted(clock):
+    pool = ResolverPool(["192.0.2.53", "198.51.100.53"], max_failures=2, cooldown=30)
+    calls = _script(pool, {"192.0.2.53": _timeout, "198.51.100.53": _answer})
+
+    for _ in range(4):
+        pool.resolve("example.com", "A")
+    assert pool.stats()["192.0.2.53"]["healthy"] is False
+
+    calls.clear()
+    pool.resolve("example.com", "A")
+    assert calls == ["198.51.100.53"]  # ejected upstream is skipped
+
+    clock[0] += 31
+    assert pool.stats()["192.0.2.53"]["healthy"] is True
+    pool.resolve("example.com", "A")
+    pool.resolve("example.com", "A")
+    # On probation: a single further failure ejects it again
+    assert pool.stats()["192.0.2.53"]["ejections"] == 2
+
+
+def test_least_latency_prefers_fastest_upstream(clock):
+    pool = ResolverPool(["192.0.2.53", "198.51.100.53"], strategy="least-latency")
+    pool.record(pool.upstreams[0], 0.200)
+    pool.record(pool.upstreams[1], 0.010)
+
+    assert [u.address for u in pool.candidates()] == ["198.51.100.53", "192.0.2.53"]
+
+
+def test_nxdomain_counts_as_healthy_and_is_raised(clock):
+    pool = ResolverPool(["192.0.2.53", "198.51.100.53"])
+
+    def nxdomain(qname, rdtype, lifetime=None):
+        raise dns.resolver.NXDOMAIN()
+
+    calls = _script(pool, {"192.0.2.53": nxdomain, "198.51.100.53": nxdomain})
+    with pytest.raises(dns.resolver.NXDOMAIN):
+        pool.resolve("missing.example.com", "A")
+    assert len(calls) == 1
+    assert sum(s["errors"] for s in pool.stats().values()) == 0
+
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        ResolverPool(["192.0.2.53"], strategy="random")
+
+
+def _warm_up(pool, lookups=20):
+    """Feed the pool enough fast answers to derive a hedge delay."""
+    for _ in range(lookups):
+        pool.resolve("example.com", "A")
+
+
+def test_slow_query_is_hedged_within_budget():
+    pool = ResolverPool(["192.0.2.53"], hedge_budget=0.05, hedge_min_delay=0.01)
+    seen = []
+
+    def first_call_stalls(qname, rdtype, lifetime):
+        seen.append(qname)
+        if qname.startswith("slow") and seen.count(qname) == 1:
+            if lifetime is not None and lifetime < 0.3:
+                time.sleep(lifetime)
+                raise dns.resolver.LifetimeTimeout(timeout=lifetime, errors=[])
+            time.sleep(0.3)
+        return _answer(qname, rdtype)
+
+    _script(pool, {"192.0.2.53": first_call_stalls})
+    _warm_up(pool)
+
+    start = time.monotonic()
+    assert pool.resolve("slow1.example.com", "A") == ["192.0.2.1"]
+    assert time.monotonic() - start < 0.25  # the hedge answered first
+    assert seen.count("slow1.example.com") == 2
+
+    # 5% of 22 lookups leaves no room for a second hedge: wait for the primary
+    start = time.monotonic()
+    pool.resolve("slow2.example.com", "A")
+    assert time.monotonic() - start >= 0.25
+    assert seen.count("slow2.example.com") == 1
+
+    stats = pool.latency_stats()
+    assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+    assert stats["lookups"] == 22 and stats["primary_p99_ms"] >= 250
+
+
+def test_slow_query_races_a_resend_against_the_next_upstream():
+    pool = ResolverPool(["192.0.2.53", "198.51.100.53"], hedge_budget=0.1, hedge_min_delay=0.01)
+
+    def first_attempt_stalls(qname, rdtype, lifetime):
+        # Only the primary attempt on the caller's thread has a lifetime
+        if qname.startswith("slow") and lifetime is not None:
+            time.sleep(lifetime)
+            raise dns.resolver.LifetimeTimeout(timeout=lifetime, errors=[])
+        return _answer(qname, rdtype)
+
+    calls = _script(pool, {"192.0.2.53": first_attempt_stalls, "198.51.100.53": first_attempt_stalls})
+    _warm_up(pool)
+    # Fast lookups never touch the executor
+    assert pool._hedge_executor is None
+
+    start = time.monotonic()
+    assert pool.resolve("slow.example.com", "A") == ["192.0.2.1"]
+    assert time.monotonic() - start < 0.25
+    assert pool._hedge_executor._max_workers == pool._race_threads
+    pool._hedge_executor.shutdown(wait=True)  # the loser finishes in the background
+    # The cut-off primary, its re-send and the hedge to the other upstream
+    assert calls[20:].count(calls[20]) == 2 and len(set(calls[20:])) == 2
+    assert pool._race_tasks == 0
+    assert pool.latency_stats()["hedged"] == 2  # the re-send and the hedge
+
+
+def test_primary_is_not_cut_off_unless_the_budget_covers_every_extra_query():
+    # 5% of 21 lookups pays for one extra query; a race with two upstreams needs two
+    pool = ResolverPool(["192.0.2.53", "198.51.100.53"], hedge_budget=0.05, hedge_min_delay=0.01)
+
+    def slow(qname, rdtype, lifetime):
+        if qname.startswith("slow"):
+            if lifetime is not None and lifetime < 0.3:
+                time.sleep(lifetime)
+                raise dns.resolver.LifetimeTimeout(timeout=lifetime, errors=[])
+            time.sleep(0.3)
+        return _answer(qname, rdtype)
+
+    calls = _script(pool, {"192.0.2.53": slow, "198.51.100.53": slow})
+    _warm_up(pool)
+
+    assert pool.resolve("slow.example.com", "A") == ["192.0.2.1"]
+    assert len(calls) == 21  # one query, waited for in full
+    assert pool.latency_stats()["hedged"] == 0
+
+
+def test_no_hedging_without_enough_samples_or_budget():
+    pool = ResolverPool(["192.0.2.53", "198.51.100.53"], hedge_budget=0)
+    calls = _script(pool, {"192.0.2.53": _answer, "198.51.100.53": _answer})
+    _warm_up(pool, 30)
+    assert len(calls) == 30
+    assert pool.latency_stats()["hedged"] == 0
+
+    pool = ResolverPool(["192.0.2.53"])
+    _script(pool, {"192.0.2.53": _answer})
+    _warm_up(pool, 5)
+    assert pool._hedge_delay is None
+
+
+def test_aimd_limiter_grows_when_fast_and_halves_on_congestion(clock):
+    limiter = AIMDLimiter(initial=4, maximum=8)
+    for _ in range(40):
+        assert limiter.try_acquire()
+        limiter.release(0.010)
+    assert limiter.limit == 8  # capped at the maximum
+
+    for _ in range(5):
+        limiter.try_acquire()
+    for _ in range(5):
+        limiter.release(congested=True)  # one burst: a single backoff
+    assert limiter.limit == 4 and limiter.backoffs == 1
+
+    clock[0] += 1
+    limiter.try_acquire()
+    limiter.release(congested=True)
+    assert limiter.limit == 2 and limiter.backoffs == 2
+
+    limiter.try_acquire()
+    limiter.release(0.500)  # slow answer: held, not grown
+    assert limiter.limit == 2
+
+
+def test_aimd_limiter_queues_beyond_the_limit():
+    limiter = AIMDLimiter(initial=1)
+    limiter.acquire()
+    assert not limiter.try_acquire()
+
+    async def waiter():
+        await limiter.acquire_async()
+        return limiter.inflight
+
+    async def main():
+        task = asyncio.ensure_future(waiter())
+        await asyncio.sleep(0)
+        assert not task.done()
+        limiter.release(0.001)
+        return await task
+
+    assert asyncio.run(main()) == 1
+
+
+def test_failure_everywhere_is_retried_then_counted(monkeypatch):
+    monkeypatch.setattr(ResolverPool, "_backoff", staticmethod(lambda round_: 0))
+    pool = ResolverPool(["192.0.2.53", "198.51.100.53"], retries=1, hedge_budget=0)
+
+    def servfail(qname, rdtype, lifetime=None):
+        raise dns.resolver.NoNameservers()
+
+    outcomes = iter([servfail, servfail, _answer])
+    calls = _script(pool, {"192.0.2.53": lambda q, t, l: next(outcomes)(q, t, l),
+                           "198.51.100.53": lambda q, t, l: next(outcomes)(q, t, l)})
+    assert pool.resolve("example.com", "A") == ["192.0.2.1"]
+    assert len(calls) == 3 and pool.retried == 1 and pool.failed == 0
+
+    _script(pool, {"192.0.2.53": servfail, "198.51.100.53": servfail})
+    with pytest.raises(dns.resolver.NoNameservers):
+        pool.resolve("example.com", "A")
+    assert pool.failed == 1
+    assert all(s["backoffs"] >= 1 for s in pool.stats().values())
@@ -0,0 +1,81 @@
+"""Tests for input normalization and zone-aware domain ordering."""
+
+from domain_security_analyzer import analyzer as analyzer_mod
+from domain_security_analyzer.scheduler import normalize_domain, schedule_domains
+
+
+def test_normalize_domain():
+    assert normalize_domain("  WWW.Example.COM. ") == "www.example.com"
+    assert normalize_domain("Bücher.example") == "xn--bcher-kva.example"
+    assert normalize_domain("xn--bcher-kva.example") == "xn--bcher-kva.example"
+    assert normalize_domain("a" * 64 + ".example") == "a" * 64 + ".example"  # left for the analysis
+
+
+def test_clusters_by_zone_then_name_servers():
+    name_servers = {
+        "alpha.example": ["ns1.host-a.net.", "NS2.host-a.net."],
+        "gamma.example": ["ns2.host-a.net", "ns1.host-a.net"],
+        "beta.example": ["ns.host-b.net."],
+    }
+    lookups = []
+
+    def ns_lookup(zone):
+        lookups.append(zone)
+        return name_servers.get(zone)
+
+    domains, stats = schedule_domains(
+        ["shop.gamma.example", "beta.example", "WWW.alpha.example", "alpha.example",
+         "www.alpha.example.", "mail.beta.example", "gamma.example", "lone.example"],
+        ns_lookup=ns_lookup,
+    )
+
+    assert sorted(lookups) == ["alpha.example", "beta.example", "gamma.example", "lone.example"]
+    assert domains == [
+        "lone.example",  # no NS answer
+        "beta.example", "mail.beta.example",  # apex first
+        "alpha.example", "www.alpha.example",  # same name servers
+        "gamma.example", "shop.gamma.example",
+    ]
+    assert stats == {"input": 8, "duplicates": 1, "zones": 4, "ns_groups": 3}
+
+
+def test_scheduled_run_dedupes_and_orders(tmp_path, monkeypatch):
+    analyzed = []
+
+    def analyze(self, domain):
+        analyzed.append(domain)
+        return analyzer_mod._error_result(domain, "stub")
+
+    monkeypatch.setattr(analyzer_mod.DomainAnalyzer, "analyze_domain", analyze)
+    monkeypatch.setattr(analyzer_mod.DomainAnalyzer, "get_dns_record", lambda self, name, rdtype: None)
+    input_file = tmp_path / "in.txt"
+    input_file.write_text("www.b.example\na.example\nB.example\nwww.B.example.\n")
+
+    analyzer_mod.analyze_domains_from_file(str(input_file), str(tmp_path / "out.csv"), max_workers=1,
+                                           schedule=True)
+    assert analyzed == ["a.example", "b.example", "www.b.example"]
+
+
+def test_resumed_scheduled_run_skips_done_domains_before_ns_lookups(tmp_path, monkeypatch):
+    analyzed, ns_lookups = [], []
+
+    def analyze(self, domain):
+        analyzed.append(domain)
+        return analyzer_mod._error_result(domain, "stub")
+
+    monkeypatch.setattr(analyzer_mod.DomainAnalyzer, "analyze_domain", analyze)
+    monkeypatch.setattr(analyzer_mod.DomainAnalyzer, "get_dns_record",
+                        lambda self, name, rdtype: ns_lookups.append(name))
+    input_file = tmp_path / "in.txt"
+    input_file.write_text("Bücher.example\nwww.b.example\na.other\n", encoding="utf-8")
+    output_file = tmp_path / "out.csv"
+    analyzer_mod.analyze_domains_from_file(str(input_file), str(output_file), max_workers=1, schedule=True)
+    analyzed.clear()
+    ns_lookups.clear()
+
+    # The first run recorded the IDNA form; feed the raw names again plus one new one
+    input_file.write_text("Bücher.example\nwww.b.example\na.other\nnew.example\n", encoding="utf-8")
+    analyzer_mod.analyze_domains_from_file(str(input_file), str(output_file), max_workers=1, schedule=True,
+                                           resume=True)
+    assert analyzed == ["new.example"]
+    assert ns_lookups == ["new.example"]
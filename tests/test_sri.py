@@ -1,6 +1,10 @@
 """Unit tests for SRI analysis pure logic (no network required)."""
 
+import threading
+import time
+
 import pytest
+import requests
 from bs4 import BeautifulSoup
 
 from domain_security_analyzer import SRIParser, UnsafeResource, scan_url
@@ -121,3 +125,188 @@ def test_integrity_pattern_accepts_known_algorithms():
     assert sri_mod.INTEGRITY_PATTERN.match("sha256-" + "a" * 44)
     assert sri_mod.INTEGRITY_PATTERN.match("sha512-" + "b" * 88)
     assert not sri_mod.INTEGRITY_PATTERN.match("sha1-abc")
+
+
+def test_page_is_scanned_once_with_memoized_urls(monkeypatch):
+    page = (
+        '<script src="https://cdn.example.org/a.js"></script>' * 3
+        + '<link rel="stylesheet" href="https://cdn.example.org/a.css">'
+        + '<a href="/about">About</a><a href="/about">About</a><a href="https://other.example/">x</a>'
+    )
+    joins = []
+    real_urljoin = sri_mod.urljoin
+    monkeypatch.setattr(sri_mod, "urljoin", lambda base, ref: joins.append(ref) or real_urljoin(base, ref))
+
+    parser = SRIParser("https://example.com", max_depth=1)
+    parser._process_page("https://example.com/", 0, page)
+
+    assert sorted(joins) == ["/about", "https://cdn.example.org/a.css",
+                             "https://cdn.example.org/a.js", "https://other.example/"]
+    assert [u.resource_url for u in parser.unsafe_resources] == ["https://cdn.example.org/a.js"] * 3 + [
+        "https://cdn.example.org/a.css"]
+    assert list(parser.to_visit)[1:] == [("https://example.com/about", 1)]  # queued once
+
+
+class _FakeSite:
+    """Pages linking to each other, served with delays that invert completion order."""
+
+    def __init__(self, pages=30):
+        self.lock = threading.Lock()
+        self.inflight = self.peak = 0
+        self.fetched = []
+        self.pages = {}
+        for i in range(pages):
+            links = "".join(f'<a href="/p{(i * 7 + k) % pages}">x</a>' for k in range(1, 4))
+            self.pages[f"https://example.com/p{i}"] = (
+                f'<script src="https://cdn.example.org/{i}.js"></script>{links}<a href="/missing">404</a>'
+            )
+        self.pages["https://example.com"] = self.pages.pop("https://example.com/p0")
+
+    def fetch(self, url):
+        with self.lock:
+            self.inflight += 1
+            self.peak = max(self.peak, self.inflight)
+            self.fetched.append(url)
+        time.sleep(0.02 / (1 + len(self.fetched) % 5))
+        with self.lock:
+            self.inflight -= 1
+        html = self.pages.get(url)
+        return _Response(html) if html is not None else None
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+        self.headers = {"content-type": "text/html"}
+
+
+def _crawl(site, **kwargs):
+    parser = SRIParser("https://example.com", max_depth=3, max_pages=12, **kwargs)
+    parser._fetch = site.fetch
+    return parser.crawl()
+
+
+def test_concurrent_crawl_matches_serial_and_respects_host_limit():
+    serial_site = _FakeSite()
+    serial = _crawl(serial_site)
+    assert serial["pages_crawled"] == 12
+
+    site = _FakeSite()
+    assert _crawl(site, concurrency=8, max_per_host=3) == serial
+    assert 1 < site.peak <= 3
+    # No page is fetched twice, and speculation stays within the page budget
+    assert len(site.fetched) == len(set(site.fetched))
+    assert set(serial_site.fetched) <= set(site.fetched)
+    assert len(site.fetched) <= len(serial_site.fetched) + 8
+
+
+def test_canonical_url_forms():
+    canonical = sri_mod._canonical_url
+    assert canonical("HTTPS://Example.COM:443") == "https://example.com/"
+    assert canonical("http://example.com:80/a?b=1#frag") == "http://example.com/a?b=1"
+    assert canonical("https://example.com:8443/A") == "https://example.com:8443/A"
+
+
+def test_frontier_is_deduplicated_and_capped():
+    links = "".join(f'<a href="/p{i}">x</a><a href="HTTPS://EXAMPLE.COM:443/p{i}#top">x</a>' for i in range(100))
+    parser = SRIParser("https://example.com", max_depth=2, max_pages=10)
+    parser.visited.add("https://example.com")
+    parser._process_page("https://example.com", 0, links + '<a href="/">home</a>', frontier_limit=20)
+    assert len(parser.to_visit) == 20
+    assert [url for url, _ in parser.to_visit][1:4] == [
+        "https://example.com/p0", "https://example.com/p1", "https://example.com/p2"]
+
+    # A crawl keeps at most _FRONTIER_SLACK URLs queued per page it may still fetch
+    site = _FakeSite(pages=200)
+    parser = SRIParser("https://example.com", max_depth=5, max_pages=5)
+    parser._fetch = site.fetch
+    parser.crawl()
+    assert len(parser.to_visit) <= sri_mod._FRONTIER_SLACK * 5
+
+
+def test_bloom_filter_crawl_matches_exact_crawl():
+    exact = _crawl(_FakeSite())
+    assert _crawl(_FakeSite(), bloom_capacity=1000) == exact
+
+    seen = sri_mod._BloomURLSet(capacity=10_000)
+    urls = [f"https://example.com/page/{i}" for i in range(10_000)]
+    for url in urls:
+        seen.add(url)
+    assert all(url in seen for url in urls)  # no false negatives
+    false_positives = sum(f"https://example.com/other/{i}" in seen for i in range(10_000))
+    assert false_positives <= 10
+    assert len(seen._bits) < 30_000
+
+
+def test_scan_urls_streams_reports_with_bounded_concurrency(monkeypatch):
+    delays = {"https://slow.example": 0.2, "https://fast.example": 0.0, "https://mid.example": 0.05}
+    sessions, consumed = set(), []
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def fetch(self, url):
+        with lock:
+            sessions.add(id(self.session))
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(delays[url])
+        with lock:
+            active[0] -= 1
+        return _Response('<script src="https://cdn.example.org/x.js"></script>')
+
+    def urls():
+        for url in ["https://slow.example", "", "https://fast.example", "https://mid.example"]:
+            consumed.append(url)
+            yield url
+
+    monkeypatch.setattr(SRIParser, "_fetch", fetch)
+    results = sri_mod.scan_urls(urls(), concurrency=2)
+    first_url, first = next(results)
+    assert first_url == "" and first["error"] and first["pages_crawled"] == 0
+    assert len(consumed) <= 3  # input is read as sites finish, not up front
+
+    rest = dict(results)
+    assert list(rest) == ["https://fast.example", "https://mid.example", "https://slow.example"]
+    assert all(report["pages_crawled"] == 1 and len(report["unsafe_resources"]) == 1 for report in rest.values())
+    assert peak[0] <= 2 and len(sessions) == 1
+
+
+def test_scan_urls_reports_a_failing_site_and_carries_on(monkeypatch):
+    real_fetch = SRIParser._fetch
+
+    def fetch(self, url):
+        if "a..b" in url:
+            return real_fetch(self, url)  # raises before any request is sent
+        return _Response('<script src="https://cdn.example.org/x.js"></script>')
+
+    monkeypatch.setattr(SRIParser, "_fetch", fetch)
+    urls = ["https://ok.example", "http://a..b/", "http://[::1/", "https://also-ok.example"]
+    reports = dict(sri_mod.scan_urls(urls, concurrency=2))
+
+    assert set(reports) == set(urls)
+    assert reports["http://a..b/"]["error"] and reports["http://[::1/"]["error"]
+    assert reports["https://ok.example"]["pages_crawled"] == 1
+    assert reports["https://also-ok.example"]["pages_crawled"] == 1
+
+
+def test_scan_urls_passes_crawl_options_to_each_site(monkeypatch):
+    options = []
+    real_init = SRIParser.__init__
+
+    def init(self, *args, **kwargs):
+        real_init(self, *args, **kwargs)
+        options.append((self.concurrency, self.max_per_host, type(self._seen).__name__, self.session.headers["User-Agent"]))
+
+    monkeypatch.setattr(SRIParser, "__init__", init)
+    monkeypatch.setattr(SRIParser, "_fetch", lambda self, url: _Response("<p>hi</p>"))
+    reports = dict(sri_mod.scan_urls(["https://a.example", "https://b.example"], crawl_concurrency=2,
+                                     max_per_host=1, bloom_capacity=1000, user_agent="probe/1.0"))
+    assert all(report["pages_crawled"] == 1 for report in reports.values())
+    assert options == [(2, 1, "_BloomURLSet", "probe/1.0")] * 2
+
+
+def test_scan_urls_rejects_user_agent_with_own_session():
+    session = requests.Session()
+    with pytest.raises(ValueError):
+        sri_mod.scan_urls(["https://a.example"], user_agent="probe/1.0", session=session)
+    session.close()
@@ -0,0 +1,130 @@
+"""Tests for SRI hash verification and the resource digest cache (local server only)."""
+
+import base64
+import hashlib
+import http.server
+import threading
+import time
+
+import pytest
+
+from domain_security_analyzer.sri import SRIParser
+from domain_security_analyzer.sridigest import ALGORITHMS, DigestCache, verify_integrity
+
+LIBRARY = b"/*! library v1 */ window.lib = {};"
+ETAG = '"v1"'
+
+
+def sri_digests(data):
+    return {name: base64.b64encode(hashlib.new(name, data).digest()).decode("ascii") for name in ALGORITHMS}
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        if self.path == "/missing.js":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path == "/proxied.js" and self.path not in self.server.requests[:-1]:
+            # A cache on the way that answers the first request with 304 anyway
+            self.send_response(304)
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.end_headers()
+            return
+        time.sleep(0.05)  # long enough for concurrent callers to pile up
+        self.send_response(200)
+        self.send_header("Content-Type", "application/javascript")
+        self.send_header("Content-Length", str(len(LIBRARY)))
+        self.send_header("ETag", ETAG)
+        self.end_headers()
+        self.wfile.write(LIBRARY)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_strongest_algorithm_decides():
+    digests = sri_digests(LIBRARY)
+    good = f"sha384-{digests['sha384']}"
+    assert verify_integrity([good], digests)
+    assert verify_integrity(["sha384-stale", good], digests)  # any value of the algorithm
+    # A stale sha512 wins over a good sha384, as in browsers
+    assert not verify_integrity([good, "sha512-stale"], digests)
+
+
+def test_each_url_is_downloaded_once_per_run(server):
+    cache = DigestCache()
+    url = f"{server.url}/lib.js"
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get(url))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [sri_digests(LIBRARY)] * 8
+    assert cache.get(f"{server.url}/missing.js") is None
+    assert cache.get(f"{server.url}/missing.js") is None
+    assert server.requests == ["/lib.js", "/missing.js"]
+    assert cache.stats()["downloads"] == 1 and cache.stats()["failures"] == 1
+
+
+def test_persistent_cache_reuses_then_revalidates(server, tmp_path):
+    url = f"{server.url}/lib.js"
+    path = tmp_path / "digests.sqlite3"
+    DigestCache(path=path).get(url)
+
+    fresh = DigestCache(path=path)
+    assert fresh.get(url) == sri_digests(LIBRARY)
+    assert fresh.stats()["disk_hits"] == 1 and len(server.requests) == 1
+
+    stale = DigestCache(path=path, max_age=0)
+    assert stale.get(url) == sri_digests(LIBRARY)
+    assert stale.stats()["revalidated"] == 1 and len(server.requests) == 2  # 304, no body
+
+
+def test_unexpected_not_modified_is_refetched(server):
+    cache = DigestCache()
+    assert cache.get(f"{server.url}/proxied.js") == sri_digests(LIBRARY)
+    assert server.requests == ["/proxied.js", "/proxied.js"]
+    assert cache.stats()["downloads"] == 1 and cache.stats()["revalidated"] == 0
+
+
+def test_crawl_flags_integrity_mismatch(server):
+    digests = sri_digests(LIBRARY)
+    page = (
+        f'<script src="{server.url}/lib.js" integrity="sha256-{digests["sha256"]}" crossorigin="anonymous"></script>'
+        f'<script src="{server.url}/lib.js?v=old" integrity="sha256-c3RhbGU=" crossorigin="anonymous"></script>'
+        f'<script src="{server.url}/missing.js" integrity="sha256-c3RhbGU=" crossorigin="anonymous"></script>'
+    )
+    parser = SRIParser("https://example.com", verify_integrity=True)
+    parser._process_page("https://example.com", 0, page)
+
+    assert [entry["integrity_verified"] for entry in parser.resources_with_integrity] == [True, False, None]
+    mismatched = [u for u in parser.unsafe_resources if "integrity-mismatch" in u.reasons]
+    assert [u.resource_url for u in mismatched] == [f"{server.url}/lib.js?v=old"]
+
+    # Off by default: nothing is downloaded
+    server.requests.clear()
+    SRIParser("https://example.com")._process_page("https://example.com", 0, page)
+    assert server.requests == []